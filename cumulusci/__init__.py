@@ -2,7 +2,7 @@ import os
 import sys
 from simple_salesforce import api, bulk
 
-__import__("pkg_resources").declare_namespace("cumulusci")
+__path__ = __import__("pkgutil").extend_path(__path__, __name__)
 
 __location__ = os.path.dirname(os.path.realpath(__file__))
 
@@ -1,30 +1,21 @@
 from collections import defaultdict
 from urllib.parse import urlparse
 
-import code
 import functools
 import json
 import re
 import os
 import platform
-import pdb
 import shutil
 import sys
 import time
 import traceback
-import runpy
-import webbrowser
 import contextlib
 from pathlib import Path
 from datetime import datetime
 
 import click
-import github3
-import pkg_resources
 import requests
-from rst2ansi import rst2ansi
-from jinja2 import Environment
-from jinja2 import PackageLoader
 
 import cumulusci
 from cumulusci.core.config import OrgConfig
@@ -92,6 +83,8 @@ def is_final_release(version: str) -> bool:
 def get_latest_final_version():
     """ return the latest version of cumulusci in pypi, be defensive """
     # use the pypi json api https://wiki.python.org/moin/PyPIJSON
+    import pkg_resources
+
     res = safe_json_from_response(
         requests.get("https://pypi.org/pypi/cumulusci/json", timeout=5)
     )
@@ -277,6 +270,8 @@ def connection_error_message():
 
 def show_debug_info():
     """Displays the traceback and opens pdb"""
+    import pdb
+
     traceback.print_exc()
     pdb.post_mortem()
 
@@ -326,10 +321,14 @@ def shell(runtime, script=None, python=None):
     if script:
         if python:
             raise click.UsageError("Cannot specify both --script and --python")
+        import runpy
+
         runpy.run_path(script, init_globals=variables)
     elif python:
         exec(python, variables)
     else:
+        import code
+
         code.interact(local=variables)
 
 
@@ -426,6 +425,9 @@ def project_init(runtime):
     context = {"cci_version": cumulusci.__version__}
 
     # Prep jinja2 environment for rendering files
+    from jinja2 import Environment
+    from jinja2 import PackageLoader
+
     env = Environment(
         loader=PackageLoader(
             "cumulusci", os.path.join("files", "templates", "project")
@@ -917,6 +919,8 @@ def org_browser(runtime, org_name):
     org_name, org_config = runtime.get_org(org_name)
     org_config.refresh_oauth_token(runtime.keychain)
 
+    import webbrowser
+
     webbrowser.open(org_config.start_url)
     # Save the org config in case it was modified
     org_config.save()
@@ -1365,10 +1369,14 @@ def org_shell(runtime, org_name, script=None, python=None):
     if script:
         if python:
             raise click.UsageError("Cannot specify both --script and --python")
+        import runpy
+
         runpy.run_path(script, init_globals=globals)
     elif python:
         exec(python, globals)
     else:
+        import code
+
         code.interact(
             banner=f"Use `sf` to access org `{org_name}` via simple_salesforce\n"
             + "Type `help` for more information about the cci shell.",
@@ -1507,6 +1515,8 @@ def task_info(runtime, task_name):
         else runtime.universal_config.get_task(task_name)
     )
 
+    from rst2ansi import rst2ansi
+
     doc = doc_task(task_name, task_config).encode()
     click.echo(rst2ansi(doc))
 
@@ -1745,8 +1755,15 @@ def flow_info(runtime, flow_name):
     is_flag=True,
     help="Disables all prompts.  Set for non-interactive mode use such as calling from scripts or CI systems",
 )
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Skips steps which already completed successfully in this org with the same options and inputs",
+)
 @pass_runtime(require_keychain=True)
-def flow_run(runtime, flow_name, org, delete_org, debug, o, skip, no_prompt):
+def flow_run(
+    runtime, flow_name, org, delete_org, debug, o, skip, no_prompt, resume=False
+):
 
     # Get necessary configs
     org, org_config = runtime.get_org(org)
@@ -1767,7 +1784,9 @@ def flow_run(runtime, flow_name, org, delete_org, debug, o, skip, no_prompt):
 
     # Create the flow and handle initialization exceptions
     try:
-        coordinator = runtime.get_flow(flow_name, options=options)
+        coordinator = runtime.get_flow(
+            flow_name, options=options, skip_unchanged=resume
+        )
         start_time = datetime.now()
         coordinator.run(org_config)
         duration = datetime.now() - start_time
@@ -1844,6 +1863,9 @@ def gist(runtime):
         filename: {"content": f"{get_context_info()}{last_cmd_header}{log_content}"}
     }
 
+    import github3
+    import webbrowser
+
     try:
         gh = RUNTIME.keychain.get_service("github")
         gist = create_gist(
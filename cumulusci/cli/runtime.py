@@ -4,7 +4,6 @@ from subprocess import call
 
 import click
 import keyring
-import pkg_resources
 
 from cumulusci import __version__
 from cumulusci.core.runtime import BaseCumulusCI
@@ -135,6 +134,8 @@ class CliRuntime(BaseCumulusCI):
         if self.project_config:
             min_cci_version = self.project_config.minimum_cumulusci_version
             if min_cci_version:
+                import pkg_resources
+
                 parsed_version = pkg_resources.parse_version(min_cci_version)
                 if get_installed_version() < parsed_version:
                     raise click.UsageError(
@@ -163,4 +164,6 @@ CliConfig = CliRuntime
 
 def get_installed_version():
     """ returns the version name (e.g. 2.0.0b58) that is installed """
+    import pkg_resources
+
     return pkg_resources.parse_version(__version__)
@@ -6,6 +6,8 @@ import io
 import json
 import os
 import shutil
+import subprocess
+import sys
 import tempfile
 import time
 import pytest
@@ -71,6 +73,27 @@ class TestCCI(unittest.TestCase):
         self.cleanup_org_cache_dirs_cli_patch.stop()
         self.cleanup_org_cache_dirs_fileutils_patch.stop()
 
+    def test_startup_imports(self):
+        # Keep `cci` startup fast: these modules are only needed by
+        # particular commands and must not be imported with the CLI.
+        # Newer setuptools replace distutils with a shim which imports
+        # pkg_resources, so use the standard library's distutils to only
+        # check the modules CumulusCI imports itself.
+        output = subprocess.check_output(
+            [sys.executable, "-X", "importtime", "-c", "import cumulusci.cli.cci"],
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+            env={**os.environ, "SETUPTOOLS_USE_DISTUTILS": "stdlib"},
+        )
+        imported = {
+            line.rsplit("|", 1)[-1].strip()
+            for line in output.splitlines()
+            if line.startswith("import time:")
+        }
+        assert "cumulusci.cli.cci" in imported
+        for module in ("pkg_resources", "fs", "rst2ansi", "docutils", "pdb"):
+            assert module not in imported
+
     def test_get_installed_version(self):
         result = cci.get_installed_version()
         self.assertEqual(cumulusci.__version__, str(result))
@@ -425,14 +448,14 @@ class TestCCI(unittest.TestCase):
         )
 
     @mock.patch("cumulusci.cli.cci.CCI_LOGFILE_PATH")
-    @mock.patch("cumulusci.cli.cci.webbrowser")
+    @mock.patch("webbrowser.open")
     @mock.patch("cumulusci.cli.cci.platform")
     @mock.patch("cumulusci.cli.cci.sys")
     @mock.patch("cumulusci.cli.cci.datetime")
     @mock.patch("cumulusci.cli.cci.create_gist")
     @mock.patch("cumulusci.cli.cci.get_github_api")
     def test_gist(
-        self, gh_api, create_gist, date, sys, platform, webbrowser, logfile_path
+        self, gh_api, create_gist, date, sys, platform, browser_open, logfile_path
     ):
 
         platform.uname.return_value = mock.Mock(system="Rossian", machine="x68_46")
@@ -468,7 +491,7 @@ Environment Info: Rossian / x68_46
         create_gist.assert_called_once_with(
             gh_api(), "CumulusCI Error Output", expected_files
         )
-        webbrowser.open.assert_called_once_with(expected_gist_url)
+        browser_open.assert_called_once_with(expected_gist_url)
 
     @mock.patch("cumulusci.cli.cci.CCI_LOGFILE_PATH")
     @mock.patch("cumulusci.cli.cci.click")
@@ -1073,6 +1096,7 @@ Environment Info: Rossian / x68_46
     @mock.patch("sarge.Command")
     def test_org_import(self, cmd):
         runtime = mock.Mock()
+        runtime.keychain.get_sfdx_org_info.return_value = None
         result = b"""{
             "result": {
                 "createdDate": "1970-01-01T00:00:00.000Z",
@@ -1894,7 +1918,7 @@ Environment Info: Rossian / x68_46
         doc_task.assert_called()
         echo.assert_not_called()
 
-    @mock.patch("cumulusci.cli.cci.rst2ansi")
+    @mock.patch("rst2ansi.rst2ansi")
     @mock.patch("cumulusci.cli.cci.doc_task")
     def test_task_info(self, doc_task, rst2ansi):
         runtime = mock.Mock()
@@ -2027,10 +2051,32 @@ Environment Info: Rossian / x68_46
         )
 
         runtime.get_flow.assert_called_once_with(
-            "test", options={"test_task": {"color": "blue"}}
+            "test", options={"test_task": {"color": "blue"}}, skip_unchanged=False
         )
         org_config.delete_org.assert_called_once()
 
+    def test_flow_run__resume(self):
+        org_config = mock.Mock(scratch=True, config={})
+        runtime = mock.Mock()
+        runtime.get_org.return_value = ("test", org_config)
+
+        run_click_command(
+            cci.flow_run,
+            runtime=runtime,
+            flow_name="test",
+            org="test",
+            delete_org=False,
+            debug=False,
+            o=None,
+            skip=(),
+            no_prompt=True,
+            resume=True,
+        )
+
+        runtime.get_flow.assert_called_once_with(
+            "test", options={}, skip_unchanged=True
+        )
+
     def test_flow_run_o_error(self):
         org_config = mock.Mock(scratch=True, config={})
         runtime = CliRuntime(config={"noop": {}}, load_keychain=False)
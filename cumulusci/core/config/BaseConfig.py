@@ -1,5 +1,9 @@
 import logging
 
+# Attribute names split on "__" into (parent keys, final key).
+# Names only depend on the calling code, so this is shared by all configs.
+_attr_paths = {}
+
 
 class BaseConfig(object):
     """ BaseConfig provides a common interface for nested access for all Config objects in CCI. """
@@ -23,23 +27,20 @@ class BaseConfig(object):
         pass
 
     def __getattr__(self, name):
-        tree = name.split("__")
         if name.startswith("_"):
             raise AttributeError(f"Attribute {name} not found")
-        value = None
-        value_found = False
+        path = _attr_paths.get(name)
+        if path is None:
+            tree = name.split("__")
+            path = _attr_paths[name] = (tuple(tree[:-1]), tree[-1])
+        parents, key = path
+
+        # Walk through the config dictionary using __ as a delimiter
         config = self.config
-        if len(tree) > 1:
-            # Walk through the config dictionary using __ as a delimiter
-            for key in tree[:-1]:
-                config = config.get(key)
-                if config is None:
-                    break
-        if config and tree[-1] in config:
-            value = config[tree[-1]]
-            value_found = True
-
-        if value_found:
-            return value
-        else:
-            return self.defaults.get(name)
+        for parent in parents:
+            config = config.get(parent)
+            if config is None:
+                break
+        if config and key in config:
+            return config[key]
+        return self.defaults.get(name)
@@ -1,8 +1,10 @@
 from collections import defaultdict
 from collections import namedtuple
 from distutils.version import StrictVersion
+import json
 import os
 import re
+import time
 from contextlib import contextmanager
 from urllib.parse import urlparse
 
@@ -16,7 +18,6 @@ from cumulusci.core.exceptions import DependencyResolutionError
 from cumulusci.core.exceptions import SalesforceCredentialsException
 from cumulusci.oauth.salesforce import SalesforceOAuth2
 from cumulusci.oauth.salesforce import jwt_session
-from cumulusci.utils.fileutils import open_fs_resource
 from cumulusci.utils.http.requests_utils import safe_json_from_response
 
 
@@ -27,6 +28,12 @@ MYDOMAIN_RE = re.compile(r"\.my\.(.*)salesforce\.com")
 
 VersionInfo = namedtuple("VersionInfo", ["id", "number"])
 
+# Number of SubscriberPackageVersion Ids to look up in a single query
+INSTALLED_PACKAGES_QUERY_CHUNK_SIZE = 100
+# Cached installed packages are refreshed after this many seconds, in case
+# packages were installed or uninstalled outside of CumulusCI
+INSTALLED_PACKAGES_CACHE_SECONDS = 60 * 60
+
 
 class OrgConfig(BaseConfig):
     """ Salesforce org configuration (i.e. org credentials) """
@@ -259,47 +266,143 @@ class OrgConfig(BaseConfig):
         To check if a required package is present, call `has_minimum_package_version()` with either the
         namespace or 033 Id of the desired package and its version, in 1.2.3 format.
 
-        Beta version of a package are represented as "1.2.3b5", where 5 is the build number."""
+        Beta version of a package are represented as "1.2.3b5", where 5 is the build number.
+
+        The result is cached in the org info cache so it can be reused by later commands,
+        until `reset_installed_packages()` is called after installing or uninstalling packages."""
+        if self._installed_packages is None:
+            self._installed_packages = self._load_installed_packages_cache()
         if self._installed_packages is None:
-            isp_result = self.salesforce_client.restful(
-                "tooling/query/?q=SELECT SubscriberPackage.Id, SubscriberPackage.NamespacePrefix, "
-                "SubscriberPackageVersionId FROM InstalledSubscriberPackage"
+            self._installed_packages = self._fetch_installed_packages()
+            self._store_installed_packages_cache()
+        return self._installed_packages
+
+    def _fetch_installed_packages(self):
+        isp_result = self.salesforce_client.restful(
+            "tooling/query/?q=SELECT SubscriberPackage.Id, SubscriberPackage.NamespacePrefix, "
+            "SubscriberPackageVersionId FROM InstalledSubscriberPackage"
+        )
+        isp_records = isp_result["records"]
+        versions = self._fetch_subscriber_package_versions(
+            [isp["SubscriberPackageVersionId"] for isp in isp_records]
+        )
+
+        _installed_packages = defaultdict(list)
+        for isp in isp_records:
+            sp = isp["SubscriberPackage"]
+            spv = versions.get(isp["SubscriberPackageVersionId"])
+            if spv is None:
+                # This _shouldn't_ happen, but it is possible in customer orgs.
+                continue
+
+            version = f"{spv['MajorVersion']}.{spv['MinorVersion']}"
+            if spv["PatchVersion"]:
+                version += f".{spv['PatchVersion']}"
+            if spv["IsBeta"]:
+                version += f"b{spv['BuildNumber']}"
+            version_info = VersionInfo(spv["Id"], StrictVersion(version))
+            namespace = sp["NamespacePrefix"]
+            _installed_packages[namespace].append(version_info)
+            namespace_version = f"{namespace}@{version}"
+            _installed_packages[namespace_version].append(version_info)
+            _installed_packages[sp["Id"]].append(version_info)
+
+        return _installed_packages
+
+    def _fetch_subscriber_package_versions(self, version_ids):
+        """Returns a dict mapping SubscriberPackageVersion Ids to their records,
+        querying up to INSTALLED_PACKAGES_QUERY_CHUNK_SIZE versions at a time."""
+        versions = {}
+        version_ids = sorted(set(version_ids))
+        for i in range(0, len(version_ids), INSTALLED_PACKAGES_QUERY_CHUNK_SIZE):
+            chunk = version_ids[i : i + INSTALLED_PACKAGES_QUERY_CHUNK_SIZE]
+            id_list = ", ".join(f"'{version_id}'" for version_id in chunk)
+            try:
+                spv_result = self.salesforce_client.restful(
+                    "tooling/query/?q=SELECT Id, MajorVersion, MinorVersion, PatchVersion, BuildNumber, "
+                    f"IsBeta FROM SubscriberPackageVersion WHERE Id IN ({id_list})"
+                )
+            except SalesforceError:
+                # One of the versions can't be queried;
+                # look them up individually so the others are still found.
+                for version_id in chunk:
+                    versions.update(self._fetch_subscriber_package_version(version_id))
+                continue
+            for spv in spv_result["records"]:
+                versions[spv["Id"]] = spv
+        return versions
+
+    def _fetch_subscriber_package_version(self, version_id):
+        try:
+            spv_result = self.salesforce_client.restful(
+                "tooling/query/?q=SELECT Id, MajorVersion, MinorVersion, PatchVersion, BuildNumber, "
+                f"IsBeta FROM SubscriberPackageVersion WHERE Id='{version_id}'"
             )
-            _installed_packages = defaultdict(list)
-            for isp in isp_result["records"]:
-                sp = isp["SubscriberPackage"]
+        except SalesforceError as err:
+            self.logger.warning(
+                f"Ignoring error while trying to check installed package {version_id}: {err.content}"
+            )
+            return {}
+        return {spv["Id"]: spv for spv in spv_result["records"]}
+
+    @contextmanager
+    def _installed_packages_cache_file(self):
+        with self.get_orginfo_cache_dir("installed_packages") as cache:
+            yield cache / "installed_packages.json"
+
+    def _can_cache_installed_packages(self):
+        return self.keychain is not None and bool(self.config.get("id"))
+
+    def _load_installed_packages_cache(self):
+        if not self._can_cache_installed_packages():
+            return None
+        with self._installed_packages_cache_file() as cache_file:
+            if not cache_file.exists():
+                return None
+            with cache_file.open("r") as f:
                 try:
-                    spv_result = self.salesforce_client.restful(
-                        "tooling/query/?q=SELECT Id, MajorVersion, MinorVersion, PatchVersion, BuildNumber, "
-                        f"IsBeta FROM SubscriberPackageVersion WHERE Id='{isp['SubscriberPackageVersionId']}'"
-                    )
-                except SalesforceError as err:
-                    self.logger.warning(
-                        f"Ignoring error while trying to check installed package {isp['SubscriberPackageVersionId']}: {err.content}"
-                    )
-                    continue
-                if not spv_result["records"]:
-                    # This _shouldn't_ happen, but it is possible in customer orgs.
-                    continue
-                spv = spv_result["records"][0]
-
-                version = f"{spv['MajorVersion']}.{spv['MinorVersion']}"
-                if spv["PatchVersion"]:
-                    version += f".{spv['PatchVersion']}"
-                if spv["IsBeta"]:
-                    version += f"b{spv['BuildNumber']}"
-                version_info = VersionInfo(spv["Id"], StrictVersion(version))
-                namespace = sp["NamespacePrefix"]
-                _installed_packages[namespace].append(version_info)
-                namespace_version = f"{namespace}@{version}"
-                _installed_packages[namespace_version].append(version_info)
-                _installed_packages[sp["Id"]].append(version_info)
-
-            self._installed_packages = _installed_packages
-        return self._installed_packages
+                    cached = json.load(f)
+                except ValueError:
+                    return None
+        # The org may have been recreated with the same username
+        if cached.get("org_id") != self.org_id:
+            return None
+        if time.time() - cached.get("timestamp", 0) > INSTALLED_PACKAGES_CACHE_SECONDS:
+            return None
+        return defaultdict(
+            list,
+            {
+                key: [
+                    VersionInfo(version_id, StrictVersion(number))
+                    for version_id, number in versions
+                ]
+                for key, versions in cached["packages"].items()
+            },
+        )
+
+    def _store_installed_packages_cache(self):
+        if not self._can_cache_installed_packages():
+            return
+        cached = {
+            "org_id": self.org_id,
+            "timestamp": time.time(),
+            "packages": {
+                key: [(info.id, str(info.number)) for info in versions]
+                for key, versions in self._installed_packages.items()
+            },
+        }
+        with self._installed_packages_cache_file() as cache_file:
+            with cache_file.open("w") as f:
+                json.dump(cached, f)
 
     def reset_installed_packages(self):
+        """Clears cached installed packages, after packages have been installed
+        or uninstalled."""
         self._installed_packages = None
+        if self._can_cache_installed_packages():
+            with self._installed_packages_cache_file() as cache_file:
+                if cache_file.exists():
+                    cache_file.unlink()
 
     def save(self):
         assert self.keychain, "Keychain was not set on OrgConfig"
@@ -311,6 +414,9 @@ class OrgConfig(BaseConfig):
 
     def get_orginfo_cache_dir(self, cachename):
         "Returns a context managed FSResource object"
+        # pyfilesystem is slow to import, so defer it until a cache is needed
+        from cumulusci.utils.fileutils import open_fs_resource
+
         assert self.keychain, "Keychain should be set"
         if self.global_org:
             cache_dir = self.keychain.global_config_dir
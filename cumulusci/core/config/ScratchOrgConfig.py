@@ -2,6 +2,7 @@ import datetime
 import json
 import os
 import re
+from collections import namedtuple
 
 import sarge
 
@@ -10,9 +11,18 @@ from cumulusci.core.config import FAILED_TO_CREATE_SCRATCH_ORG
 from cumulusci.core.config import SfdxOrgConfig
 from cumulusci.core.exceptions import ScratchOrgException
 from cumulusci.core.exceptions import ServiceNotConfigured
+from cumulusci.core.utils import hash_dependencies
+from cumulusci.core.utils import process_bool_arg
 
 nl = "\n"  # fstrings can't contain backslashes
 
+# Org snapshot names are limited to 15 characters. The snapshot name from the
+# scratch org config is followed by as much of the dependencies hash as fits.
+SNAPSHOT_NAME_MAX_LENGTH = 15
+SNAPSHOT_PREFIX_MAX_LENGTH = 7
+
+DependencySnapshot = namedtuple("DependencySnapshot", ["name", "dependencies_hash"])
+
 
 class ScratchOrgConfig(SfdxOrgConfig):
     """ Salesforce DX Scratch org configuration """
@@ -67,6 +77,53 @@ class ScratchOrgConfig(SfdxOrgConfig):
             org_def_data = json.load(org_def)
             org_def_has_email = "adminEmail" in org_def_data
 
+        # Only orgs created from a snapshot have the dependencies installed
+        self.config.pop("dependencies_hash", None)
+        stdout = stderr = None
+        snapshot = self.get_dependency_snapshot()
+        if snapshot is not None:
+            try:
+                stdout, stderr = self._sfdx_org_create(org_def_has_email, snapshot)
+            except ScratchOrgException as e:
+                self.logger.warning(
+                    f"Could not create scratch org from snapshot {snapshot.name}; "
+                    f"creating it without the snapshot instead.{nl}{e}"
+                )
+            else:
+                self.logger.info(
+                    f"Created scratch org from snapshot {snapshot.name}, "
+                    "which already has the project's dependencies installed."
+                )
+                self.config["dependencies_hash"] = snapshot.dependencies_hash
+        if stdout is None:
+            stdout, stderr = self._sfdx_org_create(org_def_has_email)
+
+        re_obj = re.compile("Successfully created scratch org: (.+), username: (.+)")
+        username = None
+        for line in stdout:
+            match = re_obj.search(line)
+            if match:
+                self.config["org_id"] = match.group(1)
+                self.config["username"] = username = match.group(2)
+            self.logger.info(line)
+        for line in stderr:
+            self.logger.error(line)
+
+        if username is None:
+            raise ScratchOrgException(
+                "SFDX claimed to be successful but there was no username "
+                "in the output...maybe there was a gack?"
+            )
+
+        self.config["date_created"] = datetime.datetime.utcnow()
+
+        if self.config.get("set_password"):
+            self.generate_password()
+
+        # Flag that this org has been created
+        self.config["created"] = True
+
+    def _sfdx_org_create(self, org_def_has_email, snapshot=None):
         devhub = self._choose_devhub()
         instance = self.instance or os.environ.get("SFDX_SIGNUP_INSTANCE")
         options = {
@@ -83,12 +140,13 @@ class ScratchOrgConfig(SfdxOrgConfig):
             else "",
             "default": " -s" if self.default else "",
             "instance": f" instance={instance}" if instance else "",
+            "snapshot": f" snapshot={snapshot.name}" if snapshot else "",
             "extraargs": os.environ.get("SFDX_ORG_CREATE_ARGS", ""),
         }
 
         # This feels a little dirty, but the use cases for extra args would mostly
         # work best with env vars
-        command = "force:org:create -f {config_file}{devhub}{namespaced}{days}{alias}{default}{wait}{email}{instance} {extraargs}".format(
+        command = "force:org:create -f {config_file}{devhub}{namespaced}{days}{alias}{default}{wait}{email}{instance}{snapshot} {extraargs}".format(
             **options
         )
         p = sfdx(command, username=None, log_note="Creating scratch org")
@@ -99,31 +157,74 @@ class ScratchOrgConfig(SfdxOrgConfig):
         if p.returncode:
             message = f"{FAILED_TO_CREATE_SCRATCH_ORG}: \n{nl.join(stdout)}\n{nl.join(stderr)}"
             raise ScratchOrgException(message)
-
-        re_obj = re.compile("Successfully created scratch org: (.+), username: (.+)")
-        username = None
-        for line in stdout:
-            match = re_obj.search(line)
-            if match:
-                self.config["org_id"] = match.group(1)
-                self.config["username"] = username = match.group(2)
-            self.logger.info(line)
-        for line in stderr:
-            self.logger.error(line)
-
-        if username is None:
+        return stdout, stderr
+
+    def get_dependency_snapshot(self):
+        """Returns the org snapshot which has the project's current dependencies
+        installed in this org shape, or None if the scratch org config doesn't
+        declare a snapshot.
+
+        The snapshot name is the `snapshot` from the scratch org config
+        followed by a hash of the project's static dependencies, so it
+        changes whenever the resolved dependencies do. The dependencies are
+        resolved with the scratch org config's `snapshot_options`, which
+        must match the options of the `update_dependencies` step that
+        installs them (`include_beta`, `ignore_dependencies` and
+        `prefer_2gp_from_release_branch`).
+        """
+        if not self.snapshot or self.keychain is None:
+            return None
+        if len(self.snapshot) > SNAPSHOT_PREFIX_MAX_LENGTH:
             raise ScratchOrgException(
-                "SFDX claimed to be successful but there was no username "
-                "in the output...maybe there was a gack?"
+                f"Snapshot name {self.snapshot} for scratch org config "
+                f"{self.config_name} must be at most "
+                f"{SNAPSHOT_PREFIX_MAX_LENGTH} characters."
+            )
+        options = self.snapshot_options or {}
+        dependencies = self.keychain.project_config.get_static_dependencies(
+            include_beta=process_bool_arg(options.get("include_beta", False)),
+            ignore_deps=options.get("ignore_dependencies"),
+            match_release_branch=process_bool_arg(
+                options.get("prefer_2gp_from_release_branch", False)
+            ),
+        )
+        if not dependencies:
+            return None
+        dependencies_hash = hash_dependencies(dependencies)
+        name = f"{self.snapshot}{dependencies_hash}"[:SNAPSHOT_NAME_MAX_LENGTH]
+        return DependencySnapshot(name, dependencies_hash)
+
+    def create_dependency_snapshot(self):
+        """Uses sfdx force:org:snapshot:create to snapshot this org
+        for creating new orgs with the same dependencies."""
+        snapshot = self.get_dependency_snapshot()
+        if snapshot is None:
+            raise ScratchOrgException(
+                f"Scratch org config {self.config_name} does not declare a snapshot, "
+                "or the project has no dependencies."
             )
 
-        self.config["date_created"] = datetime.datetime.utcnow()
-
-        if self.config.get("set_password"):
-            self.generate_password()
+        devhub = self._choose_devhub()
+        command = sarge.shell_format(
+            "force:org:snapshot:create --sourceorg {0!s} --snapshotname {1!s}",
+            self.org_id,
+            snapshot.name,
+        )
+        if devhub:
+            command += f" --targetdevhubusername {devhub}"
+        p = sfdx(command, username=None, log_note="Creating org snapshot")
 
-        # Flag that this org has been created
-        self.config["created"] = True
+        stderr = [line.strip() for line in p.stderr_text]
+        stdout = [line.strip() for line in p.stdout_text]
+        if p.returncode:
+            message = (
+                f"Failed to create org snapshot: \n{nl.join(stdout)}\n{nl.join(stderr)}"
+            )
+            raise ScratchOrgException(message)
+        for line in stdout:
+            self.logger.info(line)
+        self.config["dependencies_hash"] = snapshot.dependencies_hash
+        return snapshot
 
     def _choose_devhub(self):
         """Determine which devhub to specify when calling sfdx, if any."""
@@ -204,3 +305,4 @@ class ScratchOrgConfig(SfdxOrgConfig):
         self.config["username"] = None
         self.config["date_created"] = None
         self.config["instance_url"] = None
+        self.config.pop("dependencies_hash", None)
@@ -1,8 +1,13 @@
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from distutils.version import LooseVersion
+import copy
+import hashlib
 import io
 import json
 import os
 import re
+import threading
 from pathlib import Path
 from configparser import ConfigParser
 from itertools import chain
@@ -13,7 +18,10 @@ API_VERSION_RE = re.compile(r"^\d\d+\.0$")
 import github3
 import yaml
 
+from cumulusci.core.utils import get_config_cache_key
+from cumulusci.core.utils import load_cached_config
 from cumulusci.core.utils import merge_config
+from cumulusci.core.utils import save_cached_config
 from cumulusci.core.config import BaseTaskFlowConfig
 from cumulusci.core.exceptions import (
     ConfigError,
@@ -35,6 +43,7 @@ from cumulusci.core.source import GitHubSource
 from cumulusci.core.source import LocalFolderSource
 from cumulusci.core.source import NullSource
 from cumulusci.utils.git import (
+    COMMIT_SHA_RE,
     current_branch,
     git_path,
     is_release_branch_or_child,
@@ -42,10 +51,12 @@ from cumulusci.utils.git import (
     get_release_identifier,
 )
 from cumulusci.utils.yaml.cumulusci_yml import cci_safe_load
-from cumulusci.utils.fileutils import open_fs_resource
 
 from github3.exceptions import NotFoundError
 
+# Number of GitHub dependencies at the same level which are resolved concurrently
+GITHUB_DEPENDENCY_WORKERS = 4
+
 
 class BaseProjectConfig(BaseTaskFlowConfig):
     """ Base class for a project's configuration which extends the global config """
@@ -77,6 +88,13 @@ class BaseProjectConfig(BaseTaskFlowConfig):
         self.source = NullSource()
         self.included_sources = kwargs.pop("included_sources", {})
 
+        # GitHub dependencies resolved during this run
+        self._resolved_github_dependencies = {}
+        self._github_repo_contents = {}
+        self._github_dependency_lock = threading.Lock()
+        # Keys of dependencies being resolved -> keys they are waiting on
+        self._github_dependency_waits = {}
+
         super(BaseProjectConfig, self).__init__(config=config)
 
     @property
@@ -106,6 +124,40 @@ class BaseProjectConfig(BaseTaskFlowConfig):
                 f"The file {self.config_filename} was not found in the repo root: {repo_root}. Are you in a CumulusCI Project directory?"
             )
 
+        # Reuse the merged config from a previous run if no file changed
+        cache_path = self.universal_config_obj.config_cache_path(
+            "project_" + hashlib.sha1(repo_root.encode("utf-8")).hexdigest()
+        )
+        cache_key = get_config_cache_key(
+            [
+                self.universal_config_obj.config_universal_path,
+                self.universal_config_obj.config_global_path,
+                self.config_project_path,
+            ],
+            self.additional_yaml,
+        )
+        cached = load_cached_config(cache_path, cache_key)
+        if cached is not None:
+            (
+                project_config,
+                local_cache_key,
+                local_config,
+                additional_config,
+                config,
+            ) = cached
+            self.config_project.update(project_config)
+            # The local config's location depends on the project name,
+            # so it can only be checked once the project config is known.
+            if local_cache_key == get_config_cache_key(
+                [self.config_project_local_path]
+            ):
+                self.config_project_local.update(local_config)
+                self.config_additional_yaml.update(additional_config)
+                self.config = config
+                self._validate_config()
+                return
+            self.config_project.clear()
+
         # Load the project's yaml config file
         with open(self.config_project_path, "r", encoding="utf-8") as f_config:
             project_config = cci_safe_load(f_config)
@@ -114,6 +166,7 @@ class BaseProjectConfig(BaseTaskFlowConfig):
             self.config_project.update(project_config)
 
         # Load the local project yaml config file if it exists
+        local_cache_key = get_config_cache_key([self.config_project_local_path])
         if self.config_project_local_path:
             with open(
                 self.config_project_local_path, "r", encoding="utf-8"
@@ -137,6 +190,17 @@ class BaseProjectConfig(BaseTaskFlowConfig):
                 "additional_yaml": self.config_additional_yaml,
             }
         )
+        save_cached_config(
+            cache_path,
+            cache_key,
+            (
+                self.config_project,
+                local_cache_key,
+                self.config_project_local,
+                self.config_additional_yaml,
+                self.config,
+            ),
+        )
 
         self._validate_config()
 
@@ -624,21 +688,45 @@ class BaseProjectConfig(BaseTaskFlowConfig):
         if not dependencies:
             return []
 
+        return self._get_static_dependencies(
+            dependencies, include_beta, ignore_deps, match_release_branch, ()
+        )
+
+    def _get_static_dependencies(
+        self, dependencies, include_beta, ignore_deps, match_release_branch, parents
+    ):
+        dependencies = [
+            dependency
+            for dependency in dependencies
+            if not self._should_ignore_dependency(dependency, ignore_deps)
+        ]
+        github_dependencies = [
+            dependency for dependency in dependencies if "github" in dependency
+        ]
+
+        def process(dependency):
+            return self._resolve_github_dependency(
+                dependency,
+                include_beta=include_beta,
+                ignore_deps=ignore_deps,
+                match_release_branch=match_release_branch,
+                parents=parents,
+            )
+
+        # Resolve GitHub dependencies concurrently, keeping them in order
+        if len(github_dependencies) > 1:
+            with ThreadPoolExecutor(max_workers=GITHUB_DEPENDENCY_WORKERS) as executor:
+                resolved = list(executor.map(process, github_dependencies))
+        else:
+            resolved = [process(dependency) for dependency in github_dependencies]
+        resolved.reverse()
+
         static_dependencies = []
         for dependency in dependencies:
-            if self._should_ignore_dependency(dependency, ignore_deps):
-                continue
-
             if "github" not in dependency:
                 static_dependencies.append(dependency)
             else:
-                static = self.process_github_dependency(
-                    dependency,
-                    include_beta=include_beta,
-                    ignore_deps=ignore_deps,
-                    match_release_branch=match_release_branch,
-                )
-                static_dependencies.extend(static)
+                static_dependencies.extend(resolved.pop())
         return static_dependencies
 
     def _should_ignore_dependency(self, dependency, ignore_deps):
@@ -678,13 +766,178 @@ class BaseProjectConfig(BaseTaskFlowConfig):
                 prefix = f"{' ' * indent}    "
         return pretty
 
-    def process_github_dependency(  # noqa: C901
+    def process_github_dependency(
+        self,
+        dependency,
+        indent=None,
+        include_beta=None,
+        ignore_deps=None,
+        match_release_branch=None,
+    ):
+        """Resolves a GitHub dependency into a list of static dependencies.
+
+        Results are reused for the same dependency during the life of this
+        project config, so dependencies shared by several packages in the
+        tree are only resolved once."""
+        return self._resolve_github_dependency(
+            dependency,
+            indent=indent,
+            include_beta=include_beta,
+            ignore_deps=ignore_deps,
+            match_release_branch=match_release_branch,
+        )
+
+    def _resolve_github_dependency(
+        self,
+        dependency,
+        indent=None,
+        include_beta=None,
+        ignore_deps=None,
+        match_release_branch=None,
+        parents=(),
+    ):
+        key = json.dumps(
+            [dependency, include_beta, ignore_deps, match_release_branch],
+            sort_keys=True,
+            default=str,
+        )
+        if key in parents:
+            raise DependencyResolutionError(
+                f"Dependency cycle found while resolving {dependency['github']}"
+            )
+        waiter = parents[-1] if parents else None
+        with self._github_dependency_lock:
+            future = self._resolved_github_dependencies.get(key)
+            resolve = future is None
+            if resolve:
+                future = self._resolved_github_dependencies[key] = Future()
+            if waiter is not None:
+                self._github_dependency_waits.setdefault(waiter, set()).add(key)
+                # Another branch of the tree may be resolving this dependency
+                # while waiting on one of our parents; waiting on it would
+                # never finish.
+                if not resolve and not future.done() and self._waits_on(key, waiter):
+                    self._github_dependency_waits[waiter].discard(key)
+                    raise DependencyResolutionError(
+                        f"Dependency cycle found while resolving {dependency['github']}"
+                    )
+
+        try:
+            if resolve:
+                try:
+                    future.set_result(
+                        self._process_github_dependency(
+                            dependency,
+                            indent=indent,
+                            include_beta=include_beta,
+                            ignore_deps=ignore_deps,
+                            match_release_branch=match_release_branch,
+                            parents=parents + (key,),
+                        )
+                    )
+                except Exception as e:
+                    with self._github_dependency_lock:
+                        del self._resolved_github_dependencies[key]
+                    future.set_exception(e)
+            return copy.deepcopy(future.result())
+        finally:
+            if waiter is not None:
+                with self._github_dependency_lock:
+                    self._github_dependency_waits[waiter].discard(key)
+
+    def _waits_on(self, key, target):
+        """Returns True if resolving key is (transitively) waiting on target.
+
+        Must be called while holding _github_dependency_lock."""
+        seen = set()
+        pending = [key]
+        while pending:
+            current = pending.pop()
+            if current == target:
+                return True
+            if current not in seen:
+                seen.add(current)
+                pending.extend(self._github_dependency_waits.get(current, ()))
+        return False
+
+    def _get_github_repo_contents(self, repo, ref):
+        """Returns the parts of a GitHub repository at ref which are used to
+        resolve it as a dependency.
+
+        Contents at a commit SHA can't change, so they are also stored in the
+        project cache and reused by later commands."""
+        key = (str(repo.owner), repo.name, ref)
+        repo_contents = self._github_repo_contents.get(key)
+        if repo_contents is None:
+            repo_contents = self._load_github_repo_contents(key)
+        if repo_contents is None:
+            contents = repo.file_contents("cumulusci.yml", ref=ref)
+            repo_contents = {
+                "cumulusci_yml": contents.decoded.decode("utf-8"),
+                "unpackaged/pre": self._list_github_subfolders(
+                    repo, "unpackaged/pre", ref
+                ),
+                "unpackaged/post": self._list_github_subfolders(
+                    repo, "unpackaged/post", ref
+                ),
+            }
+            self._store_github_repo_contents(key, repo_contents)
+        self._github_repo_contents[key] = repo_contents
+        return repo_contents
+
+    def _list_github_subfolders(self, repo, path, ref):
+        try:
+            contents = repo.directory_contents(path, return_as=dict, ref=ref)
+        except NotFoundError:
+            return []
+        return list(contents.keys()) if contents else []
+
+    def _github_repo_has_src(self, repo, ref, repo_contents):
+        # Only checked for unmanaged dependencies
+        if "src" not in repo_contents:
+            repo_contents["src"] = bool(repo.directory_contents("src", ref=ref))
+            self._store_github_repo_contents(
+                (str(repo.owner), repo.name, ref), repo_contents
+            )
+        return repo_contents["src"]
+
+    @contextmanager
+    def _github_repo_contents_file(self, key):
+        owner, name, ref = key
+        with self.open_cache("github_dependencies") as cache:
+            yield cache / f"{owner}__{name}__{ref}.json"
+
+    def _can_cache_github_repo_contents(self, key):
+        ref = key[2]
+        return bool(self.repo_root and ref and COMMIT_SHA_RE.match(ref))
+
+    def _load_github_repo_contents(self, key):
+        if not self._can_cache_github_repo_contents(key):
+            return None
+        with self._github_repo_contents_file(key) as cache_file:
+            if not cache_file.exists():
+                return None
+            with cache_file.open("r") as f:
+                try:
+                    return json.load(f)
+                except ValueError:
+                    return None
+
+    def _store_github_repo_contents(self, key, repo_contents):
+        if not self._can_cache_github_repo_contents(key):
+            return
+        with self._github_repo_contents_file(key) as cache_file:
+            with cache_file.open("w") as f:
+                json.dump(repo_contents, f)
+
+    def _process_github_dependency(  # noqa: C901
         self,
         dependency,
         indent=None,
         include_beta=None,
         ignore_deps=None,
         match_release_branch=None,
+        parents=(),
     ):
         if not indent:
             indent = ""
@@ -715,9 +968,9 @@ class BaseProjectConfig(BaseTaskFlowConfig):
             match_release_branch=match_release_branch,
         )
 
-        # Get the cumulusci.yml file
-        contents = repo.file_contents("cumulusci.yml", ref=ref)
-        cumulusci_yml = cci_safe_load(io.StringIO(contents.decoded.decode("utf-8")))
+        # Get the cumulusci.yml file and the folders to deploy
+        repo_contents = self._get_github_repo_contents(repo, ref)
+        cumulusci_yml = cci_safe_load(io.StringIO(repo_contents["cumulusci_yml"]))
 
         # Get the namespace from the cumulusci.yml if set
         package_config = cumulusci_yml.get("project", {}).get("package", {})
@@ -733,14 +986,9 @@ class BaseProjectConfig(BaseTaskFlowConfig):
 
         # Look for subfolders under unpackaged/pre
         unpackaged_pre = []
-        try:
-            contents = repo.directory_contents(
-                "unpackaged/pre", return_as=dict, ref=ref
-            )
-        except NotFoundError:
-            contents = None
+        contents = repo_contents["unpackaged/pre"]
         if contents:
-            for dirname in list(contents.keys()):
+            for dirname in contents:
                 subfolder = f"unpackaged/pre/{dirname}"
                 if subfolder in skip:
                     continue
@@ -762,8 +1010,7 @@ class BaseProjectConfig(BaseTaskFlowConfig):
         # Look for metadata under src (deployed if no namespace)
         unmanaged_src = None
         if unmanaged or not namespace:
-            contents = repo.directory_contents("src", ref=ref)
-            if contents:
+            if self._github_repo_has_src(repo, ref, repo_contents):
                 subfolder = "src"
 
                 unmanaged_src = {
@@ -779,14 +1026,9 @@ class BaseProjectConfig(BaseTaskFlowConfig):
 
         # Look for subfolders under unpackaged/post
         unpackaged_post = []
-        try:
-            contents = repo.directory_contents(
-                "unpackaged/post", return_as=dict, ref=ref
-            )
-        except NotFoundError:
-            contents = None
+        contents = repo_contents["unpackaged/post"]
         if contents:
-            for dirname in list(contents.keys()):
+            for dirname in contents:
                 subfolder = f"unpackaged/post/{dirname}"
                 if subfolder in skip:
                     continue
@@ -813,8 +1055,8 @@ class BaseProjectConfig(BaseTaskFlowConfig):
         project = cumulusci_yml.get("project", {})
         dependencies = project.get("dependencies")
         if dependencies:
-            dependencies = self.get_static_dependencies(
-                dependencies, include_beta=include_beta, ignore_deps=ignore_deps
+            dependencies = self._get_static_dependencies(
+                dependencies, include_beta, ignore_deps, None, parents
             )
 
         # Create the final ordered list of all parsed dependencies
@@ -953,6 +1195,8 @@ class BaseProjectConfig(BaseTaskFlowConfig):
     @contextmanager
     def open_cache(self, cache_name):
         "A context managed PyFilesystem-based cache which could theoretically be on any filesystem."
+        from cumulusci.utils.fileutils import open_fs_resource
+
         with open_fs_resource(self.cache_dir) as cache_dir:
             cache = cache_dir / cache_name
             cache.mkdir(exist_ok=True)
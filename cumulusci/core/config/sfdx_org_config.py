@@ -1,7 +1,11 @@
 import datetime
 import json
+import re
+import time
 from json.decoder import JSONDecodeError
 
+import requests
+
 from cumulusci.core.config import OrgConfig
 from cumulusci.core.exceptions import SfdxOrgException
 from cumulusci.core.sfdx import sfdx
@@ -9,6 +13,17 @@ from cumulusci.utils import get_git_config
 
 nl = "\n"  # fstrings can't contain backslashes
 
+# Org info from the Salesforce CLI (including the access token) is reused
+# for this many seconds before it is refreshed
+SFDX_INFO_CACHE_SECONDS = 60 * 60
+# force://<client id>:<client secret>:<refresh token>@<instance url>
+# (older versions of the CLI omit the client id and secret)
+SFDX_AUTH_URL_RE = re.compile(
+    r"^force://(?:(?P<client_id>[^:@]*):(?P<client_secret>[^:@]*):)?"
+    r"(?P<refresh_token>[^@]+)@(?P<instance_url>.+)$"
+)
+SFDX_DEFAULT_CLIENT_ID = "PlatformCLI"
+
 
 class SfdxOrgConfig(OrgConfig):
     """Org config which loads from sfdx keychain"""
@@ -25,11 +40,15 @@ class SfdxOrgConfig(OrgConfig):
         username = self.config.get("username")
         assert username is not None, "SfdxOrgConfig must have a username"
 
+        if self._load_cached_sfdx_info(username):
+            return self._sfdx_info
+
         self.logger.info(f"Getting org info from Salesforce CLI for {username}")
 
         # Call force:org:display and parse output to get instance_url and
-        # access_token
-        p = sfdx("force:org:display --json", self.username)
+        # access_token. --verbose includes the sfdxAuthUrl, which lets us
+        # refresh the access token later without calling sfdx again.
+        p = sfdx("force:org:display --verbose --json", self.username)
 
         org_info = None
         stderr_list = [line.strip() for line in p.stderr_text]
@@ -63,18 +82,85 @@ class SfdxOrgConfig(OrgConfig):
         }
         if org_info["result"].get("password"):
             sfdx_info["password"] = org_info["result"]["password"]
-        self._sfdx_info = sfdx_info
-        self._sfdx_info_date = datetime.datetime.utcnow()
-        self.config.update(sfdx_info)
-
         sfdx_info.update(
             {
                 "created_date": org_info["result"].get("createdDate"),
                 "expiration_date": org_info["result"].get("expirationDate"),
             }
         )
+        cached = {
+            "sfdx_info": sfdx_info,
+            "auth_url": org_info["result"].get("sfdxAuthUrl"),
+            "fetched": time.time(),
+        }
+        self._set_sfdx_info(cached)
+        if self.keychain is not None:
+            self.keychain.set_sfdx_org_info(username, cached)
         return sfdx_info
 
+    def _set_sfdx_info(self, cached):
+        sfdx_info = cached["sfdx_info"]
+        self._sfdx_info = sfdx_info
+        self._sfdx_info_date = datetime.datetime.utcfromtimestamp(cached["fetched"])
+        self.config.update(
+            {
+                key: value
+                for key, value in sfdx_info.items()
+                if key not in ("created_date", "expiration_date")
+            }
+        )
+
+    def _load_cached_sfdx_info(self, username):
+        """Use org info cached in the keychain by an earlier cci process.
+
+        If the cached access token is too old, try to refresh it using the
+        refresh token from the Salesforce CLI. Returns False if the org info
+        needs to be fetched from sfdx instead.
+        """
+        if self.keychain is None:
+            return False
+        cached = self.keychain.get_sfdx_org_info(username)
+        if not cached:
+            return False
+        if time.time() - cached["fetched"] > SFDX_INFO_CACHE_SECONDS:
+            if not self._refresh_cached_access_token(cached):
+                return False
+            self.keychain.set_sfdx_org_info(username, cached)
+        self._set_sfdx_info(cached)
+        return True
+
+    def _refresh_cached_access_token(self, cached):
+        """Refresh the access token in cached org info via the OAuth2 refresh token flow"""
+        match = SFDX_AUTH_URL_RE.match(cached.get("auth_url") or "")
+        if match is None:
+            return False
+        instance_url = match["instance_url"]
+        if "://" not in instance_url:
+            instance_url = f"https://{instance_url}"
+        sf_oauth = self.SalesforceOAuth2(
+            match["client_id"] or SFDX_DEFAULT_CLIENT_ID,
+            match["client_secret"] or "",
+            None,  # Callback url isn't used for this call
+            auth_site=instance_url,
+        )
+        try:
+            resp = sf_oauth.refresh_token(match["refresh_token"])
+        except requests.exceptions.RequestException as e:
+            self.logger.debug(f"Error refreshing OAuth token: {e}")
+            return False
+        if resp.status_code != 200:
+            self.logger.debug(f"Error refreshing OAuth token: {resp.text}")
+            return False
+
+        token_info = resp.json()
+        sfdx_info = cached["sfdx_info"]
+        sfdx_info["access_token"] = token_info["access_token"]
+        sfdx_info["instance_url"] = token_info.get(
+            "instance_url", sfdx_info["instance_url"]
+        )
+        cached["fetched"] = time.time()
+        return True
+
     @property
     def access_token(self):
         return self.sfdx_info["access_token"]
@@ -201,11 +287,13 @@ class SfdxOrgConfig(OrgConfig):
         if hasattr(self, "_sfdx_info"):
             # Cache the sfdx_info for 1 hour to avoid unnecessary calls out to sfdx CLI
             delta = datetime.datetime.utcnow() - self._sfdx_info_date
-            if delta.total_seconds() > 3600:
+            if delta.total_seconds() > SFDX_INFO_CACHE_SECONDS:
                 del self._sfdx_info
 
-                # Force a token refresh
-                self.force_refresh_oauth_token()
+                # Force a token refresh, unless another process already
+                # refreshed it or we can refresh it ourselves
+                if not self._load_cached_sfdx_info(self.config.get("username")):
+                    self.force_refresh_oauth_token()
 
         # Get org info via sfdx force:org:display
         self.sfdx_info
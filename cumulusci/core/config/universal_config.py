@@ -3,7 +3,10 @@ import os
 import yaml
 from pathlib import Path
 
+from cumulusci.core.utils import get_config_cache_key
+from cumulusci.core.utils import load_cached_config
 from cumulusci.core.utils import merge_config
+from cumulusci.core.utils import save_cached_config
 from cumulusci.core.config.project_config import BaseProjectConfig
 from cumulusci.core.config import BaseTaskFlowConfig
 
@@ -63,6 +66,20 @@ class UniversalConfig(BaseTaskFlowConfig):
         if UniversalConfig.config is not None:
             return
 
+        # reuse the merged config from a previous run if no file changed
+        cache_path = self.config_cache_path("universal")
+        cache_key = get_config_cache_key(
+            [self.config_universal_path, self.config_global_path]
+        )
+        cached = load_cached_config(cache_path, cache_key)
+        if cached is not None:
+            (
+                UniversalConfig.config_universal,
+                UniversalConfig.config_global,
+                UniversalConfig.config,
+            ) = cached
+            return
+
         # load the global config
         with open(self.config_universal_path, "r", encoding="utf-8") as f_config:
             config = yaml.safe_load(f_config)
@@ -82,3 +99,16 @@ class UniversalConfig(BaseTaskFlowConfig):
                 "global_config": UniversalConfig.config_global,
             }
         )
+        save_cached_config(
+            cache_path,
+            cache_key,
+            (
+                UniversalConfig.config_universal,
+                UniversalConfig.config_global,
+                UniversalConfig.config,
+            ),
+        )
+
+    def config_cache_path(self, name):
+        """Returns the path where a merged config called name is cached."""
+        return self.cumulusci_config_dir / "config_cache" / f"{name}.pickle"
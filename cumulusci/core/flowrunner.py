@@ -27,7 +27,8 @@ Upon initialization, FlowRunner:
 Upon running the flow, FlowRunner:
 
 - Refreshes the org credentials
-- Runs each StepSpec in order
+- Runs each StepSpec in order (or, for flows with ``parallel`` set, runs
+  top-level steps concurrently once the steps they depend on have completed)
 - * Logs the task or skip
 - * Updates any ^^ task option values with return_values references
 - * Creates a TaskRunner to run the task and get the result
@@ -58,10 +59,18 @@ try:
 except ImportError:  # pragma: no cover
     pass
 
+import contextlib
 import copy
+import hashlib
+import json
 import logging
+import threading
 from collections import defaultdict
 from collections import namedtuple
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
 from distutils.version import LooseVersion
 from operator import attrgetter
 
@@ -70,11 +79,13 @@ from jinja2.sandbox import ImmutableSandboxedEnvironment
 from cumulusci.core.config import TaskConfig
 from cumulusci.core.config import FlowConfig
 from cumulusci.core.exceptions import FlowConfigError, FlowInfiniteLoopError
+from cumulusci.core.github import github_api_cache_stats
 from cumulusci.core.utils import import_global
 
 # TODO: define exception types: flowfailure, taskimporterror, etc?
 
 RETURN_VALUE_OPTION_PREFIX = "^^"
+DEFAULT_PARALLEL_WORKERS = 4
 
 jinja2_env = ImmutableSandboxedEnvironment()
 
@@ -210,6 +221,106 @@ class FlowCallback(object):
         pass
 
 
+class StepLogBuffer(logging.Handler):
+    """Collects log records from steps running on worker threads.
+
+    While a step runs in parallel mode its records are held per thread
+    and passed on to the `target` logger together when the step finishes,
+    so that the output of each step is not interleaved with other steps.
+    Records from threads which are not buffering are passed on immediately.
+    """
+
+    def __init__(self, target):
+        super().__init__()
+        self.target = target
+        self._local = threading.local()
+
+    def emit(self, record):
+        records = getattr(self._local, "records", None)
+        if records is None:
+            self.target.handle(record)
+        else:
+            records.append(record)
+
+    @contextlib.contextmanager
+    def buffer(self):
+        self._local.records = []
+        try:
+            yield
+        finally:
+            records = self._local.records
+            self._local.records = None
+            for record in records:
+                self.target.handle(record)
+
+
+class FlowJournal(object):
+    """Records the steps which completed successfully in an org.
+
+    Each entry is keyed by a hash of the task class, its options, the
+    fingerprint returned by the task and the org id, so a step is only
+    considered unchanged if all of those match a previous successful run.
+    """
+
+    def __init__(self, org_config):
+        self.org_config = org_config
+        self._lock = threading.Lock()
+        self._entries = None
+
+    @contextlib.contextmanager
+    def _journal_file(self):
+        with self.org_config.get_orginfo_cache_dir("flow_journal") as cache:
+            yield cache / "journal.json"
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = {}
+            with self._journal_file() as journal_file:
+                if journal_file.exists():
+                    with journal_file.open("r") as f:
+                        try:
+                            self._entries = json.load(f)
+                        except ValueError:
+                            pass
+        return self._entries
+
+    def get_key(self, task):
+        """Returns the journal key for a task, or None if it is not cacheable."""
+        fingerprint = task.get_fingerprint()
+        if fingerprint is None:
+            return None
+        key = json.dumps(
+            {
+                "class_path": task.task_config.class_path,
+                "options": task.options,
+                "fingerprint": fingerprint,
+                "org_id": self.org_config.org_id,
+            },
+            default=str,
+            sort_keys=True,
+        )
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            return self._load().get(key)
+
+    def record(self, key, step, return_values):
+        try:
+            json.dumps(return_values)
+        except TypeError:
+            # Results which can't be restored must be produced by running the task
+            return
+        with self._lock:
+            self._load()[key] = {
+                "path": step.path,
+                "return_values": return_values,
+            }
+            with self._journal_file() as journal_file:
+                with journal_file.open("w") as f:
+                    json.dump(self._entries, f)
+
+
 class TaskRunner(object):
     """TaskRunner encapsulates the job of instantiating and running a task."""
 
@@ -245,12 +356,40 @@ class TaskRunner(object):
             flow=self.flow,
         )
         self._log_options(task)
+
+        journal = getattr(self.flow, "journal", None)
+        journal_key = None
+        if journal is not None:
+            skip_unchanged = self.flow.skip_unchanged
+            try:
+                journal_key = journal.get_key(task)
+            except Exception as e:
+                if skip_unchanged:
+                    self.flow.logger.warning(
+                        f"Could not determine whether {self.step.path} has changed: {e}"
+                    )
+            entry = journal.get(journal_key) if journal_key and skip_unchanged else None
+            if entry is not None:
+                self.flow.logger.info(
+                    f"Skipping {self.step.path}: unchanged since its last successful run"
+                )
+                return StepResult(
+                    self.step.step_num,
+                    self.step.task_name,
+                    self.step.path,
+                    None,
+                    entry["return_values"],
+                    None,
+                )
+
         exc = None
         try:
             task()
         except Exception as e:
             self.flow.logger.error(f"Exception in task {self.step.path}")
             exc = e
+        if exc is None and journal_key:
+            journal.record(journal_key, self.step, task.return_values)
         return StepResult(
             self.step.step_num,
             self.step.task_name,
@@ -279,11 +418,14 @@ class FlowCoordinator(object):
         options=None,
         skip=None,
         callbacks=None,
+        skip_unchanged=False,
     ):
         self.project_config = project_config
         self.flow_config = flow_config
         self.name = name
         self.org_config = None
+        self.skip_unchanged = skip_unchanged
+        self.journal = None
 
         if not callbacks:
             callbacks = FlowCallback()
@@ -392,6 +534,9 @@ class FlowCoordinator(object):
         self._rule(new_line=True)
 
         self._init_org()
+        # Successful steps are always recorded, so that a later run
+        # with skip_unchanged can resume after a failure.
+        self.journal = FlowJournal(org_config)
         self._rule(fill="-")
         self.logger.info("Organization:")
         self.logger.info(f"  Username: {org_config.username}")
@@ -411,14 +556,28 @@ class FlowCoordinator(object):
         self.logger.info("Starting execution")
         self._rule(new_line=True)
 
+        cache_hits, cache_misses = github_api_cache_stats.snapshot()
         try:
-            for step in self.steps:
-                self._run_step(step)
+            if self.flow_config.parallel:
+                self._run_parallel()
+            else:
+                for step in self.steps:
+                    self._run_step(step)
             flow_name = f"'{self.name}' " if self.name else ""
             self.logger.info(f"Completed flow {flow_name}successfully!")
         finally:
+            self._log_github_api_cache_stats(cache_hits, cache_misses)
             self.callbacks.post_flow(self)
 
+    def _log_github_api_cache_stats(self, initial_hits, initial_misses):
+        hits, misses = github_api_cache_stats.snapshot()
+        hits -= initial_hits
+        misses -= initial_misses
+        if hits or misses:
+            self.logger.info(
+                f"GitHub API requests: {hits} answered from cache, {misses} fetched"
+            )
+
     def _run_step(self, step):
         if step.skip:
             self._rule(fill="*")
@@ -454,6 +613,97 @@ class FlowCoordinator(object):
         if result.exception and not step.allow_failure:
             raise result.exception  # PY3: raise an exception type we control *from* this exception instead?
 
+    def _get_parallel_groups(self):
+        """Group the flow's steps by top-level step and resolve their dependencies.
+
+        Each top-level step (a task, or all of the steps of a subflow) runs
+        as one unit. A step may list the top-level step numbers it needs in
+        `depends_on`; otherwise it depends on all of the steps before it.
+
+        :return: OrderedDict of step number -> (list of StepSpecs, set of step numbers)
+        """
+        step_configs = {
+            str(StepVersion(str(number))): step_config
+            for number, step_config in self.flow_config.steps.items()
+        }
+        groups = OrderedDict()
+        for step in self.steps:
+            number = str(step.step_num).split("/")[0]
+            groups.setdefault(number, []).append(step)
+
+        parallel_groups = OrderedDict()
+        previous = []
+        for number, steps in groups.items():
+            depends_on = step_configs.get(number, {}).get("depends_on")
+            if depends_on is None:
+                depends_on = set(previous)
+            else:
+                depends_on = {str(StepVersion(str(dep))) for dep in depends_on}
+                invalid = depends_on - set(previous)
+                if invalid:
+                    raise FlowConfigError(
+                        f"Step {number} depends on {', '.join(sorted(invalid))}, "
+                        "which must be earlier steps in the same flow."
+                    )
+            parallel_groups[number] = (steps, depends_on)
+            previous.append(number)
+        return parallel_groups
+
+    def _run_parallel(self):
+        """Run top-level steps on a pool of workers as their dependencies complete.
+
+        If a step fails (and does not have ignore_failure set), no more steps
+        are started. Steps that are already running are allowed to finish
+        and then the exception is raised.
+        """
+        parallel = self.flow_config.parallel
+        max_workers = DEFAULT_PARALLEL_WORKERS if parallel is True else int(parallel)
+        groups = self._get_parallel_groups()
+        self.logger.info(f"Running steps in parallel with {max_workers} workers")
+
+        log_buffer = StepLogBuffer(self.logger.parent)
+        self.logger.addHandler(log_buffer)
+        self.logger.propagate = False
+
+        def run_group(steps):
+            with log_buffer.buffer():
+                for step in steps:
+                    self._run_step(step)
+
+        pending = list(groups)
+        completed = set()
+        running = {}
+        error = None
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                while pending or running:
+                    if error is None:
+                        for number in list(pending):
+                            steps, depends_on = groups[number]
+                            if depends_on <= completed:
+                                pending.remove(number)
+                                running[executor.submit(run_group, steps)] = number
+                    if not running:
+                        break
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        number = running.pop(future)
+                        exc = future.exception()
+                        if exc is None:
+                            completed.add(number)
+                        elif error is None:
+                            error = exc
+        finally:
+            self.logger.removeHandler(log_buffer)
+            self.logger.propagate = True
+
+        if error is not None:
+            if pending:
+                self.logger.error(
+                    f"Cancelled {len(pending)} outstanding steps: {', '.join(pending)}"
+                )
+            raise error
+
     def _init_logger(self):
         """
         Returns a logging.Logger-like object to use for the duration of the flow. Tasks will receive this logger
@@ -1,8 +1,17 @@
+import contextlib
+import hashlib
 import io
+import json
 import os
 import re
+import threading
+import time
+from pathlib import Path
+from tempfile import NamedTemporaryFile
 
+from requests import Response
 from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
 from requests.packages.urllib3.util.retry import Retry
 
 import github3
@@ -24,6 +33,186 @@ from cumulusci.utils.yaml.cumulusci_yml import cci_safe_load
 retries = Retry(status_forcelist=(401, 502, 503, 504), backoff_factor=0.3)
 adapter = HTTPAdapter(max_retries=retries)
 
+# Largest response body that the GitHub API cache will store.
+GITHUB_API_CACHE_MAX_BODY_SIZE = 1024 * 1024
+# Total size of the GitHub API cache, and how long unused entries are kept.
+GITHUB_API_CACHE_MAX_SIZE = 50 * 1024 * 1024
+GITHUB_API_CACHE_MAX_AGE = 30 * 24 * 60 * 60
+
+# Headers which describe the encoding of the original transfer
+# and must not be replayed for a body that was already decoded.
+_UNCACHED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+class GitHubApiCacheStats:
+    """Counts GitHub API requests answered from the cache (hits)
+    versus those that had to be fetched in full (misses)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self):
+        with self._lock:
+            return self.hits, self.misses
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+github_api_cache_stats = GitHubApiCacheStats()
+
+
+class ConditionalRequestCacheAdapter(HTTPAdapter):
+    """HTTPAdapter which stores GitHub API responses on disk
+    and revalidates them with conditional requests.
+
+    GET responses that carry an ETag or Last-Modified header are stored
+    in cache_dir. When the same URL is requested again, the request is
+    sent with If-None-Match/If-Modified-Since and a 304 response is
+    answered from the stored body. GitHub checks the credentials of the
+    conditional request, so a stored body is only returned to a caller
+    that could read it. GitHub does not count 304 responses against the
+    rate limit.
+
+    Entries unused for GITHUB_API_CACHE_MAX_AGE seconds are removed, as are
+    the least recently used entries once the cache exceeds
+    GITHUB_API_CACHE_MAX_SIZE. This happens the first time each adapter
+    stores a response.
+    """
+
+    def __init__(self, cache_dir, stats=None, **kwargs):
+        super().__init__(**kwargs)
+        self.cache_dir = Path(cache_dir)
+        self.stats = stats or github_api_cache_stats
+        self._pruned = False
+
+    def send(self, request, stream=False, **kwargs):
+        if request.method != "GET" or stream:
+            return super().send(request, stream=stream, **kwargs)
+
+        cache_path = self._get_cache_path(request)
+        cached = self._load(cache_path)
+        if cached:
+            if cached["etag"]:
+                request.headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                request.headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = super().send(request, stream=stream, **kwargs)
+        if cached and response.status_code == 304:
+            self.stats.record(hit=True)
+            # The modification time is used to find unused entries
+            with contextlib.suppress(OSError):
+                os.utime(cache_path)
+            return self._build_cached_response(request, response, cached)
+
+        self.stats.record(hit=False)
+        if response.status_code == 200:
+            self._store(cache_path, response)
+        return response
+
+    def _get_cache_path(self, request):
+        # Credentials are left out of the key so that entries outlive
+        # short-lived tokens such as GitHub App installation tokens.
+        key = json.dumps([request.url, request.headers.get("Accept")])
+        return self.cache_dir / (
+            hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json"
+        )
+
+    def _load(self, cache_path):
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, cache_path, response):
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not (etag or last_modified):
+            return
+        if len(response.content) > GITHUB_API_CACHE_MAX_BODY_SIZE:
+            return
+        try:
+            body = response.content.decode("utf-8")
+        except UnicodeDecodeError:
+            return
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in _UNCACHED_HEADERS
+        }
+        entry = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "headers": headers,
+            "body": body,
+        }
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with NamedTemporaryFile(
+                "w", encoding="utf-8", dir=self.cache_dir, delete=False
+            ) as f:
+                json.dump(entry, f)
+            os.replace(f.name, cache_path)
+        except OSError:
+            # The cache is an optimization; never fail a request over it.
+            return
+        if not self._pruned:
+            self._pruned = True
+            self._prune(GITHUB_API_CACHE_MAX_SIZE, GITHUB_API_CACHE_MAX_AGE)
+
+    def _prune(self, max_size, max_age):
+        entries = []
+        for entry_path in self.cache_dir.glob("*.json"):
+            try:
+                stat = entry_path.stat()
+            except FileNotFoundError:  # removed by another process
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+        entries.sort(reverse=True)
+
+        oldest = time.time() - max_age
+        total_size = 0
+        for mtime, size, entry_path in entries:
+            if mtime < oldest or total_size + size > max_size:
+                with contextlib.suppress(FileNotFoundError):
+                    entry_path.unlink()
+            else:
+                total_size += size
+
+    def _build_cached_response(self, request, not_modified, cached):
+        response = Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.elapsed = not_modified.elapsed
+        response.headers = CaseInsensitiveDict(cached["headers"])
+        # Keep the fresh rate limit and caching headers from the 304.
+        response.headers.update(
+            (name, value)
+            for name, value in not_modified.headers.items()
+            if name.lower() not in _UNCACHED_HEADERS
+        )
+        response.encoding = "utf-8"
+        response._content = cached["body"].encode("utf-8")
+        response._content_consumed = True
+        not_modified.close()
+        return response
+
 
 def get_github_api(username=None, password=None):
     """Old API that only handles logging in as a user.
@@ -39,14 +228,23 @@ def get_github_api(username=None, password=None):
 INSTALLATIONS = {}
 
 
-def get_github_api_for_repo(keychain, owner, repo, session=None):
+def get_github_api_for_repo(keychain, owner, repo, session=None, cache_dir=None):
     gh = GitHub(
         session=session
         or GitHubSession(default_read_timeout=30, default_connect_timeout=30)
     )
-    # Apply retry policy
-    gh.session.mount("http://", adapter)
-    gh.session.mount("https://", adapter)
+    # Apply retry policy, and cache responses on disk if the keychain
+    # has a place to put them.
+    if cache_dir is None:
+        global_config_dir = getattr(keychain, "global_config_dir", None)
+        if global_config_dir:
+            cache_dir = Path(global_config_dir, "github_api_cache")
+    if cache_dir:
+        session_adapter = ConditionalRequestCacheAdapter(cache_dir, max_retries=retries)
+    else:
+        session_adapter = adapter
+    gh.session.mount("http://", session_adapter)
+    gh.session.mount("https://", session_adapter)
 
     GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN")
     APP_KEY = os.environ.get("GITHUB_APP_KEY", "").encode("utf-8")
@@ -135,11 +333,11 @@ def get_pull_requests_by_commit(github, repo, commit_sha):
 
     # raises github3.exceptions.IncompleteResposne
     # when these are not present
-    for json in json_list:
-        json["body_html"] = ""
-        json["body_text"] = ""
+    for pull_json in json_list:
+        pull_json["body_html"] = ""
+        pull_json["body_text"] = ""
 
-    return [ShortPullRequest(json, github) for json in json_list]
+    return [ShortPullRequest(pull_json, github) for pull_json in json_list]
 
 
 def is_pull_request_merged(pull_request):
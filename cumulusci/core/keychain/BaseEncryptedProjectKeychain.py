@@ -1,4 +1,5 @@
 import base64
+import copy
 import os
 import pickle
 
@@ -27,6 +28,11 @@ class BaseEncryptedProjectKeychain(BaseProjectKeychain):
 
     encrypted = True
 
+    def __init__(self, project_config, key):
+        # Decrypted org configs by name, so each org is only decrypted once
+        self._decrypted_orgs = {}
+        super().__init__(project_config, key)
+
     def _get_connected_app(self):
         if self.app:
             return self._decrypt_config(
@@ -52,18 +58,31 @@ class BaseEncryptedProjectKeychain(BaseProjectKeychain):
         org_config.keychain = self
         org_config.global_org = global_org
         encrypted = self._encrypt_config(org_config)
+        self._decrypted_orgs.pop(org_config.name, None)
         self._set_encrypted_org(org_config.name, encrypted, global_org)
 
     def _set_encrypted_org(self, name, encrypted, global_org):
         self.orgs[name] = encrypted
 
+    def remove_org(self, name, global_org=None):
+        self._decrypted_orgs.pop(name, None)
+        super().remove_org(name, global_org)
+
     def _get_org(self, name):
-        return self._decrypt_config(
-            OrgConfig,
-            self.orgs[name],
-            extra=[name, self],
-            context=f"org config ({name})",
-        )
+        config = self._decrypted_orgs.get(name)
+        if config is None:
+            encrypted_config = self._get_encrypted_org(name)
+            if not encrypted_config:
+                return OrgConfig(None, name, self)
+            config = self._decrypt_config_dict(
+                encrypted_config, context=f"org config ({name})"
+            )
+            self._decrypted_orgs[name] = config
+        # Hand out a copy so callers can't change the memoized config
+        return self._construct_config(OrgConfig, [copy.deepcopy(config), name, self])
+
+    def _get_encrypted_org(self, name):
+        return self.orgs[name]
 
     def _get_cipher(self, iv=None):
         key = self.key
@@ -86,6 +105,13 @@ class BaseEncryptedProjectKeychain(BaseProjectKeychain):
                 return config_class(None, *extra)
             else:
                 return config_class()
+        config_dict = self._decrypt_config_dict(encrypted_config, context)
+        args = [config_dict]
+        if extra:
+            args += extra
+        return self._construct_config(config_class, args)
+
+    def _decrypt_config_dict(self, encrypted_config, context=None):
         encrypted_config = base64.b64decode(encrypted_config)
         iv = encrypted_config[:16]
         cipher, iv = self._get_cipher(iv)
@@ -105,10 +131,7 @@ class BaseEncryptedProjectKeychain(BaseProjectKeychain):
             if isinstance(v, bytes):
                 v = v.decode("utf-8")
             config_dict[k] = v
-        args = [config_dict]
-        if extra:
-            args += extra
-        return self._construct_config(config_class, args)
+        return config_dict
 
     def _construct_config(self, config_class, args):
         if args[0].get("scratch"):
@@ -275,6 +275,16 @@ class BaseProjectKeychain(BaseConfig):
         services.sort()
         return services
 
+    def get_sfdx_org_info(self, username):
+        """Retrieve org info cached from the Salesforce CLI for a username.
+
+        The base keychain doesn't persist it, so this always returns None."""
+        return None
+
+    def set_sfdx_org_info(self, username, info):
+        """Store org info from the Salesforce CLI for a username"""
+        pass
+
     @property
     def cache_dir(self):
         "Helper function to get the cache_dir from the project_config"
@@ -1,11 +1,13 @@
+import hashlib
 import os
 from typing import NamedTuple
 from pathlib import Path
 
+from cumulusci.core.config import BaseConfig
+from cumulusci.core.exceptions import KeychainKeyNotFound
 from cumulusci.core.exceptions import OrgNotFound
 from cumulusci.core.exceptions import ServiceNotConfigured
 from cumulusci.core.keychain import BaseEncryptedProjectKeychain
-from cumulusci.core.config import OrgConfig
 
 
 class EncryptedFileProjectKeychain(BaseEncryptedProjectKeychain):
@@ -53,9 +55,21 @@ class EncryptedFileProjectKeychain(BaseEncryptedProjectKeychain):
         self._load_file(self.project_local_dir, "connected.app", "app")
 
     def _load_orgs(self):
-        self._load_files(self.global_config_dir, ".org", "orgs", GlobalOrg)
+        self._index_org_files(self.global_config_dir, GlobalOrg)
 
-        self._load_files(self.project_local_dir, ".org", "orgs", LocalOrg)
+        self._index_org_files(self.project_local_dir, LocalOrg)
+
+    def _index_org_files(self, dirname, constructor):
+        """Index the .org files in dirname by name.
+
+        Files are only read (and decrypted) when the org is requested."""
+        if dirname is None:
+            return
+        orgs = self.config.setdefault("orgs", {})
+        for item in sorted(os.listdir(dirname)):
+            if item.endswith(".org"):
+                name = item.replace(".org", "")
+                orgs[name] = constructor(os.path.join(dirname, item))
 
     def _load_services(self):
         self._load_files(self.global_config_dir, ".service", "services")
@@ -112,17 +126,39 @@ class EncryptedFileProjectKeychain(BaseEncryptedProjectKeychain):
             f"Maybe you need to run: cci service connect {name}"
         )
 
+    def _get_encrypted_org(self, name):
+        return self.orgs[name].encrypted_data
+
     def _get_org(self, name):
-        org = self._decrypt_config(
-            OrgConfig,
-            self.orgs[name].encrypted_data,
-            extra=[name, self],
-            context=f"org config ({name})",
-        )
+        org = super()._get_org(name)
         if self.orgs[name].global_org:
             org.global_org = True
         return org
 
+    def _sfdx_org_info_path(self, username):
+        digest = hashlib.sha256(username.encode("utf-8")).hexdigest()
+        return Path(self.global_config_dir, "sfdx_org_info", f"{digest}.info")
+
+    def get_sfdx_org_info(self, username):
+        """Retrieve org info cached from the Salesforce CLI for a username"""
+        path = self._sfdx_org_info_path(username)
+        if not path.exists():
+            return None
+        try:
+            return self._decrypt_config_dict(path.read_bytes())
+        except (KeychainKeyNotFound, ValueError):
+            # Stored with a different key, or written by a process that
+            # was interrupted; either way it's just a cache miss.
+            return None
+
+    def set_sfdx_org_info(self, username, info):
+        """Store org info from the Salesforce CLI for a username"""
+        path = self._sfdx_org_info_path(username)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(self._encrypt_config(BaseConfig(info)))
+        os.replace(tmp_path, path)
+
     @property
     def _default_org_path(self):
         if self.project_local_dir:
@@ -161,11 +197,24 @@ class EncryptedFileProjectKeychain(BaseEncryptedProjectKeychain):
                 pass
 
 
+def _read_org_file(path):
+    with open(path, "r") as f_org:
+        return f_org.read()
+
+
 class GlobalOrg(NamedTuple):
-    encrypted_data: bytes
+    path: str
     global_org: bool = True
 
+    @property
+    def encrypted_data(self):
+        return _read_org_file(self.path)
+
 
 class LocalOrg(NamedTuple):
-    encrypted_data: bytes
+    path: str
     global_org: bool = False
+
+    @property
+    def encrypted_data(self):
+        return _read_org_file(self.path)
@@ -84,7 +84,7 @@ class BaseCumulusCI(object):
             self.keychain = self.keychain_cls(self.project_config, keychain_key)
             self.project_config.keychain = self.keychain
 
-    def get_flow(self, name, options=None):
+    def get_flow(self, name, options=None, skip_unchanged=False):
         """ Get a primed and readytogo flow coordinator. """
         flow_config = self.project_config.get_flow(name)
         callbacks = self.callback_class()
@@ -95,5 +95,6 @@ class BaseCumulusCI(object):
             options=options,
             skip=None,
             callbacks=callbacks,
+            skip_unchanged=skip_unchanged,
         )
         return coordinator
@@ -5,7 +5,7 @@ from cumulusci.core.exceptions import DependencyResolutionError
 from cumulusci.core.github import get_github_api_for_repo
 from cumulusci.core.github import find_latest_release
 from cumulusci.core.github import find_previous_release
-from cumulusci.utils import download_extract_github
+from cumulusci.utils import open_github_archive
 
 
 class GitHubSource:
@@ -92,21 +92,20 @@ class GitHubSource:
 
     def fetch(self, path=None):
         """Fetch the archive of the specified commit and construct its project config."""
-        # To do: copy this from a shared cache
+        cache_dir = self.project_config.cache_dir / "projects"
         if path is None:
-            path = (
-                self.project_config.cache_dir
-                / "projects"
-                / self.repo_name
-                / self.commit
-            )
+            path = cache_dir / self.repo_name / self.commit
         if not path.exists():
             path.mkdir(parents=True)
-            zf = download_extract_github(
-                self.gh, self.repo_owner, self.repo_name, ref=self.commit
-            )
             try:
-                zf.extractall(path)
+                # The archive is shared with dependencies deployed from this repo
+                with open_github_archive(self.repo, self.commit, cache_dir) as zf:
+                    # Extract the contents of the archive's top-level folder
+                    top = sorted(zf.namelist())[0]
+                    for info in zf.infolist():
+                        if info.filename.startswith(top) and info.filename != top:
+                            info.filename = info.filename[len(top) :]
+                            zf.extract(info, path)
             except Exception:
                 # make sure we don't leave an incomplete cache
                 shutil.rmtree(path)
@@ -23,6 +23,9 @@ PROJECT_CONFIG_RE = re.compile(r"\$project_config.(\w+)")
 
 @contextlib.contextmanager
 def stacked_task(task):
+    # Tasks may run on worker threads when a flow runs steps in parallel
+    if not hasattr(CURRENT_TASK, "stack"):
+        CURRENT_TASK.stack = []
     CURRENT_TASK.stack.append(task)
     try:
         yield
@@ -145,6 +148,17 @@ class BaseTask(object):
         """ Subclasses should override to provide their implementation """
         raise NotImplementedError("Subclasses should provide their own implementation")
 
+    def get_fingerprint(self):
+        """Returns a string identifying inputs of the task other than its options.
+
+        Flows run with skip_unchanged skip a step which already completed
+        successfully in the same org with the same task class, options and
+        fingerprint. Tasks whose result depends on more than their options
+        (such as the contents of a source directory) should include those
+        inputs. The default of None means the task always runs.
+        """
+        return None
+
     def _log_begin(self):
         """ Log the beginning of the task execution """
         self.logger.info(f"Beginning task: {self.__class__.__name__}")
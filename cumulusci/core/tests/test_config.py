@@ -3,6 +3,9 @@ from distutils.version import StrictVersion
 import json
 import os
 import pathlib
+import sys
+import threading
+import time
 import unittest
 from pathlib import Path
 from tempfile import TemporaryDirectory
@@ -61,6 +64,14 @@ class TestBaseConfig(unittest.TestCase):
         config.config = {"foo": {}}
         self.assertEqual(config.foo__bar, None)
 
+    def test_getattr_child_key__sees_mutation(self):
+        config = BaseConfig({"foo": {"bar": "baz"}})
+        self.assertEqual(config.foo__bar, "baz")
+        config.config["foo"]["bar"] = "qux"
+        self.assertEqual(config.foo__bar, "qux")
+        del config.config["foo"]
+        self.assertEqual(config.foo__bar, None)
+
     def test_getattr_default_toplevel(self):
         config = BaseConfig()
         config.config = {"foo": "bar"}
@@ -940,6 +951,122 @@ class TestBaseProjectConfig(unittest.TestCase):
                 }
             )
 
+    def test_get_static_dependencies__resolves_shared_dependency_once(self):
+        config = BaseProjectConfig(UniversalConfig())
+        config.keychain = DummyKeychain()
+        github = self._make_github()
+        dep_repo = github.repositories["CumulusCI-Test-Dep"]
+        dep_repo.file_contents = mock.Mock(wraps=dep_repo.file_contents)
+        config.get_github_api = mock.Mock(return_value=github)
+
+        result = config.get_static_dependencies(
+            [
+                {"github": "https://github.com/SFDO-Tooling/CumulusCI-Test-Dep"},
+                {"name": "Install other 1.0", "namespace": "other", "version": "1.0"},
+                {
+                    "github": "https://github.com/SFDO-Tooling/CumulusCI-Test",
+                    "unmanaged": True,
+                },
+            ]
+        )
+
+        assert [dep["name"] for dep in result] == [
+            "Install CumulusCI-Test-Dep 2.0",
+            "Install other 1.0",
+            "Deploy unpackaged/pre/pre",
+            "Deploy unpackaged/pre/skip",
+            "Install CumulusCI-Test-Dep 2.0",
+            "Deploy CumulusCI-Test",
+            "Deploy unpackaged/post/post",
+            "Deploy unpackaged/post/skip",
+        ]
+        dep_repo.file_contents.assert_called_once()
+
+    def test_get_static_dependencies__cycle(self):
+        config = BaseProjectConfig(UniversalConfig())
+        config.keychain = DummyKeychain()
+        github = self._make_github()
+        github.repositories["CumulusCI-Test-Dep"]._contents[
+            "cumulusci.yml"
+        ] = DummyContents(
+            b"""
+        project:
+            dependencies:
+                - github: https://github.com/SFDO-Tooling/CumulusCI-Test
+        """
+        )
+        config.get_github_api = mock.Mock(return_value=github)
+
+        with self.assertRaises(DependencyResolutionError):
+            config.get_static_dependencies(
+                [{"github": "https://github.com/SFDO-Tooling/CumulusCI-Test"}]
+            )
+
+    def test_get_static_dependencies__cycle_across_branches(self):
+        config = BaseProjectConfig(UniversalConfig())
+        config.keychain = DummyKeychain()
+        github = self._make_github()
+        github.repositories["CumulusCI-Test-Dep"]._contents[
+            "cumulusci.yml"
+        ] = DummyContents(
+            b"""
+        project:
+            dependencies:
+                - github: https://github.com/SFDO-Tooling/CumulusCI-Test
+        """
+        )
+        # Make sure both branches have started before either resolves
+        # its own dependencies
+        barrier = threading.Barrier(2, timeout=10)
+        for name in ("CumulusCI-Test", "CumulusCI-Test-Dep"):
+            repo = github.repositories[name]
+
+            def file_contents(path, _file_contents=repo.file_contents, **kw):
+                if path == "cumulusci.yml":
+                    barrier.wait()
+                return _file_contents(path, **kw)
+
+            repo.file_contents = file_contents
+        config.get_github_api = mock.Mock(return_value=github)
+
+        with self.assertRaises(DependencyResolutionError):
+            config.get_static_dependencies(
+                [
+                    {"github": "https://github.com/SFDO-Tooling/CumulusCI-Test-Dep"},
+                    {"github": "https://github.com/SFDO-Tooling/CumulusCI-Test"},
+                ]
+            )
+
+    def test_process_github_dependency__contents_cached_by_sha(self):
+        sha = "a" * 40
+        dependency = {
+            "github": "https://github.com/SFDO-Tooling/CumulusCI-Test",
+            "ref": sha,
+            "unmanaged": True,
+        }
+        with temporary_dir() as d:
+            config = BaseProjectConfig(
+                UniversalConfig(), {"project": {}}, repo_info={"root": d}
+            )
+            config.keychain = DummyKeychain()
+            config.get_github_api = mock.Mock(return_value=self._make_github())
+            expected = config.process_github_dependency(dependency)
+            assert Path(
+                d,
+                ".cci",
+                "github_dependencies",
+                f"SFDO-Tooling__CumulusCI-Test__{sha}.json",
+            ).exists()
+
+            config = BaseProjectConfig(
+                UniversalConfig(), {"project": {}}, repo_info={"root": d}
+            )
+            config.keychain = DummyKeychain()
+            github = self._make_github()
+            github.repositories["CumulusCI-Test"]._contents = {}
+            config.get_github_api = mock.Mock(return_value=github)
+            assert config.process_github_dependency(dependency) == expected
+
     @mock.patch("cumulusci.core.config.project_config.get_version_id_from_commit")
     def test_find_matching_2gp_release(self, get_version_id):
         universal_config = UniversalConfig()
@@ -1657,8 +1784,8 @@ class TestOrgConfig(unittest.TestCase):
             ],
         },
         {
-            "size": 1,
-            "totalSize": 1,
+            "size": 3,
+            "totalSize": 3,
             "done": True,
             "records": [
                 {
@@ -1668,14 +1795,7 @@ class TestOrgConfig(unittest.TestCase):
                     "PatchVersion": 0,
                     "BuildNumber": 5,
                     "IsBeta": False,
-                }
-            ],
-        },
-        {
-            "size": 1,
-            "totalSize": 1,
-            "done": True,
-            "records": [
+                },
                 {
                     "Id": "04t000000000001AAA",
                     "MajorVersion": 12,
@@ -1683,14 +1803,7 @@ class TestOrgConfig(unittest.TestCase):
                     "PatchVersion": 1,
                     "BuildNumber": 1,
                     "IsBeta": False,
-                }
-            ],
-        },
-        {
-            "size": 1,
-            "totalSize": 1,
-            "done": True,
-            "records": [
+                },
                 {
                     "Id": "04t000000000002AAA",
                     "MajorVersion": 1,
@@ -1698,11 +1811,9 @@ class TestOrgConfig(unittest.TestCase):
                     "PatchVersion": 0,
                     "BuildNumber": 5,
                     "IsBeta": True,
-                }
+                },
             ],
         },
-        {"size": 0, "totalSize": 0, "done": True, "records": []},
-        SalesforceError(None, None, None, None),
     ]
 
     @mock.patch("cumulusci.core.config.OrgConfig.salesforce_client")
@@ -1745,6 +1856,84 @@ class TestOrgConfig(unittest.TestCase):
         config.reset_installed_packages()
         assert config.installed_packages == expected
         sf.restful.assert_called()
+        assert sf.restful.call_count == 2
+        assert "WHERE Id IN ('04t000000000001AAA', " in sf.restful.call_args[0][0]
+
+    @mock.patch.object(
+        sys.modules[OrgConfig.__module__], "INSTALLED_PACKAGES_QUERY_CHUNK_SIZE", 2
+    )
+    @mock.patch("cumulusci.core.config.OrgConfig.salesforce_client")
+    def test_installed_packages__chunked_with_error(self, sf):
+        config = OrgConfig({}, "test")
+        isp_result, spv_result = self.MOCK_TOOLING_PACKAGE_RESULTS
+        spv_records = spv_result["records"]
+        sf.restful.side_effect = [
+            isp_result,
+            # 04t000000000001AAA, 04t000000000002AAA
+            {"records": spv_records[1:]},
+            # 04t0000000BOGUSAAA, 04t0000000ERRORAAA
+            SalesforceError(None, None, None, None),
+            {"records": []},
+            SalesforceError(None, None, None, None),
+            # 04t1T00000070yqQAA
+            {"records": spv_records[:1]},
+        ]
+
+        assert config.installed_packages["GW_Volunteers"] == [
+            VersionInfo("04t1T00000070yqQAA", StrictVersion("3.119")),
+            VersionInfo("04t000000000001AAA", StrictVersion("12.0.1")),
+        ]
+        assert "blah" not in config.installed_packages
+        assert "error" not in config.installed_packages
+        assert sf.restful.call_count == 6
+
+    @mock.patch("cumulusci.core.config.OrgConfig.salesforce_client")
+    def test_installed_packages__persistent_cache(self, sf):
+        org_id = "00D000000000001AAA"
+        config_values = {
+            "instance_url": "http://zombo.com/welcome",
+            "username": "test-example@example.com",
+            "id": f"https://login.salesforce.com/id/{org_id}/005000000000001AAA",
+        }
+        with TemporaryDirectory() as t:
+            with mock.patch("cumulusci.tests.util.DummyKeychain.cache_dir", Path(t)):
+                sf.restful.side_effect = self.MOCK_TOOLING_PACKAGE_RESULTS
+                config = OrgConfig(config_values, "test", keychain=DummyKeychain())
+                expected = config.installed_packages
+                assert sf.restful.call_count == 2
+
+                # A new OrgConfig for the same org reads the cache
+                config = OrgConfig(config_values, "test", keychain=DummyKeychain())
+                assert config.installed_packages == expected
+                assert config.has_minimum_package_version("TESTY", "1.10b5")
+                assert sf.restful.call_count == 2
+
+                # The cache expires
+                config = OrgConfig(config_values, "test", keychain=DummyKeychain())
+                sf.restful.side_effect = self.MOCK_TOOLING_PACKAGE_RESULTS
+                with mock.patch("time.time", return_value=time.time() + 7200):
+                    assert config.installed_packages == expected
+                assert sf.restful.call_count == 4
+
+                # Resetting clears the cache
+                config.reset_installed_packages()
+                config = OrgConfig(config_values, "test", keychain=DummyKeychain())
+                sf.restful.side_effect = self.MOCK_TOOLING_PACKAGE_RESULTS
+                assert config.installed_packages == expected
+                assert sf.restful.call_count == 6
+
+                # The cache isn't used for a different org with the same username
+                config = OrgConfig(
+                    {
+                        **config_values,
+                        "id": config_values["id"].replace("1AAA", "2AAA"),
+                    },
+                    "test",
+                    keychain=DummyKeychain(),
+                )
+                sf.restful.side_effect = self.MOCK_TOOLING_PACKAGE_RESULTS
+                assert config.installed_packages == expected
+                assert sf.restful.call_count == 8
 
     @mock.patch("cumulusci.core.config.OrgConfig.salesforce_client")
     def test_has_minimum_package_version(self, sf):
@@ -4,6 +4,7 @@ from unittest import mock
 import io
 import os
 import tempfile
+import time
 import unittest
 import shutil
 from pathlib import Path
@@ -78,6 +79,29 @@ class TestUniversalConfig(unittest.TestCase):
         expected_config["tasks"]["newtesttask"]["description"] = "test description"
         self.assertEqual(config.config, expected_config)
 
+    def test_load_universal_config__cached(self, mock_class):
+        self._create_universal_config_local("tasks:\n    newtesttask: {}")
+        mock_class.return_value = self.tempdir_home
+        UniversalConfig.config = None
+        UniversalConfig()
+
+        UniversalConfig.config = None
+        with mock.patch("cumulusci.core.config.universal_config.yaml") as yaml_mock:
+            config = UniversalConfig()
+        yaml_mock.safe_load.assert_not_called()
+        assert "newtesttask" in config.tasks
+
+        # changing the global config invalidates the cache
+        self._write_file(
+            self.tempdir_home / ".cumulusci" / UniversalConfig.config_filename,
+            "tasks:\n    othertesttask: {}",
+        )
+        UniversalConfig.config = None
+        config = UniversalConfig()
+        assert "newtesttask" not in config.tasks
+        assert "othertesttask" in config.tasks
+        UniversalConfig.config = None
+
 
 @mock.patch("pathlib.Path.home")
 class TestBaseProjectConfig(unittest.TestCase):
@@ -241,6 +265,37 @@ class TestBaseProjectConfig(unittest.TestCase):
             self.assertNotEqual(config.config_project_local, {})
             self.assertEqual(config.project__package__api_version, 45.0)
 
+    def test_load_project_config__cached(self, mock_class):
+        mock_class.return_value = self.tempdir_home
+        os.mkdir(os.path.join(self.tempdir_project, ".git"))
+        self._create_git_config()
+        self._create_project_config()
+
+        with cd(self.tempdir_project):
+            universal_config = UniversalConfig()
+            BaseProjectConfig(universal_config)
+            with mock.patch(
+                "cumulusci.core.config.project_config.cci_safe_load"
+            ) as cci_safe_load:
+                config = BaseProjectConfig(universal_config)
+            cci_safe_load.assert_not_called()
+            assert config.project__package__name == "TestProject"
+            assert config.config_project["project"]["name"] == "TestRepo"
+
+            # changing the local project config invalidates the cache
+            self._write_file(
+                Path(config.project_local_dir, BaseProjectConfig.config_filename),
+                "project:\n    package:\n        api_version: 45.0\n",
+            )
+            config = BaseProjectConfig(universal_config)
+            assert config.project__package__api_version == 45.0
+
+            # additional yaml is also part of the cache key
+            config = BaseProjectConfig(
+                universal_config, additional_yaml="project:\n    name: Other"
+            )
+            assert config.project__name == "Other"
+
     def test_load_additional_yaml(self, mock_class):
         mock_class.return_value = self.tempdir_home
         os.mkdir(os.path.join(self.tempdir_project, ".git"))
@@ -616,6 +671,137 @@ class TestScratchOrgConfig(unittest.TestCase):
 
         self.assertNotIn("test@example.com", Command.call_args[0][0])
 
+    def _snapshot_org_config(self, **config):
+        keychain = mock.Mock()
+        keychain.project_config.get_static_dependencies.return_value = [
+            {"namespace": "foo", "version": "1.0"}
+        ]
+        keychain.get_service.side_effect = ServiceNotConfigured
+        config.setdefault("snapshot", "dev")
+        return ScratchOrgConfig(
+            {
+                "config_file": "tmp.json",
+                "config_name": "dev",
+                "email_address": "test@example.com",
+                **config,
+            },
+            "test",
+            keychain,
+        )
+
+    def test_create_org__from_snapshot(self, Command):
+        out = b"Successfully created scratch org: ORG_ID, username: USERNAME"
+        Command.return_value = mock.Mock(
+            stdout=io.BytesIO(out), stderr=io.BytesIO(b""), returncode=0
+        )
+        config = self._snapshot_org_config()
+        snapshot = config.get_dependency_snapshot()
+        with temporary_dir():
+            with open("tmp.json", "w") as f:
+                f.write("{}")
+
+            config.create_org()
+
+        assert snapshot.name == f"dev{snapshot.dependencies_hash}"[:15]
+        assert f"snapshot={snapshot.name}" in Command.call_args[0][0]
+        assert config.config["dependencies_hash"] == snapshot.dependencies_hash
+        assert config.config["username"] == "USERNAME"
+
+    def test_create_org__snapshot_fallback(self, Command):
+        out = b"Successfully created scratch org: ORG_ID, username: USERNAME"
+        Command.side_effect = [
+            mock.Mock(
+                stdout=io.BytesIO(b""),
+                stderr=io.BytesIO(b"snapshot not found"),
+                returncode=1,
+            ),
+            mock.Mock(stdout=io.BytesIO(out), stderr=io.BytesIO(b""), returncode=0),
+        ]
+        config = self._snapshot_org_config()
+        with temporary_dir():
+            with open("tmp.json", "w") as f:
+                f.write("{}")
+
+            config.create_org()
+
+        assert Command.call_count == 2
+        assert "snapshot=" in Command.call_args_list[0][0][0]
+        assert "snapshot=" not in Command.call_args_list[1][0][0]
+        assert "dependencies_hash" not in config.config
+        assert config.config["username"] == "USERNAME"
+
+    def test_create_org__recreated_without_snapshot(self, Command):
+        out = b"Successfully created scratch org: ORG_ID, username: USERNAME"
+        Command.return_value = mock.Mock(
+            stdout=io.BytesIO(out), stderr=io.BytesIO(b""), returncode=0
+        )
+        config = self._snapshot_org_config(snapshot=None, dependencies_hash="abc")
+        with temporary_dir():
+            with open("tmp.json", "w") as f:
+                f.write("{}")
+
+            config.create_org()
+
+        assert "snapshot=" not in Command.call_args[0][0]
+        assert "dependencies_hash" not in config.config
+
+    def test_get_dependency_snapshot__not_configured(self, Command):
+        assert (
+            ScratchOrgConfig({}, "test", mock.Mock()).get_dependency_snapshot() is None
+        )
+        config = self._snapshot_org_config()
+        config.keychain.project_config.get_static_dependencies.return_value = []
+        assert config.get_dependency_snapshot() is None
+
+    def test_get_dependency_snapshot__options(self, Command):
+        config = self._snapshot_org_config(
+            snapshot_options={
+                "include_beta": "True",
+                "ignore_dependencies": [{"namespace": "bar"}],
+                "prefer_2gp_from_release_branch": True,
+            }
+        )
+        config.get_dependency_snapshot()
+
+        config.keychain.project_config.get_static_dependencies.assert_called_once_with(
+            include_beta=True,
+            ignore_deps=[{"namespace": "bar"}],
+            match_release_branch=True,
+        )
+
+    def test_get_dependency_snapshot__name_too_long(self, Command):
+        config = self._snapshot_org_config(snapshot="TooLongName")
+        with pytest.raises(ScratchOrgException, match="at most 7 characters"):
+            config.get_dependency_snapshot()
+
+    def test_create_dependency_snapshot(self, Command):
+        Command.return_value = mock.Mock(
+            stdout=io.BytesIO(b"created"), stderr=io.BytesIO(b""), returncode=0
+        )
+        config = self._snapshot_org_config(org_id="00D000000000001")
+
+        snapshot = config.create_dependency_snapshot()
+
+        assert Command.call_args[0][0] == (
+            "sfdx force:org:snapshot:create --sourceorg 00D000000000001 "
+            f"--snapshotname {snapshot.name}"
+        )
+        assert config.config["dependencies_hash"] == snapshot.dependencies_hash
+
+    def test_create_dependency_snapshot__error(self, Command):
+        Command.return_value = mock.Mock(
+            stdout=io.BytesIO(b""), stderr=io.BytesIO(b"error"), returncode=1
+        )
+        config = self._snapshot_org_config(org_id="00D000000000001")
+        with pytest.raises(ScratchOrgException, match="error"):
+            config.create_dependency_snapshot()
+
+    def test_create_dependency_snapshot__not_configured(self, Command):
+        config = self._snapshot_org_config(snapshot=None)
+        with pytest.raises(ScratchOrgException, match="does not declare a snapshot"):
+            config.create_dependency_snapshot()
+        Command.assert_not_called()
+
     def test_create_org_no_config_file(self, Command):
         config = ScratchOrgConfig({}, "test")
         with pytest.raises(ScratchOrgException, match="missing a config_file"):
@@ -678,12 +864,18 @@ class TestScratchOrgConfig(unittest.TestCase):
         )
 
         config = ScratchOrgConfig(
-            {"username": "test", "created": True, "instance_url": "https://blah"},
+            {
+                "username": "test",
+                "created": True,
+                "instance_url": "https://blah",
+                "dependencies_hash": "abc",
+            },
             "test",
         )
         config.delete_org()
 
         self.assertFalse(config.config.get("instance_url"))
+        self.assertNotIn("dependencies_hash", config.config)
         self.assertFalse(config.config["created"])
         self.assertIs(config.config["username"], None)
 
@@ -748,6 +940,138 @@ class TestScratchOrgConfig(unittest.TestCase):
         config.force_refresh_oauth_token.assert_called_once()
         self.assertTrue(config._sfdx_info)
 
+    def test_sfdx_info__cached_in_keychain(self, Command):
+        result = b"""{
+    "result": {
+        "instanceUrl": "url",
+        "accessToken": "access!token",
+        "username": "username",
+        "sfdxAuthUrl": "force://PlatformCLI::refresh@example.my.salesforce.com"
+    }
+}"""
+        Command.return_value = mock.Mock(
+            stderr=io.BytesIO(b""), stdout=io.BytesIO(result), returncode=0
+        )
+        keychain = mock.Mock()
+        keychain.get_sfdx_org_info.return_value = None
+
+        config = SfdxOrgConfig({"username": "test"}, "test", keychain)
+        info = config.sfdx_info
+
+        assert "--verbose" in Command.call_args[0][0]
+        keychain.set_sfdx_org_info.assert_called_once()
+        username, cached = keychain.set_sfdx_org_info.call_args[0]
+        assert username == "test"
+        assert cached["sfdx_info"] is info
+        assert cached["auth_url"] == (
+            "force://PlatformCLI::refresh@example.my.salesforce.com"
+        )
+
+        # another process reuses the cached info without calling sfdx
+        Command.reset_mock()
+        keychain.get_sfdx_org_info.return_value = cached
+        config = SfdxOrgConfig({"username": "test"}, "test", keychain)
+        assert config.sfdx_info == info
+        assert config.config["access_token"] == "access!token"
+        Command.assert_not_called()
+
+    def test_sfdx_info__cached_token_refreshed(self, Command):
+        cached = {
+            "sfdx_info": {"access_token": "old", "instance_url": "url"},
+            "auth_url": "force://PlatformCLI::refresh@example.my.salesforce.com",
+            "fetched": 0,
+        }
+        keychain = mock.Mock()
+        keychain.get_sfdx_org_info.return_value = cached
+        config = SfdxOrgConfig({"username": "test"}, "test", keychain)
+        config.SalesforceOAuth2 = mock.Mock()
+        sf_oauth = config.SalesforceOAuth2.return_value
+        sf_oauth.refresh_token.return_value = mock.Mock(
+            status_code=200, json=lambda: {"access_token": "new"}
+        )
+
+        assert config.sfdx_info["access_token"] == "new"
+
+        config.SalesforceOAuth2.assert_called_once_with(
+            "PlatformCLI", "", None, auth_site="https://example.my.salesforce.com"
+        )
+        sf_oauth.refresh_token.assert_called_once_with("refresh")
+        keychain.set_sfdx_org_info.assert_called_once_with("test", cached)
+        assert cached["fetched"] > 0
+        Command.assert_not_called()
+
+    def test_sfdx_info__cached_token_refresh_failed(self, Command):
+        result = b"""{
+    "result": {
+        "instanceUrl": "url",
+        "accessToken": "access!token",
+        "username": "username"
+    }
+}"""
+        Command.return_value = mock.Mock(
+            stderr=io.BytesIO(b""), stdout=io.BytesIO(result), returncode=0
+        )
+        keychain = mock.Mock()
+        keychain.get_sfdx_org_info.return_value = {
+            "sfdx_info": {"access_token": "old", "instance_url": "url"},
+            "auth_url": "force://refresh@https://example.my.salesforce.com",
+            "fetched": 0,
+        }
+        config = SfdxOrgConfig({"username": "test"}, "test", keychain)
+        config.SalesforceOAuth2 = mock.Mock()
+        config.SalesforceOAuth2.return_value.refresh_token.return_value = mock.Mock(
+            status_code=400, text="expired"
+        )
+
+        assert config.sfdx_info["access_token"] == "access!token"
+
+        config.SalesforceOAuth2.assert_called_once_with(
+            "PlatformCLI", "", None, auth_site="https://example.my.salesforce.com"
+        )
+        Command.assert_called_once()
+
+    def test_sfdx_info__cached_without_refresh_token(self, Command):
+        result = b"""{
+    "result": {
+        "instanceUrl": "url",
+        "accessToken": "access!token",
+        "username": "username"
+    }
+}"""
+        Command.return_value = mock.Mock(
+            stderr=io.BytesIO(b""), stdout=io.BytesIO(result), returncode=0
+        )
+        keychain = mock.Mock()
+        keychain.get_sfdx_org_info.return_value = {
+            "sfdx_info": {"access_token": "old", "instance_url": "url"},
+            "auth_url": None,
+            "fetched": 0,
+        }
+        config = SfdxOrgConfig({"username": "test"}, "test", keychain)
+        config.SalesforceOAuth2 = mock.Mock()
+
+        assert config.sfdx_info["access_token"] == "access!token"
+        config.SalesforceOAuth2.assert_not_called()
+
+    def test_refresh_oauth_token__uses_keychain_cache(self, Command):
+        keychain = mock.Mock()
+        keychain.get_sfdx_org_info.return_value = {
+            "sfdx_info": {"access_token": "fresh", "instance_url": "url"},
+            "fetched": time.time(),
+        }
+        config = ScratchOrgConfig({"username": "test", "created": True}, "test")
+        config.keychain = keychain
+        config._sfdx_info = {}
+        config._sfdx_info_date = datetime.now() - timedelta(days=1)
+        config.force_refresh_oauth_token = mock.Mock()
+        config._load_orginfo = mock.Mock()
+
+        config.refresh_oauth_token(keychain=keychain)
+
+        config.force_refresh_oauth_token.assert_not_called()
+        assert config.access_token == "fresh"
+        Command.assert_not_called()
+
     def test_choose_devhub(self, Command):
         mock_keychain = mock.Mock()
         mock_keychain.get_service.return_value = ServiceConfig(
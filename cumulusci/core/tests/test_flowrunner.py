@@ -1,4 +1,6 @@
+from pathlib import Path
 from unittest import mock
+import threading
 import unittest
 import logging
 
@@ -14,6 +16,8 @@ from cumulusci.core.tasks import BaseTask
 from cumulusci.core.config import OrgConfig
 from cumulusci.core.tests.utils import MockLoggingHandler
 from cumulusci.tests.util import create_project_config
+from cumulusci.utils import temporary_dir
+from cumulusci.utils.fileutils import open_fs_resource
 
 ORG_ID = "00D000000000001"
 
@@ -40,6 +44,28 @@ class _TaskRaisesException(BaseTask):
         raise self.options["exception"](self.options["message"])
 
 
+class _TaskWaitsForBarrier(BaseTask):
+    barrier = threading.Barrier(2, timeout=5)
+
+    def _run_task(self):
+        # Fails with BrokenBarrierError unless another step runs concurrently
+        self.barrier.wait()
+
+
+class _TaskWithFingerprint(BaseTask):
+    task_options = {"fingerprint": {"description": "The task fingerprint"}}
+    run_count = 0
+
+    def get_fingerprint(self):
+        if self.options["fingerprint"] == "error":
+            raise Exception("Fingerprint failed")
+        return self.options["fingerprint"]
+
+    def _run_task(self):
+        _TaskWithFingerprint.run_count += 1
+        self.return_values = {"count": _TaskWithFingerprint.run_count}
+
+
 class _SfdcTask(BaseTask):
     salesforce_task = True
 
@@ -112,6 +138,14 @@ class SimpleTestFlowCoordinator(AbstractFlowCoordinatorTest, unittest.TestCase):
                 "description": "An sfdc task",
                 "class_path": "cumulusci.core.tests.test_flowrunner._SfdcTask",
             },
+            "wait_for_barrier": {
+                "description": "Waits for another task to run concurrently",
+                "class_path": "cumulusci.core.tests.test_flowrunner._TaskWaitsForBarrier",
+            },
+            "fingerprinted": {
+                "description": "A task with a fingerprint",
+                "class_path": "cumulusci.core.tests.test_flowrunner._TaskWithFingerprint",
+            },
         }
         self.project_config.config["flows"] = {
             "nested_flow": {
@@ -524,6 +558,203 @@ class SimpleTestFlowCoordinator(AbstractFlowCoordinatorTest, unittest.TestCase):
 
         save.assert_called_once()
 
+    def test_run__parallel(self):
+        flow_config = FlowConfig(
+            {
+                "parallel": 2,
+                "steps": {
+                    1: {"task": "pass_name"},
+                    2: {"task": "wait_for_barrier", "depends_on": [1]},
+                    3: {"task": "wait_for_barrier", "depends_on": [1]},
+                    4: {
+                        "task": "name_response",
+                        "options": {"response": "^^pass_name.name"},
+                    },
+                },
+            }
+        )
+        flow = FlowCoordinator(self.project_config, flow_config)
+        flow.run(self.org_config)
+
+        assert len(flow.results) == 4
+        assert not any(result.exception for result in flow.results)
+        assert flow.results[0].task_name == "pass_name"
+        assert flow.results[-1].result == "supername"
+        assert "Running steps in parallel with 2 workers" in self.flow_log["info"]
+
+    def test_run__parallel_nested_flow(self):
+        self.project_config.config["flows"]["test"] = {
+            "parallel": True,
+            "steps": {
+                1: {"flow": "nested_flow"},
+                2: {"task": "pass_name", "depends_on": []},
+                3: {
+                    "task": "name_response",
+                    "options": {"response": "^^nested_flow.pass_name.name"},
+                    "depends_on": [1],
+                },
+            },
+        }
+        flow_config = self.project_config.get_flow("test")
+        flow = FlowCoordinator(self.project_config, flow_config)
+        flow.run(self.org_config)
+
+        assert len(flow.results) == 3
+        # Steps 2 and 3 can finish in either order.
+        results = {result.task_name: result.result for result in flow.results}
+        assert results["name_response"] == "supername"
+
+    def test_run__parallel_skip_conditional_step(self):
+        flow_config = FlowConfig(
+            {
+                "parallel": True,
+                "steps": {
+                    1: {"task": "pass_name", "when": "False"},
+                    2: {"task": "pass_name", "depends_on": []},
+                },
+            }
+        )
+        flow = FlowCoordinator(self.project_config, flow_config)
+        flow.run(self.org_config)
+        assert len(flow.results) == 1
+
+    def test_run__parallel_failure_cancels_steps(self):
+        flow_config = FlowConfig(
+            {
+                "parallel": True,
+                "steps": {
+                    1: {"task": "raise_exception"},
+                    2: {"task": "pass_name"},
+                },
+            }
+        )
+        flow = FlowCoordinator(self.project_config, flow_config)
+        with self.assertRaises(Exception):
+            flow.run(self.org_config)
+
+        assert len(flow.results) == 1
+        assert "Cancelled 1 outstanding steps: 2" in self.flow_log["error"]
+
+    def test_run__parallel_ignore_failure(self):
+        flow_config = FlowConfig(
+            {
+                "parallel": True,
+                "steps": {
+                    1: {"task": "raise_exception", "ignore_failure": True},
+                    2: {"task": "pass_name"},
+                },
+            }
+        )
+        flow = FlowCoordinator(self.project_config, flow_config)
+        flow.run(self.org_config)
+
+        assert len(flow.results) == 2
+        assert flow.results[0].exception is not None
+
+    def test_run__parallel_invalid_dependency(self):
+        flow_config = FlowConfig(
+            {
+                "parallel": True,
+                "steps": {
+                    1: {"task": "pass_name", "depends_on": [2]},
+                    2: {"task": "pass_name"},
+                },
+            }
+        )
+        flow = FlowCoordinator(self.project_config, flow_config)
+        with self.assertRaises(FlowConfigError):
+            flow.run(self.org_config)
+
+    def _run_flow_skip_unchanged(
+        self, fingerprint, skip_unchanged=True, second_task="pass_name"
+    ):
+        flow_config = FlowConfig(
+            {
+                "steps": {
+                    1: {
+                        "task": "fingerprinted",
+                        "options": {"fingerprint": fingerprint},
+                    },
+                    2: {"task": second_task},
+                }
+            }
+        )
+        flow = FlowCoordinator(
+            self.project_config, flow_config, skip_unchanged=skip_unchanged
+        )
+        flow.run(self.org_config)
+        return flow
+
+    def test_run__skip_unchanged(self):
+        _TaskWithFingerprint.run_count = 0
+        with temporary_dir() as d:
+            self.org_config.get_orginfo_cache_dir = lambda name: open_fs_resource(
+                Path(d)
+            )
+            self._run_flow_skip_unchanged("abc")
+            flow = self._run_flow_skip_unchanged("abc")
+
+            assert _TaskWithFingerprint.run_count == 1
+            assert flow.results[0].return_values == {"count": 1}
+            assert (
+                "Skipping fingerprinted: unchanged since its last successful run"
+                in self.flow_log["info"]
+            )
+
+            flow = self._run_flow_skip_unchanged("def")
+            assert _TaskWithFingerprint.run_count == 2
+            assert flow.results[0].return_values == {"count": 2}
+
+    def test_run__resume_after_failure(self):
+        _TaskWithFingerprint.run_count = 0
+        with temporary_dir() as d:
+            self.org_config.get_orginfo_cache_dir = lambda name: open_fs_resource(
+                Path(d)
+            )
+            with self.assertRaises(Exception):
+                self._run_flow_skip_unchanged(
+                    "abc", skip_unchanged=False, second_task="raise_exception"
+                )
+            assert _TaskWithFingerprint.run_count == 1
+
+            flow = self._run_flow_skip_unchanged("abc")
+
+            assert _TaskWithFingerprint.run_count == 1
+            assert flow.results[0].return_values == {"count": 1}
+            assert (
+                "Skipping fingerprinted: unchanged since its last successful run"
+                in self.flow_log["info"]
+            )
+
+    def test_run__logs_github_api_cache_stats(self):
+        flow_config = FlowConfig({"steps": {1: {"task": "pass_name"}}})
+        flow = FlowCoordinator(self.project_config, flow_config)
+        with mock.patch(
+            "cumulusci.core.flowrunner.github_api_cache_stats"
+        ) as cache_stats:
+            cache_stats.snapshot.side_effect = [(1, 1), (4, 2)]
+            flow.run(self.org_config)
+
+        assert (
+            "GitHub API requests: 3 answered from cache, 1 fetched"
+            in self.flow_log["info"]
+        )
+
+    def test_run__skip_unchanged_fingerprint_error(self):
+        _TaskWithFingerprint.run_count = 0
+        with temporary_dir() as d:
+            self.org_config.get_orginfo_cache_dir = lambda name: open_fs_resource(
+                Path(d)
+            )
+            self._run_flow_skip_unchanged("error")
+            self._run_flow_skip_unchanged("error")
+
+        assert _TaskWithFingerprint.run_count == 2
+        assert any(
+            "Could not determine whether fingerprinted has changed" in s
+            for s in self.flow_log["warning"]
+        )
+
 
 class StepSpecTest(unittest.TestCase):
     def test_repr(self):
@@ -1,4 +1,5 @@
 import os
+import time
 from unittest import mock
 import pytest
 import responses
@@ -121,6 +122,83 @@ class TestGithub(GithubApiTestMixin):
             gh = get_github_api_for_repo(None, "TestOwner", "TestRepo")
         gh.login.assert_called_once_with(token="token")
 
+    @responses.activate
+    def test_get_github_api_for_repo__cache(self, tmp_path):
+        github.github_api_cache_stats.reset()
+        url = "https://api.github.com/repos/TestOwner/TestRepo"
+        requests_seen = []
+
+        def callback(request):
+            requests_seen.append(request)
+            if request.headers.get("If-None-Match") == '"abc"':
+                return (304, {"X-RateLimit-Remaining": "4999"}, "")
+            return (200, {"ETag": '"abc"', "X-RateLimit-Remaining": "5000"}, '{"a": 1}')
+
+        responses.add_callback("GET", url, callback=callback)
+        keychain = mock.Mock(global_config_dir=tmp_path)
+        with mock.patch.dict(os.environ, {"GITHUB_TOKEN": "token"}):
+            gh = get_github_api_for_repo(keychain, "TestOwner", "TestRepo")
+
+        assert gh.session.get(url).json() == {"a": 1}
+        response = gh.session.get(url)
+        assert response.status_code == 200
+        assert response.json() == {"a": 1}
+        assert response.headers["ETag"] == '"abc"'
+        assert response.headers["X-RateLimit-Remaining"] == "4999"
+        assert "If-None-Match" not in requests_seen[0].headers
+        assert requests_seen[1].headers["If-None-Match"] == '"abc"'
+        assert github.github_api_cache_stats.snapshot() == (1, 1)
+        assert len(list((tmp_path / "github_api_cache").iterdir())) == 1
+
+    @responses.activate
+    def test_get_github_api_for_repo__cache_shared_across_tokens(self, tmp_path):
+        github.github_api_cache_stats.reset()
+        url = "https://api.github.com/repos/TestOwner/TestRepo"
+        responses.add("GET", url, json={"a": 1}, headers={"Last-Modified": "yesterday"})
+        for token in ("token1", "token2"):
+            with mock.patch.dict(os.environ, {"GITHUB_TOKEN": token}):
+                gh = get_github_api_for_repo(
+                    None, "TestOwner", "TestRepo", cache_dir=tmp_path
+                )
+            gh.session.get(url)
+
+        # The second token revalidates the entry stored for the first
+        request = responses.calls[1].request
+        assert request.headers["If-Modified-Since"] == "yesterday"
+        assert request.headers["Authorization"] == "token token2"
+        assert len(list(tmp_path.iterdir())) == 1
+
+    def test_conditional_request_cache_adapter__prune(self, tmp_path):
+        now = time.time()
+        for name, size, age in (
+            ("new", 10, 0),
+            ("recent", 10, 60),
+            ("older", 10, 120),
+            ("expired", 1, 1000),
+        ):
+            entry = tmp_path / f"{name}.json"
+            entry.write_bytes(b"x" * size)
+            os.utime(entry, (now - age, now - age))
+
+        github.ConditionalRequestCacheAdapter(tmp_path)._prune(max_size=25, max_age=500)
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "new.json",
+            "recent.json",
+        ]
+
+    @responses.activate
+    def test_get_github_api_for_repo__no_cache_dir(self):
+        gh = get_github_api_for_repo(
+            mock.Mock(
+                global_config_dir=None,
+                **{"get_service.return_value": mock.Mock(password="x", username="y")},
+            ),
+            "TestOwner",
+            "TestRepo",
+        )
+        assert gh.session.get_adapter("https://") is github.adapter
+
     @responses.activate
     def test_validate_service(self):
         responses.add("GET", "https://api.github.com/rate_limit", status=401)
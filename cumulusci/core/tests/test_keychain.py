@@ -18,6 +18,7 @@ from cumulusci.core.keychain import BaseProjectKeychain
 from cumulusci.core.keychain import BaseEncryptedProjectKeychain
 from cumulusci.core.keychain import EncryptedFileProjectKeychain
 from cumulusci.core.keychain import EnvironmentProjectKeychain
+from cumulusci.core.keychain import encrypted_file_project_keychain
 from cumulusci.core.keychain.encrypted_file_project_keychain import GlobalOrg
 from cumulusci.core.exceptions import ConfigError
 from cumulusci.core.exceptions import KeychainKeyNotFound
@@ -360,6 +361,23 @@ class TestBaseEncryptedProjectKeychain(ProjectKeychainTestMixin):
         with pytest.raises(KeychainKeyNotFound):
             keychain.get_org("test")
 
+    def test_get_org__memoized(self):
+        keychain = self.keychain_class(self.project_config, self.key)
+        keychain.set_org(self.org_config, False)
+
+        with mock.patch.object(
+            keychain, "_decrypt_config_dict", wraps=keychain._decrypt_config_dict
+        ) as decrypt:
+            org_config = keychain.get_org("test")
+            org_config.config["foo"] = "changed"
+            assert keychain.get_org("test").foo == "bar"
+            assert decrypt.call_count == 1
+
+            # saving the org invalidates the memoized config
+            keychain.set_org(org_config, False)
+            assert keychain.get_org("test").foo == "changed"
+            assert decrypt.call_count == 2
+
     # def test_decrypt_config__py2_bytes(self):
     #     keychain = self.keychain_class(self.project_config, self.key)
     #     s =
@@ -521,6 +539,40 @@ class TestEncryptedFileProjectKeychain(ProjectKeychainTestMixin):
         keychain = self.keychain_class(self.project_config, self.key)
         assert keychain.cache_dir.name == ".cci"
 
+    def test_load_orgs__lazy(self):
+        keychain = self.keychain_class(self.project_config, self.key)
+        keychain.set_org(self.org_config)
+        keychain.set_org(OrgConfig({"foo": "baz"}, "other"))
+
+        with mock.patch(
+            "cumulusci.core.keychain.encrypted_file_project_keychain._read_org_file",
+            wraps=encrypted_file_project_keychain._read_org_file,
+        ) as read_org_file:
+            keychain = self.keychain_class(self.project_config, self.key)
+            assert keychain.list_orgs() == ["other", "test"]
+            read_org_file.assert_not_called()
+
+            assert keychain.get_org("test").foo == "bar"
+            assert keychain.get_org("test").foo == "bar"
+            read_org_file.assert_called_once()
+
+            keychain.remove_org("test")
+            with pytest.raises(OrgNotFound):
+                keychain.get_org("test")
+
+    def test_sfdx_org_info(self):
+        keychain = self.keychain_class(self.project_config, self.key)
+        assert keychain.get_sfdx_org_info("test@example.com") is None
+
+        info = {"sfdx_info": {"access_token": "token"}, "fetched": 1.0}
+        keychain.set_sfdx_org_info("test@example.com", info)
+        assert keychain.get_sfdx_org_info("test@example.com") == info
+        assert keychain.get_sfdx_org_info("other@example.com") is None
+
+        # stored encrypted, so it can't be read using a different key
+        keychain = self.keychain_class(self.project_config, "6543219876543210")
+        assert keychain.get_sfdx_org_info("test@example.com") is None
+
     def test_get_default_org__with_files(self):
         keychain = self.keychain_class(self.project_config, self.key)
         org_config = OrgConfig(self.org_config.config.copy(), "test", keychain=keychain)
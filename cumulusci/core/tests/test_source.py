@@ -360,8 +360,8 @@ class TestGitHubSource(unittest.TestCase, MockUtil):
         )
 
     @responses.activate
-    @mock.patch("cumulusci.core.source.github.download_extract_github")
-    def test_fetch__cleans_up_after_failed_extract(self, download_extract_github):
+    @mock.patch("cumulusci.core.source.github.open_github_archive")
+    def test_fetch__cleans_up_after_failed_extract(self, open_github_archive):
         responses.add(
             method=responses.GET,
             url=self.repo_api_url,
@@ -378,9 +378,13 @@ class TestGitHubSource(unittest.TestCase, MockUtil):
             json=self._get_expected_tag_ref("release/1.0", "tag_sha"),
         )
         # Set up a fake IOError while extracting the zipball
-        download_extract_github.return_value = mock.Mock(
-            extractall=mock.Mock(side_effect=IOError)
-        )
+        zf = open_github_archive.return_value.__enter__.return_value
+        zf.namelist.return_value = ["toplevel/", "toplevel/cumulusci.yml"]
+        zf.infolist.return_value = [
+            zipfile.ZipInfo("toplevel/"),
+            zipfile.ZipInfo("toplevel/cumulusci.yml"),
+        ]
+        zf.extract.side_effect = IOError
 
         source = GitHubSource(
             self.project_config, {"github": "https://github.com/TestOwner/TestRepo.git"}
@@ -390,6 +394,31 @@ class TestGitHubSource(unittest.TestCase, MockUtil):
                 source.fetch()
             assert not pathlib.Path(".cci", "projects", "TestRepo", "tag_sha").exists()
 
+    @responses.activate
+    def test_fetch__uses_cached_archive(self):
+        sha = "a" * 40
+        responses.add(
+            method=responses.GET,
+            url=self.repo_api_url,
+            json=self._get_expected_repo(owner="TestOwner", name="TestRepo"),
+        )
+        archive_path = pathlib.Path(
+            self.project_config.cache_dir, "projects", "TestRepo", f"{sha}.zip"
+        )
+        archive_path.parent.mkdir(parents=True)
+        with zipfile.ZipFile(archive_path, "w") as zf:
+            zf.writestr("toplevel/", "")
+            zf.writestr("toplevel/cumulusci.yml", "project: {}")
+            zf.writestr("toplevel/src/package.xml", "<Package />")
+
+        source = GitHubSource(
+            self.project_config,
+            {"github": "https://github.com/TestOwner/TestRepo.git", "commit": sha},
+        )
+        project_config = source.fetch()
+
+        assert pathlib.Path(project_config.repo_root, "src", "package.xml").exists()
+
     @responses.activate
     def test_hash(self):
         responses.add(
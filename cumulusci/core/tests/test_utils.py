@@ -124,6 +124,35 @@ class TestDictMerger(unittest.TestCase):
             utils.dictmerge(pytz, 2)
 
 
+class TestConfigCache:
+    def test_round_trip(self, tmp_path):
+        config_file = tmp_path / "cumulusci.yml"
+        config_file.write_text("project: {}")
+        cache_path = tmp_path / "cache" / "config.pickle"
+        key = utils.get_config_cache_key([config_file])
+
+        utils.save_cached_config(cache_path, key, {"project": {}})
+        assert utils.load_cached_config(cache_path, key) == {"project": {}}
+
+        config_file.write_text("project: {name: Test}")
+        new_key = utils.get_config_cache_key([config_file])
+        assert new_key != key
+        assert utils.load_cached_config(cache_path, new_key) is None
+
+    def test_key_includes_extra_values_and_missing_files(self, tmp_path):
+        missing = tmp_path / "missing.yml"
+        assert utils.get_config_cache_key([missing], "a") != utils.get_config_cache_key(
+            [missing], "b"
+        )
+        assert utils.get_config_cache_key([None]) == utils.get_config_cache_key([None])
+
+    def test_load__corrupt(self, tmp_path):
+        cache_path = tmp_path / "config.pickle"
+        cache_path.write_bytes(b"not a pickle")
+        assert utils.load_cached_config(cache_path, "key") is None
+        assert utils.load_cached_config(tmp_path / "missing", "key") is None
+
+
 class TestCleanupCacheDir:
     def test_cleanup_cache_dir(self):
         keychain = mock.Mock()
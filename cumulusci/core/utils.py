@@ -5,8 +5,13 @@ process_bool_arg: determine true/false for a commandline arg
 decode_to_unicode: get unicode string from sf api """
 
 from datetime import datetime, timedelta
+from tempfile import NamedTemporaryFile
 import copy
 import glob
+import hashlib
+import json
+import os
+import pickle
 import pytz
 import time
 from shutil import rmtree
@@ -199,6 +204,58 @@ def dictmerge(a, b, name=None):
     return a
 
 
+def get_config_cache_key(paths, *extra):
+    """Returns a key identifying the current state of the config files at paths.
+
+    The key changes whenever one of the files is added, removed or modified,
+    when any of the extra values change, or when CumulusCI is upgraded."""
+    from cumulusci import __version__
+
+    stats = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except (OSError, TypeError):
+            stats.append([str(path), None, None])
+        else:
+            stats.append([str(path), stat.st_mtime_ns, stat.st_size])
+    key = json.dumps([__version__, stats, extra])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def load_cached_config(cache_path, cache_key):
+    """Returns the config stored at cache_path if it was stored with cache_key, else None."""
+    try:
+        with open(cache_path, "rb") as f:
+            stored_key, config = pickle.load(f)
+    except Exception:
+        # Missing, truncated or written by an incompatible version
+        return None
+    if stored_key != cache_key:
+        return None
+    return config
+
+
+def save_cached_config(cache_path, cache_key, config):
+    """Stores config at cache_path so that load_cached_config can
+    return it for as long as the cache_key stays the same."""
+    cache_dir = os.path.dirname(cache_path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with NamedTemporaryFile("wb", dir=cache_dir, delete=False) as f:
+            pickle.dump((cache_key, config), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f.name, cache_path)
+    except OSError:
+        # The cache is only an optimization
+        pass
+
+
+def hash_dependencies(dependencies):
+    """Returns a hash identifying a list of static (resolved) dependencies."""
+    key = json.dumps(dependencies, sort_keys=True, default=str)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
 def cleanup_org_cache_dirs(keychain, project_config):
     """Cleanup directories that are not associated with a connected/live org."""
 
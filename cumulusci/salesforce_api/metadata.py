@@ -9,21 +9,26 @@ based on mrbelvedere/mpinstaller/mdapi.py
 
 import base64
 import http.client
+import math
 import re
 import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from xml.dom.minidom import parseString
 from xml.sax.saxutils import escape
-from zipfile import ZipFile
+from zipfile import ZipFile, ZIP_DEFLATED
 import io
 
+from lxml import etree
 import requests
 from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
 
 from cumulusci.salesforce_api import soap_envelopes
 from cumulusci.core.exceptions import ApexTestException
-from cumulusci.utils import zip_subfolder, parse_api_datetime
+from cumulusci.utils import zip_subfolder, parse_api_datetime, package_xml_from_dict
+from cumulusci.utils.xml import metadata_tree
+from cumulusci.utils.xml.salesforce_encoding import serialize_xml_for_salesforce
 from cumulusci.salesforce_api.exceptions import MetadataComponentFailure
 from cumulusci.salesforce_api.exceptions import MetadataParseError
 from cumulusci.salesforce_api.exceptions import MetadataApiError
@@ -306,6 +311,187 @@ class ApiRetrieveUnpackaged(BaseMetadataApiCall):
         return zipfile
 
 
+def parse_package_xml_types(package_xml):
+    """Return a dict of metadata type name -> list of members from a package.xml"""
+    package = metadata_tree.fromstring(package_xml.encode("utf-8"))
+    types = {}
+    for md_type in package.findall("types"):
+        members = types.setdefault(md_type.find("name").text, [])
+        members.extend(member.text for member in md_type.findall("members"))
+    return types
+
+
+# The Metadata API only returns the permissions of a profile or permission set
+# for components included in the same retrieve, so these types are retrieved
+# with every chunk and the partial copies are merged.
+PERMISSION_METADATA_TYPES = ("Profile", "PermissionSet", "MutingPermissionSet")
+
+
+def chunk_package_types(types, chunk_size):
+    """Split a dict of metadata type -> members into size-balanced chunks.
+
+    Types with more than `chunk_size` members are split across chunks.
+    Wildcard (`*`) types can match any number of components, so they
+    are counted as a full chunk. Pieces are assigned, largest first,
+    to the least full chunk so that chunks finish at similar times.
+    Types in PERMISSION_METADATA_TYPES are added to every chunk.
+    The result is deterministic for a given manifest.
+    """
+    shared = {
+        md_type: members
+        for md_type, members in types.items()
+        if md_type in PERMISSION_METADATA_TYPES
+    }
+    pieces = []
+    for md_type, members in types.items():
+        if md_type in shared:
+            continue
+        if "*" in members:
+            pieces.append((chunk_size, md_type, members))
+            continue
+        for i in range(0, len(members), chunk_size):
+            piece = members[i : i + chunk_size]
+            pieces.append((len(piece), md_type, piece))
+    pieces.sort(key=lambda piece: -piece[0])
+
+    total = sum(piece[0] for piece in pieces)
+    chunks = [[0, {}] for _ in range(max(1, math.ceil(total / chunk_size)))]
+    for size, md_type, members in pieces:
+        chunk = min(chunks, key=lambda chunk: chunk[0])
+        if chunk[0] and chunk[0] + size > chunk_size:
+            chunk = [0, {}]
+            chunks.append(chunk)
+        chunk[0] += size
+        chunk[1].setdefault(md_type, []).extend(members)
+    chunks = [chunk_types for size, chunk_types in chunks if chunk_types] or [{}]
+    for chunk_types in chunks:
+        for md_type, members in shared.items():
+            chunk_types[md_type] = list(members)
+    return [chunk_types for chunk_types in chunks if chunk_types]
+
+
+def _metadata_element_key(element):
+    full_name = element.find("{%s}fullName" % metadata_tree.METADATA_NAMESPACE)
+    if full_name is not None:
+        return (element.tag, full_name.text)
+    return (element.tag, etree.tostring(element, with_tail=False))
+
+
+def merge_metadata_xml(first, second):
+    """Merge two retrieved versions of the same metadata XML file.
+
+    Retrieving child types (such as CustomField) in a different chunk
+    than their parent (CustomObject) returns partial copies of the
+    same file. Top-level elements from `second` that are not already
+    in `first` (matched by tag and fullName) are added after their
+    siblings. Content that is not XML is taken from `first`.
+    """
+    if first == second:
+        return first
+    try:
+        first_root = etree.fromstring(first)
+        second_root = etree.fromstring(second)
+    except etree.XMLSyntaxError:
+        return first
+    seen = {_metadata_element_key(child) for child in first_root}
+    for child in list(second_root):
+        if not isinstance(child.tag, str) or _metadata_element_key(child) in seen:
+            continue
+        siblings = first_root.findall(child.tag)
+        if siblings:
+            siblings[-1].addnext(child)
+        else:
+            first_root.append(child)
+        seen.add(_metadata_element_key(child))
+    etree.indent(first_root, space="    ")
+    return serialize_xml_for_salesforce(first_root).encode("utf-8")
+
+
+def merge_retrieved_zips(zips, package_xml=None):
+    """Merge the results of several retrieves into a single zip file.
+
+    Files are merged in the order the zips are given, so the result
+    is deterministic. Files present in more than one zip are combined
+    with merge_metadata_xml. If `package_xml` is specified it replaces
+    the package.xml returned with each retrieve.
+    """
+    contents = {}
+    for zf in zips:
+        for name in zf.namelist():
+            content = zf.read(name)
+            if name in contents:
+                content = merge_metadata_xml(contents[name], content)
+            contents[name] = content
+    if package_xml is not None:
+        contents["package.xml"] = package_xml
+    zip_dest = ZipFile(io.BytesIO(), "w", ZIP_DEFLATED)
+    for name in sorted(contents):
+        zip_dest.writestr(name, contents[name])
+    return zip_dest
+
+
+class ApiRetrieveUnpackagedChunked(object):
+    """Retrieve a package.xml manifest in concurrent, size-balanced chunks.
+
+    A single retrieve is limited to 10,000 files and 400MB and runs as
+    one long server job. Manifests with more than `chunk_size` members
+    are split by metadata type and member count, the chunks are
+    retrieved concurrently using ApiRetrieveUnpackaged, and the results
+    are merged into a single zip file. Smaller manifests are retrieved
+    with a single call.
+    """
+
+    api_class = ApiRetrieveUnpackaged
+    default_chunk_size = 2500
+    default_max_workers = 4
+
+    def __init__(
+        self, task, package_xml, api_version, chunk_size=None, max_workers=None
+    ):
+        self.task = task
+        self.package_xml = package_xml
+        self.api_version = (
+            api_version
+            if api_version
+            else task.project_config.project__package__api_version
+        )
+        self.chunk_size = int(chunk_size or self.default_chunk_size)
+        self.max_workers = int(max_workers or self.default_max_workers)
+
+    def __call__(self):
+        types = parse_package_xml_types(self.package_xml)
+        chunks = chunk_package_types(types, self.chunk_size)
+        if len(chunks) <= 1:
+            return self.api_class(self.task, self.package_xml, self.api_version)()
+
+        self.task.logger.info(
+            f"Retrieving {sum(len(members) for members in types.values())} "
+            f"components in {len(chunks)} chunks"
+        )
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(self._retrieve_chunk, chunk_types)
+                for chunk_types in chunks
+            ]
+            try:
+                zips = [future.result() for future in futures]
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        # Each chunk returns its own package.xml; replace it with the full manifest
+        package_xml = package_xml_from_dict(
+            {md_type: list(members) for md_type, members in types.items()},
+            self.api_version,
+        )
+        return merge_retrieved_zips(zips, package_xml)
+
+    def _retrieve_chunk(self, chunk_types):
+        package_xml = package_xml_from_dict(chunk_types, self.api_version)
+        return self.api_class(self.task, package_xml, self.api_version)()
+
+
 class ApiRetrieveInstalledPackages(BaseMetadataApiCall):
     check_interval = 1
     soap_envelope_start = soap_envelopes.RETRIEVE_INSTALLEDPACKAGE
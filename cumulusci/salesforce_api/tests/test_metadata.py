@@ -2,7 +2,9 @@ import http.client
 import io
 import unittest
 from collections import defaultdict
+from unittest import mock
 from xml.dom.minidom import parseString
+import zipfile
 import datetime
 
 from requests import Response
@@ -21,6 +23,11 @@ from cumulusci.salesforce_api.metadata import BaseMetadataApiCall
 from cumulusci.salesforce_api.metadata import ApiDeploy
 from cumulusci.salesforce_api.metadata import ApiListMetadata
 from cumulusci.salesforce_api.metadata import ApiRetrieveUnpackaged
+from cumulusci.salesforce_api.metadata import ApiRetrieveUnpackagedChunked
+from cumulusci.salesforce_api.metadata import chunk_package_types
+from cumulusci.salesforce_api.metadata import merge_metadata_xml
+from cumulusci.salesforce_api.metadata import merge_retrieved_zips
+from cumulusci.salesforce_api.metadata import parse_package_xml_types
 from cumulusci.salesforce_api.metadata import ApiRetrieveInstalledPackages
 from cumulusci.salesforce_api.metadata import ApiRetrievePackaged
 from cumulusci.salesforce_api.package_zip import BasePackageZipBuilder
@@ -45,6 +52,7 @@ from cumulusci.salesforce_api.tests.metadata_test_strings import (
 from cumulusci.salesforce_api.tests.metadata_test_strings import retrieve_result
 from cumulusci.salesforce_api.tests.metadata_test_strings import result_envelope
 from cumulusci.salesforce_api.tests.metadata_test_strings import status_envelope
+from cumulusci.utils import package_xml_from_dict
 
 
 class DummyPackageZipBuilder(BasePackageZipBuilder):
@@ -974,3 +982,205 @@ class TestApiRetrievePackaged(TestApiRetrieveUnpackaged):
 
     def _create_instance(self, task, api_version=None):
         return self.api_class(task, self.package_name, api_version)
+
+
+def _zip_with(files):
+    zf = zipfile.ZipFile(io.BytesIO(), "w")
+    for name, content in files.items():
+        zf.writestr(name, content)
+    return zf
+
+
+OBJECT_FIELD_A = b"""<?xml version="1.0" encoding="UTF-8"?>
+<CustomObject xmlns="http://soap.sforce.com/2006/04/metadata">
+    <fields>
+        <fullName>A__c</fullName>
+    </fields>
+</CustomObject>"""
+
+OBJECT_FIELD_B = b"""<?xml version="1.0" encoding="UTF-8"?>
+<CustomObject xmlns="http://soap.sforce.com/2006/04/metadata">
+    <fields>
+        <fullName>B__c</fullName>
+    </fields>
+    <label>Test</label>
+</CustomObject>"""
+
+
+class TestChunkedRetrieveHelpers(unittest.TestCase):
+    def test_parse_package_xml_types(self):
+        package_xml = package_xml_from_dict(
+            {"ApexClass": ["Foo", "Bar"], "CustomObject": ["*"]}, "50.0"
+        )
+        self.assertEqual(
+            {"ApexClass": ["Bar", "Foo"], "CustomObject": ["*"]},
+            parse_package_xml_types(package_xml),
+        )
+
+    def test_chunk_package_types__single_chunk(self):
+        types = {"ApexClass": ["Foo", "Bar"], "ApexPage": ["Baz"]}
+        self.assertEqual([types], chunk_package_types(types, 10))
+
+    def test_chunk_package_types__balanced(self):
+        types = {
+            "ApexClass": [f"Class{i}" for i in range(7)],
+            "ApexPage": [f"Page{i}" for i in range(3)],
+            "ApexTrigger": [f"Trigger{i}" for i in range(2)],
+        }
+        chunks = chunk_package_types(types, 5)
+        sizes = [sum(len(m) for m in chunk.values()) for chunk in chunks]
+        self.assertTrue(all(size <= 5 for size in sizes))
+        self.assertEqual(12, sum(sizes))
+        self.assertEqual(3, len(chunks))
+        retrieved = defaultdict(list)
+        for chunk in chunks:
+            for md_type, members in chunk.items():
+                retrieved[md_type].extend(members)
+        self.assertEqual(types, {k: sorted(v) for k, v in retrieved.items()})
+        self.assertEqual(chunks, chunk_package_types(types, 5))
+
+    def test_chunk_package_types__wildcard_gets_own_chunk(self):
+        types = {"ApexClass": ["*"], "ApexPage": ["Foo"]}
+        self.assertEqual(
+            [{"ApexClass": ["*"]}, {"ApexPage": ["Foo"]}],
+            chunk_package_types(types, 5),
+        )
+
+    def test_chunk_package_types__permission_types_in_every_chunk(self):
+        types = {
+            "ApexClass": [f"Class{i}" for i in range(4)],
+            "Profile": ["Admin"],
+            "PermissionSet": ["Perms"],
+        }
+        chunks = chunk_package_types(types, 2)
+        self.assertEqual(2, len(chunks))
+        for chunk in chunks:
+            self.assertEqual(["Admin"], chunk["Profile"])
+            self.assertEqual(["Perms"], chunk["PermissionSet"])
+        self.assertEqual(
+            [{"Profile": ["Admin"]}], chunk_package_types({"Profile": ["Admin"]}, 2)
+        )
+
+    def test_merge_metadata_xml__profile_permissions(self):
+        merged = merge_metadata_xml(PROFILE_A, PROFILE_B).decode("utf-8")
+        self.assertIn("<apexClass>A</apexClass>", merged)
+        self.assertIn("<apexClass>B</apexClass>", merged)
+        self.assertEqual(1, merged.count("<custom>false</custom>"))
+
+    def test_merge_metadata_xml(self):
+        merged = merge_metadata_xml(OBJECT_FIELD_A, OBJECT_FIELD_B).decode("utf-8")
+        self.assertIn("<fullName>A__c</fullName>", merged)
+        self.assertIn("<fullName>B__c</fullName>", merged)
+        self.assertIn("<label>Test</label>", merged)
+        self.assertLess(merged.index("A__c"), merged.index("B__c"))
+        self.assertLess(merged.index("B__c"), merged.index("<label>"))
+
+    def test_merge_metadata_xml__same_content(self):
+        self.assertIs(
+            OBJECT_FIELD_A, merge_metadata_xml(OBJECT_FIELD_A, OBJECT_FIELD_A)
+        )
+
+    def test_merge_metadata_xml__not_xml(self):
+        self.assertEqual(b"first", merge_metadata_xml(b"first", b"second"))
+
+    def test_merge_retrieved_zips(self):
+        zf = merge_retrieved_zips(
+            [
+                _zip_with(
+                    {
+                        "package.xml": "chunk 1",
+                        "objects/Test__c.object": OBJECT_FIELD_A,
+                        "classes/Foo.cls": "foo",
+                    }
+                ),
+                _zip_with(
+                    {
+                        "package.xml": "chunk 2",
+                        "objects/Test__c.object": OBJECT_FIELD_B,
+                    }
+                ),
+            ],
+            package_xml="full",
+        )
+        self.assertEqual(
+            ["classes/Foo.cls", "objects/Test__c.object", "package.xml"],
+            zf.namelist(),
+        )
+        self.assertEqual(b"full", zf.read("package.xml"))
+        self.assertIn(b"B__c", zf.read("objects/Test__c.object"))
+
+
+PROFILE_A = b"""<?xml version="1.0" encoding="UTF-8"?>
+<Profile xmlns="http://soap.sforce.com/2006/04/metadata">
+    <classAccesses>
+        <apexClass>A</apexClass>
+        <enabled>true</enabled>
+    </classAccesses>
+    <custom>false</custom>
+</Profile>
+"""
+
+PROFILE_B = b"""<?xml version="1.0" encoding="UTF-8"?>
+<Profile xmlns="http://soap.sforce.com/2006/04/metadata">
+    <classAccesses>
+        <apexClass>B</apexClass>
+        <enabled>true</enabled>
+    </classAccesses>
+    <custom>false</custom>
+</Profile>
+"""
+
+
+class TestApiRetrieveUnpackagedChunked(unittest.TestCase):
+    def setUp(self):
+        self.task = mock.Mock()
+        self.task.project_config.project__package__api_version = "50.0"
+        self.package_xml = package_xml_from_dict(
+            {
+                "ApexClass": [f"Class{i}" for i in range(4)],
+                "CustomField": ["Test__c.A__c", "Test__c.B__c"],
+            },
+            "50.0",
+        )
+
+    def test_single_chunk(self):
+        api = ApiRetrieveUnpackagedChunked(self.task, self.package_xml, None)
+        api.api_class = mock.Mock()
+
+        result = api()
+
+        api.api_class.assert_called_once_with(self.task, self.package_xml, "50.0")
+        self.assertIs(api.api_class.return_value.return_value, result)
+
+    def test_multiple_chunks(self):
+        def retrieve(task, package_xml, api_version):
+            types = parse_package_xml_types(package_xml)
+            files = {"package.xml": package_xml}
+            for md_type, members in types.items():
+                for member in members:
+                    files[f"{md_type}/{member}"] = member
+            return mock.Mock(return_value=_zip_with(files))
+
+        api = ApiRetrieveUnpackagedChunked(
+            self.task, self.package_xml, "49.0", chunk_size=2, max_workers=2
+        )
+        api.api_class = mock.Mock(side_effect=retrieve)
+
+        zf = api()
+
+        self.assertEqual(3, api.api_class.call_count)
+        self.assertEqual(7, len(zf.namelist()))
+        self.assertEqual(
+            parse_package_xml_types(self.package_xml),
+            parse_package_xml_types(zf.read("package.xml").decode("utf-8")),
+        )
+
+    def test_chunk_failure(self):
+        api = ApiRetrieveUnpackagedChunked(
+            self.task, self.package_xml, "49.0", chunk_size=2
+        )
+        api.api_class = mock.Mock()
+        api.api_class.return_value.side_effect = MetadataApiError("Failed", None)
+
+        with self.assertRaises(MetadataApiError):
+            api()
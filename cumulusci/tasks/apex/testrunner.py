@@ -1,17 +1,26 @@
 """ CumulusCI Tasks for running Apex Tests """
 
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+import heapq
 import html
 import io
 import json
+import os
 import re
+import subprocess
+import tempfile
 
+from cumulusci.core.config import TaskConfig
 from cumulusci.tasks.salesforce import BaseSalesforceApiTask
+from cumulusci.tasks.salesforce.sourcetracking import ListChanges
 from cumulusci.core.exceptions import (
     TaskOptionsError,
     ApexTestException,
     CumulusCIException,
 )
 from cumulusci.core.utils import process_bool_arg, process_list_arg, decode_to_unicode
+from cumulusci.utils.git import get_changed_files
 from cumulusci.utils.http.requests_utils import safe_json_from_response
 
 APEX_LIMITS = {
@@ -74,9 +83,26 @@ SELECT Id,ApexClassId,TestTimestamp,
           QueryRows,Sosl,Cpu,Dml,Soql
         FROM ApexTestResults)
 FROM ApexTestResult
-WHERE AsyncApexJobId='{}'
+WHERE AsyncApexJobId='{}' AND ApexClassId IN ({})
 """
 
+# Queue item statuses after which a test class's results are available
+FINISHED_QUEUE_ITEM_STATUSES = ("Completed", "Failed", "Aborted")
+
+# Closing markup kept at the end of partial output files so they stay valid
+JUNIT_OUTPUT_END = b"</testsuite>"
+JSON_OUTPUT_END = b"\n]"
+
+# Source file suffixes for the components tracked by the test impact index
+APEX_SOURCE_SUFFIXES = (".cls", ".trigger", ".cls-meta.xml", ".trigger-meta.xml")
+APEX_MEMBER_TYPES = ("ApexClass", "ApexTrigger")
+
+# Maximum number of Ids to include in one ApexCodeCoverage query
+COVERAGE_QUERY_CHUNK_SIZE = 200
+
+# Maximum number of names to include in one ApexClass query
+CLASS_QUERY_CHUNK_SIZE = 100
+
 
 class RunApexTests(BaseSalesforceApiTask):
     """Task to run Apex tests with the Tooling API and report results.
@@ -86,8 +112,10 @@ class RunApexTests(BaseSalesforceApiTask):
     add ones or more regular expressions to the list option `retry_failures`.
 
     When a test run fails, if all of the failures' error messages or stack traces
-    match one of these regular expressions, each failed test will be retried by
-    itself. This is often useful when running Apex tests in parallel; row locks
+    match one of these regular expressions, the failed tests will be retried.
+    Each test class with failures is retried in its own test run, one class at a
+    time, so that the retried tests don't contend with each other for row locks.
+    This is often useful when running Apex tests in parallel; row locks
     may automatically be retried. Note that retries are supported whether or not
     the org has parallel Apex testing enabled.
 
@@ -108,7 +136,17 @@ class RunApexTests(BaseSalesforceApiTask):
 
     Some projects' unit tests produce so many concurrency errors that
     it's faster to execute the entire run in serial mode than to use retries.
-    Serial and parallel mode are configured in the scratch org definition file."""
+    Serial and parallel mode are configured in the scratch org definition file.
+
+    The ``impacted_by`` option limits the run to the test classes affected by
+    changed Apex classes and triggers. Set it to ``git`` to use the files that
+    changed since ``impact_base_ref``, including untracked files, or to ``org``
+    to use the components that ``list_changes`` reports for the org. Test
+    classes are matched to changes using an index of the Apex code coverage
+    recorded by previous runs, which is stored in the project's ``.cci`` cache
+    and refreshed after each run. Test classes which are not in the index yet
+    always run, as do classes matching ``impact_always_run``. If any other
+    metadata has changed, all test classes run."""
 
     api_version = "38.0"
     name = "RunApexTests"
@@ -168,6 +206,27 @@ class RunApexTests(BaseSalesforceApiTask):
             "description": "By default, only failures get detailed output. "
             "Set verbose to True to see all passed test methods."
         },
+        "shard_orgs": {
+            "description": "Comma-separated names of additional orgs from the keychain. "
+            "If set, the test classes are split into shards of similar duration, "
+            "based on the run times in the previous json_output, which run "
+            "concurrently in this org and each of these orgs. "
+            "Their results are merged into one JUnit and json output."
+        },
+        "impacted_by": {
+            "description": "Set to git or org to run only the test classes affected "
+            "by Apex classes and triggers changed in the repository or the org. "
+            "Defaults to running all matching test classes."
+        },
+        "impact_base_ref": {
+            "description": "Git ref to compare against when impacted_by is git. "
+            "Defaults to origin/ followed by project__git__default_branch."
+        },
+        "impact_always_run": {
+            "description": "Pattern to find Apex test classes which always run when "
+            'impacted_by is set ("%" is wildcard). '
+            "Comma-separated list for multiple patterns."
+        },
     }
 
     def _init_options(self, kwargs):
@@ -229,6 +288,33 @@ class RunApexTests(BaseSalesforceApiTask):
         else:
             self.code_coverage_level = None
 
+        impacted_by = self.options.get("impacted_by")
+        if impacted_by:
+            impacted_by = impacted_by.lower()
+            if impacted_by not in ("git", "org"):
+                raise TaskOptionsError(
+                    f"Invalid value for impacted_by: {impacted_by}. Must be git or org."
+                )
+        self.options["impacted_by"] = impacted_by
+        self.options["shard_orgs"] = process_list_arg(
+            self.options.get("shard_orgs") or []
+        )
+        # Set on the tasks which run a shard to limit them to its test classes
+        self.shard_class_names = None
+        self.options["impact_base_ref"] = self.options.get(
+            "impact_base_ref",
+            "origin/{}".format(
+                self.project_config.project__git__default_branch or "master"
+            ),
+        )
+        self.options["impact_always_run"] = [
+            re.compile(
+                "^{}$".format(".*".join(re.escape(p) for p in pattern.split("%"))),
+                re.IGNORECASE,
+            )
+            for pattern in process_list_arg(self.options.get("impact_always_run", []))
+        ]
+
     # pylint: disable=W0201
     def _init_class(self):
         self.classes_by_id = {}
@@ -282,18 +368,184 @@ class RunApexTests(BaseSalesforceApiTask):
         self.logger.info("Found {} test classes".format(result["totalSize"]))
         return result
 
-    def _get_test_methods_for_class(self, class_name):
-        result = self.tooling.query(
-            f"SELECT SymbolTable FROM ApexClass WHERE Name='{class_name}'"
-        )
-        test_methods = []
+    def _get_changed_apex_names(self):
+        """Returns the names of changed Apex classes and triggers,
+        or None if other metadata has changed too."""
+        if self.options["impacted_by"] == "git":
+            return self._get_changed_apex_names_from_git()
+        return self._get_changed_apex_names_from_org()
 
+    def _get_changed_apex_names_from_git(self):
+        base_ref = self.options["impact_base_ref"]
+        repo_root = self.project_config.repo_root
         try:
-            methods = result["records"][0]["SymbolTable"]["methods"]
-        except (TypeError, IndexError, KeyError):
+            paths = get_changed_files(repo_root, base_ref)
+        except subprocess.CalledProcessError as e:
             raise CumulusCIException(
-                f"Unable to acquire symbol table for failed Apex class {class_name}"
+                f"Unable to list the files changed since {base_ref}: {e.stderr.strip()}"
+            )
+        package_path = str(self.project_config.default_package_path)
+        names = set()
+        for path in paths:
+            filename = os.path.basename(path)
+            suffix = next(
+                (s for s in APEX_SOURCE_SUFFIXES if filename.endswith(s)), None
+            )
+            if suffix:
+                names.add(filename[: -len(suffix)])
+            elif os.path.abspath(os.path.join(repo_root, path)).startswith(
+                package_path + os.sep
+            ):
+                self.logger.info(f"Found changed metadata in {path}")
+                return None
+        return names
+
+    def _get_changed_apex_names_from_org(self):
+        list_changes = ListChanges(
+            self.project_config, TaskConfig({"options": {}}), self.org_config
+        )
+        names = set()
+        for change in list_changes.get_changes():
+            if change["MemberType"] not in APEX_MEMBER_TYPES:
+                self.logger.info(
+                    "Found changed metadata {MemberType}: {MemberName}".format(**change)
+                )
+                return None
+            names.add(change["MemberName"])
+        return names
+
+    @property
+    @contextlib.contextmanager
+    def _impact_index_file(self):
+        with self.project_config.open_cache("apex_test_impact") as cache_dir:
+            yield cache_dir / "index.json"
+
+    def _load_impact_index(self):
+        """Load the mapping of test class names to the names
+        of the Apex classes and triggers they cover."""
+        with self._impact_index_file as index_file:
+            if index_file.exists():
+                with index_file.open("r") as f:
+                    return json.load(f)
+        return {}
+
+    def _select_impacted_test_classes(self, test_classes):
+        changed = self._get_changed_apex_names()
+        if changed is None:
+            self.logger.info("Running all test classes.")
+            return test_classes
+
+        index = self._load_impact_index()
+        selected = []
+        for test_class in test_classes:
+            name = test_class["Name"]
+            if (
+                name in changed
+                or name not in index
+                or any(covered in changed for covered in index[name])
+                or any(
+                    pattern.match(name) for pattern in self.options["impact_always_run"]
+                )
+            ):
+                selected.append(test_class)
+        self.logger.info(
+            "Selected {} of {} test classes affected by {} changed Apex classes and triggers".format(
+                len(selected), len(test_classes), len(changed)
+            )
+        )
+        return selected
+
+    def _update_impact_index(self):
+        """Record the Apex classes and triggers covered by the test classes in this run."""
+        class_ids = list(self.classes_by_id.keys())
+        coverage = {}
+        for i in range(0, len(class_ids), COVERAGE_QUERY_CHUNK_SIZE):
+            chunk = class_ids[i : i + COVERAGE_QUERY_CHUNK_SIZE]
+            result = self.tooling.query_all(
+                "SELECT ApexTestClassId, ApexClassOrTrigger.Name FROM ApexCodeCoverage "
+                "WHERE ApexTestClassId IN ({})".format(
+                    ", ".join(f"'{class_id}'" for class_id in chunk)
+                )
+            )
+            for record in result["records"]:
+                class_name = self.classes_by_id[record["ApexTestClassId"]]
+                coverage.setdefault(class_name, set()).add(
+                    record["ApexClassOrTrigger"]["Name"]
+                )
+
+        # Test classes without coverage records (e.g. because they failed
+        # to run) keep their previous entry, or stay unindexed.
+        index = self._load_impact_index()
+        index.update({name: sorted(covered) for name, covered in coverage.items()})
+        with self._impact_index_file as index_file:
+            with index_file.open("w") as f:
+                json.dump(index, f, indent=4, sort_keys=True)
+
+    def _get_test_methods_for_classes(self, class_names):
+        """Returns a dict of the test method names in each of the named classes.
+
+        Method lists are cached in the project cache by class name and BodyCrc,
+        so that symbol tables are only downloaded for changed classes."""
+        test_methods = {}
+        body_crcs = {}
+        for record in self._query_classes_by_name("Name, BodyCrc", class_names):
+            body_crcs[record["Name"]] = record["BodyCrc"]
+
+        with self.project_config.open_cache("apex_test_methods") as cache_dir:
+            for class_name, body_crc in body_crcs.items():
+                cache_file = cache_dir / f"{class_name}.json"
+                if cache_file.exists():
+                    with cache_file.open("r") as f:
+                        cached = json.load(f)
+                    if cached["BodyCrc"] == body_crc:
+                        test_methods[class_name] = cached["test_methods"]
+
+            uncached = [name for name in class_names if name not in test_methods]
+            if uncached:
+                records = self._query_classes_by_name(
+                    "Name, BodyCrc, SymbolTable", uncached
+                )
+                for record in records:
+                    class_name = record["Name"]
+                    test_methods[class_name] = self._parse_test_methods(
+                        record["SymbolTable"]
+                    )
+                    with (cache_dir / f"{class_name}.json").open("w") as f:
+                        json.dump(
+                            {
+                                "BodyCrc": record["BodyCrc"],
+                                "test_methods": test_methods[class_name],
+                            },
+                            f,
+                        )
+
+        for class_name in class_names:
+            if test_methods.get(class_name) is None:
+                raise CumulusCIException(
+                    f"Unable to acquire symbol table for failed Apex class {class_name}"
+                )
+        return test_methods
+
+    def _query_classes_by_name(self, fields, class_names):
+        records = []
+        for i in range(0, len(class_names), CLASS_QUERY_CHUNK_SIZE):
+            chunk = class_names[i : i + CLASS_QUERY_CHUNK_SIZE]
+            result = self.tooling.query_all(
+                "SELECT {} FROM ApexClass WHERE Name IN ({})".format(
+                    fields, ", ".join(f"'{name}'" for name in chunk)
+                )
             )
+            records.extend(result["records"])
+        return records
+
+    def _parse_test_methods(self, symbol_table):
+        """Returns the names of the test methods in a symbol table, or None."""
+        try:
+            methods = symbol_table["methods"]
+        except (TypeError, KeyError):
+            return None
+
+        test_methods = []
         for m in methods:
             for a in m.get("annotations", []):
                 if a["name"].lower() in ["istest", "testmethod"]:
@@ -328,18 +580,12 @@ class RunApexTests(BaseSalesforceApiTask):
             for each_class in test_classes["records"]
         }
 
-        result = self.tooling.query_all(TEST_RESULT_QUERY.format(self.job_id))
+        # Results are normally fetched while polling, as classes finish.
+        self._fetch_finished_test_results()
 
         if allow_retries:
             self.retry_details = {}
 
-        for test_result in result["records"]:
-            class_name = self.classes_by_id[test_result["ApexClassId"]]
-            self.results_by_class_name[class_name][
-                test_result["MethodName"]
-            ] = test_result
-            self.counts[test_result["Outcome"]] += 1
-
         # If we have class-level failures that did not come with line-level
         # failure details, report those as well.
         for class_id, error in class_level_errors.items():
@@ -354,11 +600,17 @@ class RunApexTests(BaseSalesforceApiTask):
                 self.logger.error(
                     f"Cannot access symbol table for managed class {class_name}. Failure will not be retried."
                 )
-                continue
 
-            # Get all the method names for this class
-            test_methods = self._get_test_methods_for_class(class_name)
-            for test_method in test_methods:
+        # Get all the method names for the failed classes
+        test_methods_by_class = {}
+        if class_level_errors and not self.options.get("managed"):
+            test_methods_by_class = self._get_test_methods_for_classes(
+                [self.classes_by_id[class_id] for class_id in class_level_errors]
+            )
+
+        for class_id, error in class_level_errors.items():
+            class_name = self.classes_by_id[class_id]
+            for test_method in test_methods_by_class.get(class_name, []):
                 # If this method was not run due to a class-level failure,
                 # synthesize a failed result.
                 # If we're retrying and fail again, do the same.
@@ -411,21 +663,9 @@ class RunApexTests(BaseSalesforceApiTask):
                 result = self.results_by_class_name[class_name][method_name]
                 message = f"\t{result['Outcome']}: {result['MethodName']}"
                 duration = result["RunTime"]
-                result["stats"] = self._get_stats_from_result(result)
                 if duration:
                     message += f" ({duration}ms)"
-                test_results.append(
-                    {
-                        "Children": result.get("children", None),
-                        "ClassName": decode_to_unicode(class_name),
-                        "Method": decode_to_unicode(result["MethodName"]),
-                        "Message": decode_to_unicode(result["Message"]),
-                        "Outcome": decode_to_unicode(result["Outcome"]),
-                        "StackTrace": decode_to_unicode(result["StackTrace"]),
-                        "Stats": result.get("stats", None),
-                        "TestTimestamp": result.get("TestTimestamp", None),
-                    }
-                )
+                test_results.append(self._format_test_result(class_name, result))
                 if result["Outcome"] in ["Fail", "CompileFail"]:
                     self.logger.info(message)
                     self.logger.info(f"\tMessage: {result['Message']}")
@@ -464,6 +704,19 @@ class RunApexTests(BaseSalesforceApiTask):
 
         return test_results
 
+    def _format_test_result(self, class_name, result):
+        result["stats"] = self._get_stats_from_result(result)
+        return {
+            "Children": result.get("children", None),
+            "ClassName": decode_to_unicode(class_name),
+            "Method": decode_to_unicode(result["MethodName"]),
+            "Message": decode_to_unicode(result["Message"]),
+            "Outcome": decode_to_unicode(result["Outcome"]),
+            "StackTrace": decode_to_unicode(result["StackTrace"]),
+            "Stats": result.get("stats", None),
+            "TestTimestamp": result.get("TestTimestamp", None),
+        }
+
     def _get_stats_from_result(self, result):
         stats = {"duration": result["RunTime"]}
 
@@ -510,7 +763,60 @@ class RunApexTests(BaseSalesforceApiTask):
         result = self._get_test_classes()
         if result["totalSize"] == 0:
             return
-        for test_class in result["records"]:
+        test_classes = result["records"]
+        if self.shard_class_names is not None:
+            test_classes = [
+                test_class
+                for test_class in test_classes
+                if test_class["Name"] in self.shard_class_names
+            ]
+            if not test_classes:
+                return
+        elif self.options["impacted_by"]:
+            test_classes = self._select_impacted_test_classes(test_classes)
+            if not test_classes:
+                return
+
+        if self.options["shard_orgs"]:
+            test_results = self._run_shards(test_classes)
+        else:
+            test_results = self._run_tests(test_classes)
+        self._write_output(test_results)
+
+        if (
+            self.options["impacted_by"]
+            and not self.options["managed"]
+            and not self.options["shard_orgs"]
+        ):
+            self._update_impact_index()
+
+        if self.counts.get("Fail") or self.counts.get("CompileFail"):
+            raise ApexTestException(
+                "{} tests failed and {} tests failed compilation".format(
+                    self.counts.get("Fail"), self.counts.get("CompileFail")
+                )
+            )
+
+        if self.code_coverage_level:
+            if self.options["shard_orgs"]:
+                self.logger.info(
+                    "Tests ran in multiple orgs; not checking code coverage."
+                )
+            elif (
+                self.options.get("namespace") not in self.org_config.installed_packages
+            ):
+                self._check_code_coverage()
+            else:
+                self.logger.info(
+                    "This org contains a managed installation; not checking code coverage."
+                )
+        else:
+            self.logger.info(
+                "No code coverage level specified; not checking code coverage."
+            )
+
+    def _run_tests(self, test_classes):
+        for test_class in test_classes:
             self.classes_by_id[test_class["Id"]] = test_class["Name"]
             self.classes_by_name[test_class["Name"]] = test_class["Id"]
             self.results_by_class_name[test_class["Name"]] = {}
@@ -523,6 +829,7 @@ class RunApexTests(BaseSalesforceApiTask):
             "Skip": 0,
             "Retriable": 0,
         }
+        self._start_partial_output()
         self.job_id = self._enqueue_test_run(
             (str(id) for id in self.classes_by_id.keys())
         )
@@ -531,8 +838,7 @@ class RunApexTests(BaseSalesforceApiTask):
         self._get_test_results()
 
         # Did we get back retriable test results? Check our retry policy,
-        # then enqueue new runs individually, until either (a) all retriable
-        # tests succeed or (b) a test fails.
+        # then enqueue a new run for each class with failures.
         able_to_retry = (self.counts["Retriable"] and self.options["retry_always"]) or (
             self.counts["Retriable"] and self.counts["Retriable"] == self.counts["Fail"]
         )
@@ -541,27 +847,129 @@ class RunApexTests(BaseSalesforceApiTask):
         else:
             self._attempt_retries()
 
-        test_results = self._process_test_results()
-        self._write_output(test_results)
+        return self._process_test_results()
 
-        if self.counts.get("Fail") or self.counts.get("CompileFail"):
-            raise ApexTestException(
-                "{} tests failed and {} tests failed compilation".format(
-                    self.counts.get("Fail"), self.counts.get("CompileFail")
-                )
+    def _get_class_durations(self):
+        """Sum the test method run times per class from the previous json output."""
+        durations = {}
+        json_output = self.options["json_output"]
+        if not os.path.isfile(json_output):
+            return durations
+        with io.open(json_output, mode="r", encoding="utf-8") as f:
+            try:
+                test_results = json.load(f)
+            except ValueError:
+                return durations
+        for result in test_results:
+            duration = (result.get("Stats") or {}).get("duration") or 0
+            durations[result["ClassName"]] = (
+                durations.get(result["ClassName"], 0) + duration
             )
-
-        if self.code_coverage_level:
-            if self.options.get("namespace") not in self.org_config.installed_packages:
-                self._check_code_coverage()
-            else:
+        return durations
+
+    def _get_shards(self, test_classes, shard_count):
+        """Split test class names into shard_count shards of similar total duration.
+
+        Classes are assigned longest first, each to the shard with the least
+        work so far. Classes without a recorded duration count as average."""
+        durations = self._get_class_durations()
+        default_duration = sum(durations.values()) / len(durations) if durations else 1
+        names = sorted(
+            (test_class["Name"] for test_class in test_classes),
+            key=lambda name: (-durations.get(name, default_duration), name),
+        )
+        shards = [(0, i, []) for i in range(shard_count)]
+        for name in names:
+            total, i, shard = heapq.heappop(shards)
+            shard.append(name)
+            heapq.heappush(
+                shards, (total + durations.get(name, default_duration), i, shard)
+            )
+        return [shard for _, _, shard in sorted(shards, key=lambda s: s[1])]
+
+    def _run_shards(self, test_classes):
+        keychain = self.project_config.keychain
+        org_configs = [self.org_config] + [
+            keychain.get_org(org_name) for org_name in self.options["shard_orgs"]
+        ]
+        shards = self._get_shards(test_classes, len(org_configs))
+
+        shard_tasks = []
+        with tempfile.TemporaryDirectory() as output_dir:
+            for i, (org_config, class_names) in enumerate(zip(org_configs, shards)):
+                if not class_names:
+                    continue
+                options = {
+                    **(self.task_config.options or {}),
+                    "impacted_by": None,
+                    "shard_orgs": None,
+                    "junit_output": os.path.join(output_dir, f"shard{i}.xml"),
+                    "json_output": os.path.join(output_dir, f"shard{i}.json"),
+                }
+                task = RunApexTests(
+                    self.project_config,
+                    TaskConfig({"options": options}),
+                    org_config,
+                    flow=self.flow,
+                    name=self.name,
+                    stepnum=self.stepnum,
+                )
+                task.shard_class_names = set(class_names)
+                shard_tasks.append(task)
                 self.logger.info(
-                    "This org contains a managed installation; not checking code coverage."
+                    f"Shard {i + 1}: {len(class_names)} test classes in org {org_config.name}"
                 )
-        else:
-            self.logger.info(
-                "No code coverage level specified; not checking code coverage."
+
+            with ThreadPoolExecutor(max_workers=len(shard_tasks)) as executor:
+                futures = [executor.submit(self._run_shard, t) for t in shard_tasks]
+                try:
+                    for future in futures:
+                        future.result()
+                except Exception:
+                    for future in futures:
+                        future.cancel()
+                    raise
+
+            test_results = []
+            for task in shard_tasks:
+                # A shard's org may not contain any of its test classes.
+                if not os.path.isfile(task.options["json_output"]):
+                    continue
+                with io.open(
+                    task.options["json_output"], mode="r", encoding="utf-8"
+                ) as f:
+                    test_results.extend(json.load(f))
+
+        test_results.sort(key=lambda result: (result["ClassName"], result["Method"]))
+        self.counts = {
+            key: sum(task.counts.get(key, 0) for task in shard_tasks)
+            for key in ("Pass", "Fail", "CompileFail", "Skip", "Retriable")
+        }
+        self.logger.info("-" * 80)
+        self.logger.info(
+            "All shards: Pass: {}  Retried: {}  Fail: {}  CompileFail: {}  Skip: {}".format(
+                self.counts["Pass"],
+                self.counts["Retriable"],
+                self.counts["Fail"],
+                self.counts["CompileFail"],
+                self.counts["Skip"],
             )
+        )
+        self.logger.info("-" * 80)
+
+        if self.options["impacted_by"]:
+            for task in shard_tasks:
+                if not task.options["managed"]:
+                    task._update_impact_index()
+
+        return test_results
+
+    def _run_shard(self, task):
+        try:
+            task()
+        except ApexTestException:
+            # Failures are reported once the results of all shards are merged.
+            pass
 
     def _check_code_coverage(self):
         result = self.tooling.query("SELECT PercentCovered FROM ApexOrgWideCoverage")
@@ -586,20 +994,25 @@ class RunApexTests(BaseSalesforceApiTask):
         )
         self.counts["Fail"] = 0
 
+        # Test methods in a class run one at a time, so retrying all of the
+        # class's failed methods in one run avoids the lock contention that
+        # comes from running classes in parallel.
         for class_id, test_list in self.retry_details.items():
-            for each_test in test_list:
-                self.logger.warning(
-                    "Retrying {}.{}".format(self.classes_by_id[class_id], each_test)
+            self.logger.warning(
+                "Retrying {}: {}".format(
+                    self.classes_by_id[class_id], ", ".join(test_list)
                 )
-                self.job_id = self._enqueue_test_run({class_id: [each_test]})
-                self._wait_for_tests()
-                self._get_test_results(allow_retries=False)
+            )
+            self.job_id = self._enqueue_test_run({class_id: test_list})
+            self._wait_for_tests()
+            self._get_test_results(allow_retries=False)
 
         # If the retry failed, report the remaining failures.
         if self.counts["Fail"]:
             self.logger.error("Test retry failed.")
 
     def _wait_for_tests(self):
+        self.fetched_class_ids = set()
         self.poll_complete = False
         self.poll_interval_s = int(self.options.get("poll_interval", 1))
         self.poll_count = 0
@@ -628,6 +1041,7 @@ class RunApexTests(BaseSalesforceApiTask):
         processing_class = ""
         if counts["Processing"] == 1:
             processing_class = f" ({self.classes_by_id[processing_class_id]})"
+        self._fetch_finished_test_results()
         self.logger.info(
             "Completed: {}  Processing: {}{}  Queued: {}".format(
                 counts["Completed"],
@@ -643,34 +1057,93 @@ class RunApexTests(BaseSalesforceApiTask):
             self.logger.info("Apex tests completed")
             self.poll_complete = True
 
+    def _fetch_finished_test_results(self):
+        """Fetch the results of test classes which finished since the last poll,
+        and append them to the partial outputs."""
+        class_ids = [
+            test_queue_item["ApexClassId"]
+            for test_queue_item in self.result["records"]
+            if test_queue_item["Status"] in FINISHED_QUEUE_ITEM_STATUSES
+            and test_queue_item["ApexClassId"] not in self.fetched_class_ids
+        ]
+        if not class_ids:
+            return
+        self.fetched_class_ids.update(class_ids)
+
+        test_results = []
+        for i in range(0, len(class_ids), CLASS_QUERY_CHUNK_SIZE):
+            chunk = class_ids[i : i + CLASS_QUERY_CHUNK_SIZE]
+            result = self.tooling.query_all(
+                TEST_RESULT_QUERY.format(
+                    self.job_id, ", ".join(f"'{class_id}'" for class_id in chunk)
+                )
+            )
+            for test_result in result["records"]:
+                class_name = self.classes_by_id[test_result["ApexClassId"]]
+                self.results_by_class_name[class_name][
+                    test_result["MethodName"]
+                ] = test_result
+                self.counts[test_result["Outcome"]] += 1
+                test_results.append(self._format_test_result(class_name, test_result))
+        self._append_partial_output(test_results)
+
+    def _start_partial_output(self):
+        """Start JUnit and json outputs which are extended as results arrive.
+
+        Both files are valid documents after every write, so CI can
+        report the results so far even if the run is interrupted.
+        They are replaced by the complete, sorted results at the end."""
+        with open(self.options["junit_output"], "wb") as f:
+            f.write(b"<testsuite>\n" + JUNIT_OUTPUT_END)
+        with open(self.options["json_output"], "wb") as f:
+            f.write(b"[" + JSON_OUTPUT_END)
+        self.partial_output_count = 0
+
+    def _append_partial_output(self, test_results):
+        if not test_results:
+            return
+        junit = "".join(self._format_junit_testcase(r) for r in test_results)
+        with open(self.options["junit_output"], "r+b") as f:
+            f.seek(-len(JUNIT_OUTPUT_END), os.SEEK_END)
+            f.write(junit.encode("utf-8") + JUNIT_OUTPUT_END)
+
+        entries = ",\n".join(json.dumps(r, indent=4) for r in test_results)
+        if self.partial_output_count:
+            entries = ",\n" + entries
+        else:
+            entries = "\n" + entries
+        with open(self.options["json_output"], "r+b") as f:
+            f.seek(-len(JSON_OUTPUT_END), os.SEEK_END)
+            f.write(entries.encode("utf-8") + JSON_OUTPUT_END)
+        self.partial_output_count += len(test_results)
+
+    def _format_junit_testcase(self, result):
+        s = '  <testcase classname="{}" name="{}"'.format(
+            result["ClassName"], result["Method"]
+        )
+        if "Stats" in result and result["Stats"] and "duration" in result["Stats"]:
+            s += ' time="{}"'.format(result["Stats"]["duration"])
+        if result["Outcome"] in ["Fail", "CompileFail"]:
+            s += ">\n"
+            s += '    <failure type="failed" '
+            if result["Message"]:
+                s += 'message="{}"'.format(html.escape(result["Message"]))
+            s += ">"
+
+            if result["StackTrace"]:
+                s += "<![CDATA[{}]]>".format(html.escape(result["StackTrace"]))
+            s += "</failure>\n"
+            s += "  </testcase>\n"
+        else:
+            s += " />\n"
+        return s
+
     def _write_output(self, test_results):
         junit_output = self.options["junit_output"]
         with io.open(junit_output, mode="w", encoding="utf-8") as f:
             f.write('<testsuite tests="{}">\n'.format(len(test_results)))
             for result in test_results:
-                s = '  <testcase classname="{}" name="{}"'.format(
-                    result["ClassName"], result["Method"]
-                )
-                if (
-                    "Stats" in result
-                    and result["Stats"]
-                    and "duration" in result["Stats"]
-                ):
-                    s += ' time="{}"'.format(result["Stats"]["duration"])
-                if result["Outcome"] in ["Fail", "CompileFail"]:
-                    s += ">\n"
-                    s += '    <failure type="failed" '
-                    if result["Message"]:
-                        s += 'message="{}"'.format(html.escape(result["Message"]))
-                    s += ">"
-
-                    if result["StackTrace"]:
-                        s += "<![CDATA[{}]]>".format(html.escape(result["StackTrace"]))
-                    s += "</failure>\n"
-                    s += "  </testcase>\n"
-                else:
-                    s += " />\n"
-                f.write(str(s))
+                f.write(self._format_junit_testcase(result))
             f.write("</testsuite>")
 
         json_output = self.options["json_output"]
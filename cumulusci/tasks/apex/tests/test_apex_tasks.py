@@ -1,9 +1,12 @@
 from distutils.version import StrictVersion
 import http.client
+import json
 import os
 import shutil
+import subprocess
 import tempfile
 import unittest
+import xml.etree.ElementTree as ET
 
 import responses
 from copy import deepcopy
@@ -30,6 +33,7 @@ from cumulusci.tasks.apex.anon import AnonymousApexTask
 from cumulusci.tasks.apex.batch import BatchApexWait
 from cumulusci.tasks.apex.testrunner import RunApexTests
 from cumulusci.core.tests.utils import MockLoggerMixin
+from cumulusci.utils import temporary_dir
 
 
 @patch(
@@ -44,9 +48,14 @@ class TestRunApexTests(MockLoggerMixin, unittest.TestCase):
         self.universal_config = UniversalConfig(
             {"project": {"api_version": self.api_version}}
         )
+        self.repo_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.repo_root)
+        self.junit_output = os.path.join(self.repo_root, "results_junit.xml")
+        self.json_output = os.path.join(self.repo_root, "test_results.json")
         self.task_config = TaskConfig()
         self.task_config.config["options"] = {
-            "junit_output": "results_junit.xml",
+            "junit_output": self.junit_output,
+            "json_output": self.json_output,
             "poll_interval": 1,
             "test_name_match": "%_TEST",
         }
@@ -56,6 +65,7 @@ class TestRunApexTests(MockLoggerMixin, unittest.TestCase):
         self.project_config.config["project"] = {
             "package": {"api_version": self.api_version}
         }
+        self.project_config.repo_info["root"] = self.repo_root
         keychain = BaseProjectKeychain(self.project_config, "")
         self.project_config.set_keychain(keychain)
         self.org_config = OrgConfig(
@@ -163,7 +173,7 @@ class TestRunApexTests(MockLoggerMixin, unittest.TestCase):
     def _get_mock_test_query_url(self, job_id):
         return (
             self.base_tooling_url
-            + "query/?q=%0ASELECT+Id%2CApexClassId%2CTestTimestamp%2C%0A+++++++Message%2CMethodName%2COutcome%2C%0A+++++++RunTime%2CStackTrace%2C%0A+++++++%28SELECT%0A++++++++++Id%2CCallouts%2CAsyncCalls%2CDmlRows%2CEmail%2C%0A++++++++++LimitContext%2CLimitExceptions%2CMobilePush%2C%0A++++++++++QueryRows%2CSosl%2CCpu%2CDml%2CSoql%0A++++++++FROM+ApexTestResults%29%0AFROM+ApexTestResult%0AWHERE+AsyncApexJobId%3D%27{}%27%0A".format(
+            + "query/?q=%0ASELECT+Id%2CApexClassId%2CTestTimestamp%2C%0A+++++++Message%2CMethodName%2COutcome%2C%0A+++++++RunTime%2CStackTrace%2C%0A+++++++%28SELECT%0A++++++++++Id%2CCallouts%2CAsyncCalls%2CDmlRows%2CEmail%2C%0A++++++++++LimitContext%2CLimitExceptions%2CMobilePush%2C%0A++++++++++QueryRows%2CSosl%2CCpu%2CDml%2CSoql%0A++++++++FROM+ApexTestResults%29%0AFROM+ApexTestResult%0AWHERE+AsyncApexJobId%3D%27{}%27+AND+ApexClassId+IN+%28%271%27%29%0A".format(
                 job_id
             )
         )
@@ -229,35 +239,68 @@ class TestRunApexTests(MockLoggerMixin, unittest.TestCase):
             },
         )
 
-    def _mock_get_symboltable(self):
+    def _mock_get_body_crcs(self, records):
         url = (
             self.base_tooling_url
-            + "query/?q=SELECT+SymbolTable+FROM+ApexClass+WHERE+Name%3D%27TestClass_TEST%27"
+            + "query/?q=SELECT+Name%2C+BodyCrc+FROM+ApexClass+"
+            + "WHERE+Name+IN+%28%27TestClass_TEST%27%29"
+        )
+        responses.add(
+            responses.GET,
+            url,
+            match_querystring=True,
+            json={"done": True, "totalSize": len(records), "records": records},
+        )
+
+    def _mock_get_symboltable(self, body_crc=1234.0):
+        self._mock_get_body_crcs([{"Name": "TestClass_TEST", "BodyCrc": body_crc}])
+        url = (
+            self.base_tooling_url
+            + "query/?q=SELECT+Name%2C+BodyCrc%2C+SymbolTable+FROM+ApexClass+"
+            + "WHERE+Name+IN+%28%27TestClass_TEST%27%29"
         )
 
         responses.add(
             responses.GET,
             url,
+            match_querystring=True,
             json={
+                "done": True,
+                "totalSize": 1,
                 "records": [
                     {
+                        "Name": "TestClass_TEST",
+                        "BodyCrc": body_crc,
                         "SymbolTable": {
                             "methods": [
                                 {"name": "test1", "annotations": [{"name": "isTest"}]}
                             ]
-                        }
+                        },
                     }
-                ]
+                ],
             },
         )
 
     def _mock_get_symboltable_failure(self):
+        self._mock_get_body_crcs([{"Name": "TestClass_TEST", "BodyCrc": 1234.0}])
         url = (
             self.base_tooling_url
-            + "query/?q=SELECT+SymbolTable+FROM+ApexClass+WHERE+Name%3D%27TestClass_TEST%27"
+            + "query/?q=SELECT+Name%2C+BodyCrc%2C+SymbolTable+FROM+ApexClass+"
+            + "WHERE+Name+IN+%28%27TestClass_TEST%27%29"
         )
 
-        responses.add(responses.GET, url, json={"records": []})
+        responses.add(
+            responses.GET,
+            url,
+            match_querystring=True,
+            json={
+                "done": True,
+                "totalSize": 1,
+                "records": [
+                    {"Name": "TestClass_TEST", "BodyCrc": 1234.0, "SymbolTable": None}
+                ],
+            },
+        )
 
     def _mock_tests_complete(self, job_id="JOB_ID1234567"):
         url = (
@@ -269,7 +312,7 @@ class TestRunApexTests(MockLoggerMixin, unittest.TestCase):
         expected_response = {
             "done": True,
             "totalSize": 1,
-            "records": [{"Status": "Completed"}],
+            "records": [{"Status": "Completed", "ApexClassId": 1}],
         }
         responses.add(
             responses.GET, url, match_querystring=True, json=expected_response
@@ -362,7 +405,8 @@ class TestRunApexTests(MockLoggerMixin, unittest.TestCase):
         self._mock_get_symboltable_failure()
         task_config = TaskConfig()
         task_config.config["options"] = {
-            "junit_output": "results_junit.xml",
+            "junit_output": self.junit_output,
+            "json_output": self.json_output,
             "poll_interval": 1,
             "test_name_match": "%_TEST",
             "managed": True,
@@ -370,11 +414,11 @@ class TestRunApexTests(MockLoggerMixin, unittest.TestCase):
         }
 
         task = RunApexTests(self.project_config, task_config, self.org_config)
-        task._get_test_methods_for_class = Mock()
+        task._get_test_methods_for_classes = Mock()
 
         task()
 
-        task._get_test_methods_for_class.assert_not_called()
+        task._get_test_methods_for_classes.assert_not_called()
 
     @responses.activate
     def test_run_task__retry_tests(self):
@@ -390,7 +434,8 @@ class TestRunApexTests(MockLoggerMixin, unittest.TestCase):
 
         task_config = TaskConfig()
         task_config.config["options"] = {
-            "junit_output": "results_junit.xml",
+            "junit_output": self.junit_output,
+            "json_output": self.json_output,
             "poll_interval": 1,
             "test_name_match": "%_TEST",
             "retry_failures": ["UNABLE_TO_LOCK_ROW"],
@@ -404,27 +449,25 @@ class TestRunApexTests(MockLoggerMixin, unittest.TestCase):
         self._mock_apex_class_query()
         self._mock_run_tests()
         self._mock_run_tests(body="JOBID_9999")
-        self._mock_run_tests(body="JOBID_9990")
         self._mock_get_failed_test_classes()
         self._mock_get_failed_test_classes(job_id="JOBID_9999")
-        self._mock_get_failed_test_classes(job_id="JOBID_9990")
         self._mock_tests_complete()
         self._mock_tests_complete(job_id="JOBID_9999")
-        self._mock_tests_complete(job_id="JOBID_9990")
         self._mock_get_test_results_multiple(
             ["TestOne", "TestTwo"],
             ["Fail", "Fail"],
             ["UNABLE_TO_LOCK_ROW", "LimitException"],
         )
         self._mock_get_test_results_multiple(
-            ["TestOne"], ["Pass"], [""], job_id="JOBID_9999"
-        )
-        self._mock_get_test_results_multiple(
-            ["TestTwo"], ["Fail"], ["LimitException"], job_id="JOBID_9990"
+            ["TestOne", "TestTwo"],
+            ["Pass", "Fail"],
+            ["", "LimitException"],
+            job_id="JOBID_9999",
         )
         task_config = TaskConfig()
         task_config.config["options"] = {
-            "junit_output": "results_junit.xml",
+            "junit_output": self.junit_output,
+            "json_output": self.json_output,
             "poll_interval": 1,
             "test_name_match": "%_TEST",
             "retry_failures": ["UNABLE_TO_LOCK_ROW"],
@@ -434,6 +477,15 @@ class TestRunApexTests(MockLoggerMixin, unittest.TestCase):
         with self.assertRaises(ApexTestException):
             task()
 
+        # Both failed methods were retried together in a single run
+        retry_request = json.loads(responses.calls[5].request.body)
+        assert retry_request == {
+            "tests": [{"classId": 1, "testMethods": ["TestOne", "TestTwo"]}]
+        }
+        assert task.results_by_class_name["TestClass_TEST"]["TestOne"]["Outcome"] == (
+            "Pass"
+        )
+
     @responses.activate
     def test_run_task__retry_tests_fails(self):
         self._mock_apex_class_query()
@@ -448,7 +500,8 @@ class TestRunApexTests(MockLoggerMixin, unittest.TestCase):
 
         task_config = TaskConfig()
         task_config.config["options"] = {
-            "junit_output": "results_junit.xml",
+            "junit_output": self.junit_output,
+            "json_output": self.json_output,
             "poll_interval": 1,
             "test_name_match": "%_TEST",
             "retry_failures": ["UNABLE_TO_LOCK_ROW"],
@@ -494,7 +547,8 @@ class TestRunApexTests(MockLoggerMixin, unittest.TestCase):
         task_config = TaskConfig()
         task_config.config["options"] = {
             "verbose": True,
-            "junit_output": "results_junit.xml",
+            "junit_output": self.junit_output,
+            "json_output": self.json_output,
             "poll_interval": 1,
             "test_name_match": "%_TEST",
         }
@@ -513,7 +567,8 @@ class TestRunApexTests(MockLoggerMixin, unittest.TestCase):
         self._mock_get_test_results()
         task_config = TaskConfig()
         task_config.config["options"] = {
-            "junit_output": "results_junit.xml",
+            "junit_output": self.junit_output,
+            "json_output": self.json_output,
             "poll_interval": 1,
             "test_name_match": "%_TEST",
         }
@@ -531,7 +586,8 @@ class TestRunApexTests(MockLoggerMixin, unittest.TestCase):
         self._mock_get_test_results()
         task_config = TaskConfig()
         task_config.config["options"] = {
-            "junit_output": "results_junit.xml",
+            "junit_output": self.junit_output,
+            "json_output": self.json_output,
             "poll_interval": 1,
             "test_name_match": "%_TEST",
             "required_org_code_coverage_percent": "90",
@@ -554,7 +610,8 @@ class TestRunApexTests(MockLoggerMixin, unittest.TestCase):
     def test_code_coverage_integer(self):
         task_config = TaskConfig()
         task_config.config["options"] = {
-            "junit_output": "results_junit.xml",
+            "junit_output": self.junit_output,
+            "json_output": self.json_output,
             "poll_interval": 1,
             "test_name_match": "%_TEST",
             "required_org_code_coverage_percent": 90,
@@ -575,7 +632,8 @@ class TestRunApexTests(MockLoggerMixin, unittest.TestCase):
     def test_code_coverage_percentage(self):
         task_config = TaskConfig()
         task_config.config["options"] = {
-            "junit_output": "results_junit.xml",
+            "junit_output": self.junit_output,
+            "json_output": self.json_output,
             "poll_interval": 1,
             "test_name_match": "%_TEST",
             "required_org_code_coverage_percent": "90%",
@@ -596,7 +654,8 @@ class TestRunApexTests(MockLoggerMixin, unittest.TestCase):
     def test_exception_bad_code_coverage(self):
         task_config = TaskConfig()
         task_config.config["options"] = {
-            "junit_output": "results_junit.xml",
+            "junit_output": self.junit_output,
+            "json_output": self.json_output,
             "poll_interval": 1,
             "test_name_match": "%_TEST",
             "required_org_code_coverage_percent": "foo",
@@ -614,7 +673,8 @@ class TestRunApexTests(MockLoggerMixin, unittest.TestCase):
         self._mock_get_test_results()
         task_config = TaskConfig()
         task_config.config["options"] = {
-            "junit_output": "results_junit.xml",
+            "junit_output": self.junit_output,
+            "json_output": self.json_output,
             "poll_interval": 1,
             "test_name_match": "%_TEST",
             "namespace": "TEST",
@@ -664,7 +724,8 @@ class TestRunApexTests(MockLoggerMixin, unittest.TestCase):
     def test_is_retriable_failure(self):
         task_config = TaskConfig()
         task_config.config["options"] = {
-            "junit_output": "results_junit.xml",
+            "junit_output": self.junit_output,
+            "json_output": self.json_output,
             "poll_interval": 1,
             "test_name_match": "%_TEST",
             "retry_failures": [
@@ -706,7 +767,8 @@ class TestRunApexTests(MockLoggerMixin, unittest.TestCase):
     def test_init_options__regexes(self):
         task_config = TaskConfig()
         task_config.config["options"] = {
-            "junit_output": "results_junit.xml",
+            "junit_output": self.junit_output,
+            "json_output": self.json_output,
             "poll_interval": 1,
             "test_name_match": "%_TEST",
             "retry_failures": ["UNABLE_TO_LOCK_ROW"],
@@ -721,7 +783,8 @@ class TestRunApexTests(MockLoggerMixin, unittest.TestCase):
     def test_init_options__bad_regexes(self):
         task_config = TaskConfig()
         task_config.config["options"] = {
-            "junit_output": "results_junit.xml",
+            "junit_output": self.junit_output,
+            "json_output": self.json_output,
             "poll_interval": 1,
             "test_name_match": "%_TEST",
             "retry_failures": ["("],
@@ -760,6 +823,394 @@ class TestRunApexTests(MockLoggerMixin, unittest.TestCase):
         task()
         self.assertIsNone(task.result)
 
+    def test_partial_output(self):
+        with temporary_dir():
+            task = RunApexTests(self.project_config, self.task_config, self.org_config)
+            task._start_partial_output()
+            with open(self.junit_output) as f:
+                self.assertEqual(0, len(ET.fromstring(f.read())))
+            with open(self.json_output) as f:
+                self.assertEqual([], json.load(f))
+
+            task._append_partial_output([self._shard_result("A_TEST")])
+            task._append_partial_output(
+                [self._shard_result("B_TEST", "Fail"), self._shard_result("C_TEST")]
+            )
+            with open(self.junit_output) as f:
+                testsuite = ET.fromstring(f.read())
+            with open(self.json_output) as f:
+                test_results = json.load(f)
+        self.assertEqual(
+            ["A_TEST", "B_TEST", "C_TEST"],
+            [testcase.get("classname") for testcase in testsuite],
+        )
+        self.assertIsNotNone(testsuite[1].find("failure"))
+        self.assertEqual(
+            ["A_TEST", "B_TEST", "C_TEST"], [r["ClassName"] for r in test_results]
+        )
+
+    def test_fetch_finished_test_results(self):
+        with temporary_dir():
+            task = RunApexTests(self.project_config, self.task_config, self.org_config)
+            task._init_class()
+            task.tooling = Mock()
+            task.tooling.query_all.side_effect = lambda query: {
+                "records": self._get_mock_test_query_results(
+                    ["TestMethod"], ["Pass"], ["Test Passed"]
+                )["records"]
+                if "IN ('1')" in query
+                else []
+            }
+            task.classes_by_id = {1: "TestClass_TEST", 2: "Other_TEST"}
+            task.results_by_class_name = {"TestClass_TEST": {}, "Other_TEST": {}}
+            task.counts = {"Pass": 0}
+            task.job_id = "JOB_ID1234567"
+            task._start_partial_output()
+            task.fetched_class_ids = set()
+
+            task.result = {
+                "records": [
+                    {"ApexClassId": 1, "Status": "Completed"},
+                    {"ApexClassId": 2, "Status": "Processing"},
+                ]
+            }
+            task._fetch_finished_test_results()
+            task.result["records"][1]["Status"] = "Failed"
+            task._fetch_finished_test_results()
+            task._fetch_finished_test_results()
+
+            with open(self.json_output) as f:
+                test_results = json.load(f)
+
+        queries = [c[0][0] for c in task.tooling.query_all.call_args_list]
+        self.assertEqual(2, len(queries))
+        assert "ApexClassId IN ('1')" in queries[0]
+        assert "ApexClassId IN ('2')" in queries[1]
+        self.assertEqual({"Pass": 1}, task.counts)
+        assert "TestMethod" in task.results_by_class_name["TestClass_TEST"]
+        self.assertEqual(["TestClass_TEST"], [r["ClassName"] for r in test_results])
+
+    @responses.activate
+    def test_get_test_methods_for_classes__cached(self):
+        self._mock_get_symboltable()
+        self._mock_get_body_crcs([{"Name": "TestClass_TEST", "BodyCrc": 1234.0}])
+        task = RunApexTests(self.project_config, self.task_config, self.org_config)
+        task._init_task()
+        expected = {"TestClass_TEST": ["test1"]}
+        self.assertEqual(
+            expected, task._get_test_methods_for_classes(["TestClass_TEST"])
+        )
+        self.assertEqual(2, len(responses.calls))
+
+        # The second lookup only checks that the class body is unchanged
+        self.assertEqual(
+            expected, task._get_test_methods_for_classes(["TestClass_TEST"])
+        )
+        self.assertEqual(3, len(responses.calls))
+
+    @responses.activate
+    def test_get_test_methods_for_classes__changed_body(self):
+        self._mock_get_symboltable()
+        self._mock_get_symboltable(body_crc=5678.0)
+        task = RunApexTests(self.project_config, self.task_config, self.org_config)
+        task._init_task()
+        task._get_test_methods_for_classes(["TestClass_TEST"])
+        task._get_test_methods_for_classes(["TestClass_TEST"])
+        self.assertEqual(4, len(responses.calls))
+
+    @responses.activate
+    def test_get_test_methods_for_classes__missing_class(self):
+        self._mock_get_body_crcs([])
+        url = (
+            self.base_tooling_url
+            + "query/?q=SELECT+Name%2C+BodyCrc%2C+SymbolTable+FROM+ApexClass+"
+            + "WHERE+Name+IN+%28%27TestClass_TEST%27%29"
+        )
+        responses.add(
+            responses.GET,
+            url,
+            match_querystring=True,
+            json={"done": True, "totalSize": 0, "records": []},
+        )
+        task = RunApexTests(self.project_config, self.task_config, self.org_config)
+        task._init_task()
+        with self.assertRaises(CumulusCIException):
+            task._get_test_methods_for_classes(["TestClass_TEST"])
+
+    def test_query_classes_by_name__chunks(self):
+        task = RunApexTests(self.project_config, self.task_config, self.org_config)
+        task.tooling = Mock()
+        task.tooling.query_all.side_effect = [
+            {"records": [{"Name": "A"}]},
+            {"records": [{"Name": "B"}]},
+        ]
+        class_names = [f"Class{i}" for i in range(150)]
+        records = task._query_classes_by_name("Name", class_names)
+        self.assertEqual([{"Name": "A"}, {"Name": "B"}], records)
+        self.assertEqual(2, task.tooling.query_all.call_count)
+        assert "'Class99')" in task.tooling.query_all.call_args_list[0][0][0]
+        assert "('Class100', " in task.tooling.query_all.call_args_list[1][0][0]
+
+    def _mock_coverage_query(self, covered):
+        url = (
+            self.base_tooling_url
+            + "query/?q=SELECT+ApexTestClassId%2C+ApexClassOrTrigger.Name+"
+            + "FROM+ApexCodeCoverage+WHERE+ApexTestClassId+IN+%28%271%27%29"
+        )
+        responses.add(
+            responses.GET,
+            url,
+            match_querystring=True,
+            json={
+                "done": True,
+                "totalSize": len(covered),
+                "records": [
+                    {"ApexTestClassId": 1, "ApexClassOrTrigger": {"Name": name}}
+                    for name in covered
+                ],
+            },
+        )
+
+    def _write_impact_index(self, index):
+        with self.project_config.open_cache("apex_test_impact") as cache_dir:
+            with (cache_dir / "index.json").open("w") as f:
+                json.dump(index, f)
+
+    def _read_impact_index(self):
+        with self.project_config.open_cache("apex_test_impact") as cache_dir:
+            with (cache_dir / "index.json").open("r") as f:
+                return json.load(f)
+
+    @responses.activate
+    @patch("cumulusci.tasks.apex.testrunner.get_changed_files")
+    def test_run_task__impacted_by_git(self, get_changed_files):
+        get_changed_files.return_value = [
+            "src/classes/Foo.cls",
+            "src/classes/Foo.cls-meta.xml",
+            "README.md",
+        ]
+        self._mock_apex_class_query()
+        self._mock_run_tests()
+        self._mock_get_failed_test_classes()
+        self._mock_tests_complete()
+        self._mock_get_test_results()
+        self._mock_coverage_query(["Bar", "Foo"])
+        self.task_config.config["options"]["impacted_by"] = "git"
+        with temporary_dir():
+            self._write_impact_index({"TestClass_TEST": ["Foo"]})
+            task = RunApexTests(self.project_config, self.task_config, self.org_config)
+            task()
+            get_changed_files.assert_called_once_with(self.repo_root, "origin/master")
+            self.assertEqual(len(responses.calls), 6)
+            self.assertEqual(
+                {"TestClass_TEST": ["Bar", "Foo"]}, self._read_impact_index()
+            )
+
+    @responses.activate
+    @patch("cumulusci.tasks.apex.testrunner.get_changed_files")
+    def test_run_task__impacted_by_git__not_affected(self, get_changed_files):
+        get_changed_files.return_value = ["src/classes/Foo.cls"]
+        self._mock_apex_class_query()
+        self.task_config.config["options"]["impacted_by"] = "git"
+        with temporary_dir():
+            self._write_impact_index({"TestClass_TEST": ["Bar"]})
+            task = RunApexTests(self.project_config, self.task_config, self.org_config)
+            task()
+            self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    @patch("cumulusci.tasks.apex.testrunner.get_changed_files")
+    def test_run_task__impacted_by_git__always_run(self, get_changed_files):
+        get_changed_files.return_value = ["src/classes/Foo.cls"]
+        self._mock_apex_class_query()
+        self._mock_run_tests()
+        self._mock_get_failed_test_classes()
+        self._mock_tests_complete()
+        self._mock_get_test_results()
+        self._mock_coverage_query([])
+        self.task_config.config["options"]["impacted_by"] = "git"
+        self.task_config.config["options"]["impact_always_run"] = "Other,testclass_%"
+        with temporary_dir():
+            self._write_impact_index({"TestClass_TEST": ["Bar"]})
+            task = RunApexTests(self.project_config, self.task_config, self.org_config)
+            task()
+            self.assertEqual(len(responses.calls), 6)
+            # Without coverage records the previous entry is kept
+            self.assertEqual({"TestClass_TEST": ["Bar"]}, self._read_impact_index())
+
+    @patch("cumulusci.tasks.apex.testrunner.get_changed_files")
+    def test_select_impacted_test_classes__other_metadata(self, get_changed_files):
+        get_changed_files.return_value = [
+            "src/classes/Foo.cls",
+            "src/objects/Account.object",
+        ]
+        self.task_config.config["options"]["impacted_by"] = "git"
+        test_classes = [{"Id": 1, "Name": "TestClass_TEST"}]
+        with temporary_dir():
+            self._write_impact_index({"TestClass_TEST": ["Bar"]})
+            task = RunApexTests(self.project_config, self.task_config, self.org_config)
+            self.assertEqual(
+                test_classes, task._select_impacted_test_classes(test_classes)
+            )
+
+    @patch("cumulusci.tasks.apex.testrunner.get_changed_files")
+    def test_select_impacted_test_classes__git_error(self, get_changed_files):
+        get_changed_files.side_effect = subprocess.CalledProcessError(
+            128, "git", stderr="fatal: bad revision\n"
+        )
+        self.task_config.config["options"]["impacted_by"] = "git"
+        task = RunApexTests(self.project_config, self.task_config, self.org_config)
+        with self.assertRaises(CumulusCIException) as e:
+            task._select_impacted_test_classes([])
+        assert "fatal: bad revision" in str(e.exception)
+
+    @patch("cumulusci.tasks.apex.testrunner.ListChanges")
+    def test_select_impacted_test_classes__org(self, ListChanges):
+        list_changes = ListChanges.return_value
+        list_changes.get_changes.return_value = [
+            {"MemberType": "ApexClass", "MemberName": "Foo"},
+            {"MemberType": "ApexTrigger", "MemberName": "AccountTrigger"},
+        ]
+        self.task_config.config["options"]["impacted_by"] = "org"
+        test_classes = [
+            {"Id": 1, "Name": "Foo_TEST"},
+            {"Id": 2, "Name": "Bar_TEST"},
+            {"Id": 3, "Name": "New_TEST"},
+        ]
+        with temporary_dir():
+            self._write_impact_index(
+                {"Foo_TEST": ["AccountTrigger"], "Bar_TEST": ["Bar"]}
+            )
+            task = RunApexTests(self.project_config, self.task_config, self.org_config)
+            selected = task._select_impacted_test_classes(test_classes)
+        self.assertEqual(["Foo_TEST", "New_TEST"], [c["Name"] for c in selected])
+        list_changes.get_changes.assert_called_once_with()
+
+    @patch("cumulusci.tasks.apex.testrunner.ListChanges")
+    def test_select_impacted_test_classes__org_other_metadata(self, ListChanges):
+        list_changes = ListChanges.return_value
+        list_changes.get_changes.return_value = [
+            {"MemberType": "CustomField", "MemberName": "Account.Foo__c"}
+        ]
+        self.task_config.config["options"]["impacted_by"] = "org"
+        test_classes = [{"Id": 1, "Name": "Foo_TEST"}]
+        task = RunApexTests(self.project_config, self.task_config, self.org_config)
+        self.assertEqual(test_classes, task._select_impacted_test_classes(test_classes))
+
+    def _shard_result(self, class_name, outcome="Pass"):
+        return {
+            "ClassName": class_name,
+            "Method": "test1",
+            "Message": None,
+            "Outcome": outcome,
+            "StackTrace": None,
+            "Stats": {"duration": 10},
+        }
+
+    def test_get_shards(self):
+        with temporary_dir():
+            with open(self.json_output, "w") as f:
+                json.dump(
+                    [
+                        {"ClassName": "A_TEST", "Stats": {"duration": 50}},
+                        {"ClassName": "A_TEST", "Stats": {"duration": 40}},
+                        {"ClassName": "B_TEST", "Stats": {"duration": 60}},
+                        {"ClassName": "C_TEST", "Stats": {"duration": 30}},
+                        {"ClassName": "D_TEST", "Stats": None},
+                    ],
+                    f,
+                )
+            task = RunApexTests(self.project_config, self.task_config, self.org_config)
+            shards = task._get_shards(
+                [{"Name": name} for name in ("A_TEST", "B_TEST", "C_TEST", "E_TEST")],
+                2,
+            )
+        # E_TEST has no history, so counts as the average of 45
+        self.assertEqual([["A_TEST", "C_TEST"], ["B_TEST", "E_TEST"]], shards)
+
+    def test_get_class_durations__invalid_json(self):
+        with temporary_dir():
+            with open(self.json_output, "w") as f:
+                f.write("<testsuite />")
+            task = RunApexTests(self.project_config, self.task_config, self.org_config)
+            self.assertEqual({}, task._get_class_durations())
+
+    def _run_sharded_task(self, outcomes):
+        other_org_config = OrgConfig(
+            {
+                "id": "foo/2",
+                "instance_url": "https://example2.com",
+                "access_token": "abc123",
+            },
+            "other",
+        )
+        self.project_config.keychain.get_org = Mock(return_value=other_org_config)
+        self.task_config.config["options"]["shard_orgs"] = "other"
+        shard_orgs = {}
+
+        def run_tests(task, test_classes):
+            shard_orgs[task.org_config.name] = [c["Name"] for c in test_classes]
+            task.counts = {"Pass": 0, "Fail": 0, "Retriable": 0}
+            results = []
+            for test_class in test_classes:
+                outcome = outcomes[test_class["Name"]]
+                task.counts[outcome] += 1
+                results.append(self._shard_result(test_class["Name"], outcome))
+            return results
+
+        test_classes = {
+            "totalSize": 3,
+            "records": [
+                {"Id": 1, "Name": "A_TEST"},
+                {"Id": 2, "Name": "B_TEST"},
+                {"Id": 3, "Name": "C_TEST"},
+            ],
+        }
+        task = RunApexTests(self.project_config, self.task_config, self.org_config)
+        with patch.object(
+            RunApexTests, "_get_test_classes", return_value=test_classes
+        ), patch.object(
+            RunApexTests, "_run_tests", autospec=True, side_effect=run_tests
+        ):
+            try:
+                task()
+            finally:
+                with open(self.junit_output) as f:
+                    junit = f.read()
+                with open(self.json_output) as f:
+                    test_results = json.load(f)
+        self.project_config.keychain.get_org.assert_called_once_with("other")
+        return task, shard_orgs, junit, test_results
+
+    def test_run_task__shards(self):
+        with temporary_dir():
+            task, shard_orgs, junit, test_results = self._run_sharded_task(
+                {"A_TEST": "Pass", "B_TEST": "Pass", "C_TEST": "Pass"}
+            )
+        self.assertEqual(
+            {"test": ["A_TEST", "C_TEST"], "other": ["B_TEST"]}, shard_orgs
+        )
+        self.assertEqual(
+            ["A_TEST", "B_TEST", "C_TEST"], [r["ClassName"] for r in test_results]
+        )
+        assert '<testsuite tests="3">' in junit
+        self.assertEqual(3, task.counts["Pass"])
+
+    def test_run_task__shards_failed(self):
+        with temporary_dir():
+            with self.assertRaises(ApexTestException) as e:
+                self._run_sharded_task(
+                    {"A_TEST": "Pass", "B_TEST": "Fail", "C_TEST": "Fail"}
+                )
+        self.assertEqual(
+            "2 tests failed and 0 tests failed compilation", str(e.exception)
+        )
+
+    def test_init_options__bad_impacted_by(self):
+        self.task_config.config["options"]["impacted_by"] = "svn"
+        with self.assertRaises(TaskOptionsError):
+            RunApexTests(self.project_config, self.task_config, self.org_config)
+
 
 @patch(
     "cumulusci.tasks.salesforce.BaseSalesforceTask._update_credentials",
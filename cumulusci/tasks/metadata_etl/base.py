@@ -6,7 +6,7 @@ from urllib.parse import quote, unquote
 
 from cumulusci.core.exceptions import CumulusCIException, TaskOptionsError
 from cumulusci.core.tasks import BaseSalesforceTask
-from cumulusci.salesforce_api.metadata import ApiRetrieveUnpackaged
+from cumulusci.salesforce_api.metadata import ApiRetrieveUnpackagedChunked
 from cumulusci.tasks.metadata.package import PackageXmlGenerator
 from cumulusci.core.utils import process_bool_arg, process_list_arg
 from cumulusci.utils import inject_namespace
@@ -116,7 +116,7 @@ class BaseMetadataETLTask(BaseSalesforceTask, metaclass=ABCMeta):
     def _retrieve(self):
         """Retrieve metadata into self.retrieve_dir"""
         self.logger.info("Extracting existing metadata...")
-        api_retrieve = ApiRetrieveUnpackaged(
+        api_retrieve = ApiRetrieveUnpackagedChunked(
             self,
             self._generate_package_xml(MetadataOperation.RETRIEVE),
             self.api_version,
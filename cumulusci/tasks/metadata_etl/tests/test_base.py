@@ -43,7 +43,7 @@ class TestBaseMetadataETLTask:
         task.options["managed"] = False
         assert task._inject_namespace("%%%NAMESPACE%%%Test__c") == "Test__c"
 
-    @mock.patch("cumulusci.tasks.metadata_etl.base.ApiRetrieveUnpackaged")
+    @mock.patch("cumulusci.tasks.metadata_etl.base.ApiRetrieveUnpackagedChunked")
     def test_retrieve(self, api_mock):
         task = create_task(
             MetadataETLTask,
@@ -516,6 +516,7 @@ class CreatePackageVersion(BaseSalesforceApiTask):
             dependency["repo_name"],
             dependency["subfolder"],
             ref=dependency.get("ref"),
+            cache_dir=self.project_config.cache_dir / "projects",
         )
         package_zip_builder = MetadataPackageZipBuilder.from_zipfile(
             zip_src, options=dependency, logger=self.logger
@@ -1,7 +1,32 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import json
+import queue
+import threading
+import time
 from functools import lru_cache
 
 from simple_salesforce import SalesforceMalformedRequest
+from simple_salesforce.exceptions import SalesforceError
+
+# Seconds to wait before resubmitting a batch after REQUEST_LIMIT_EXCEEDED;
+# doubled for each consecutive occurrence.
+REQUEST_LIMIT_BACKOFF = 5
+# Consecutive REQUEST_LIMIT_EXCEEDED responses tolerated before giving up
+REQUEST_LIMIT_RETRIES = 5
+# Maximum number of PackageSubscriber queries run at the same time
+SUBSCRIBER_QUERY_WORKERS = 4
+# Maximum number of PackageSubscriber records retrieved ahead of the consumer
+SUBSCRIBER_QUEUE_SIZE = 2000
+
+
+def is_request_limit_exceeded(error):
+    """Returns True if a Salesforce API error reports REQUEST_LIMIT_EXCEEDED."""
+    content = error.content if isinstance(error.content, list) else [error.content]
+    return any(
+        isinstance(item, dict) and item.get("errorCode") == "REQUEST_LIMIT_EXCEEDED"
+        for item in content
+    )
 
 
 def batch_list(data, batch_size):
@@ -17,6 +42,18 @@ def batch_list(data, batch_size):
     return batch_list
 
 
+def iter_batches(data, batch_size):
+    """Yields lists of up to batch_size items as they are read from data."""
+    batch_data = []
+    for item in data:
+        batch_data.append(item)
+        if len(batch_data) == batch_size:
+            yield batch_data
+            batch_data = []
+    if batch_data:
+        yield batch_data
+
+
 class BasePushApiObject(object):
     def format_where(self, id_field, where=None):
         base_where = "%s = '%s'" % (id_field, self.sf_id)
@@ -249,7 +286,15 @@ class PackageSubscriber(object):
 class SalesforcePushApi(object):
     """ API Wrapper for the Salesforce Push API """
 
-    def __init__(self, sf, logger, lazy=None, default_where=None, batch_size=None):
+    def __init__(
+        self,
+        sf,
+        logger,
+        lazy=None,
+        default_where=None,
+        batch_size=None,
+        concurrent_batches=None,
+    ):
         self.sf = sf
         self.logger = logger
 
@@ -265,6 +310,10 @@ class SalesforcePushApi(object):
             batch_size = 200
         self.batch_size = batch_size
 
+        if not concurrent_batches:
+            concurrent_batches = 1
+        self.concurrent_batches = concurrent_batches
+
     def return_query_records(self, query):
         res = self.sf.query_all(query)
         if res["totalSize"] > 0:
@@ -366,6 +415,63 @@ class SalesforcePushApi(object):
         query = self.add_query_limit(query, limit)
         return self.return_query_records(query)
 
+    def iter_subscribers(self, where=None, limit=None):
+        """Yields PackageSubscriber records page by page as they are retrieved.
+
+        Unlike get_subscribers, the results are not cached."""
+        where = self.format_where_clause(where, obj="PackageSubscriber")
+        query = (
+            "SELECT Id, MetadataPackageVersionId, InstalledStatus, OrgName, OrgKey, OrgStatus, OrgType from PackageSubscriber%s"
+            % where
+        )
+        query = self.add_query_limit(query, limit)
+        yield from self.sf.query_all_iter(query)
+
+    def iter_subscribers_concurrently(
+        self, wheres, max_workers=SUBSCRIBER_QUERY_WORKERS
+    ):
+        """Yields the PackageSubscriber records matching each of the where clauses.
+
+        The queries run in parallel and records are yielded as soon as any
+        query returns a page, so results from different queries interleave.
+        The queries pause while SUBSCRIBER_QUEUE_SIZE records are waiting
+        to be consumed, and stop if the consumer does."""
+        records = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        done = object()
+        stopped = threading.Event()
+
+        def put(item):
+            while not stopped.is_set():
+                try:
+                    records.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def run_query(where):
+            try:
+                for record in self.iter_subscribers(where):
+                    if not put(record):
+                        return
+            finally:
+                put(done)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(run_query, where) for where in wheres]
+            try:
+                remaining = len(futures)
+                while remaining:
+                    record = records.get()
+                    if record is done:
+                        remaining -= 1
+                    else:
+                        yield record
+                for future in futures:
+                    future.result()
+            finally:
+                stopped.set()
+
     @lru_cache(32)
     def get_subscriber_objs(self, where=None, limit=None):
         subscriber_objs = []
@@ -519,6 +625,11 @@ class SalesforcePushApi(object):
         return push_errors
 
     def create_push_request(self, version, orgs, start):
+        """Create a push request and add orgs to it.
+
+        orgs may be any iterable of org keys, including a generator; batches
+        are submitted while it is still being consumed. If adding the orgs
+        fails, the push request is canceled."""
 
         # Create the request
         res = self.sf.PackagePushRequest.create(
@@ -526,31 +637,35 @@ class SalesforcePushApi(object):
         )
         request_id = res["id"]
 
-        # remove duplicates
-        n_orgs_pre = len(orgs)
+        # remove duplicates as the orgs arrive
+        seen = set()
+        n_orgs_pre = 0
+
+        def unique_orgs():
+            nonlocal n_orgs_pre
+            for org in orgs:
+                n_orgs_pre += 1
+                if org not in seen:
+                    seen.add(org)
+                    yield org
+
+        # Schedule the orgs
+        batches = iter_batches(unique_orgs(), self.batch_size)
+        try:
+            scheduled_orgs = self._add_batches(batches, request_id)
+        except Exception:
+            self.logger.warning(
+                "Canceling push request {} after an error".format(request_id)
+            )
+            self.cancel_push_request(request_id)
+            raise
         self.logger.info("Found {} orgs".format(n_orgs_pre))
-        orgs = set(orgs)
-        if len(orgs) < n_orgs_pre:
+        if len(seen) < n_orgs_pre:
             self.logger.warning(
                 "Removed {} duplicate orgs ({} remain)".format(
-                    n_orgs_pre - len(orgs), len(orgs)
-                )
-            )
-
-        # Schedule the orgs
-        batches = batch_list(orgs, self.batch_size)
-        scheduled_orgs = 0
-        for batch_num, batch in enumerate(batches):
-            self.logger.info(
-                "Batch {} of {}: Attempting to add {} orgs".format(
-                    batch_num + 1, len(batches), len(batch)
+                    n_orgs_pre - len(seen), len(seen)
                 )
             )
-            valid_batch = self._add_batch(batch, request_id)
-            scheduled_orgs += len(valid_batch)
-            self.logger.info(
-                "{} orgs successfully added to batch".format(len(valid_batch))
-            )
         self.logger.info(
             "Push request {} is populated with {} orgs".format(
                 request_id, scheduled_orgs
@@ -558,59 +673,159 @@ class SalesforcePushApi(object):
         )
         return request_id, scheduled_orgs
 
-    def _add_batch(self, batch: list, request_id) -> list:
+    def _add_batches(self, batches, request_id):
+        """Add batches of orgs to the push request, up to concurrent_batches at a time.
+
+        Concurrency is halved when Salesforce reports REQUEST_LIMIT_EXCEEDED,
+        and the batch is resubmitted after a backoff. Batches which were
+        already running when the backoff started are resubmitted without
+        another backoff. Concurrency grows back by one after each run of
+        successful batches. batches may be a generator; it is
+        only advanced when there is room for another batch. Returns the number
+        of orgs added."""
+        batches = enumerate(batches, start=1)
+        exhausted = False
+        pending = deque()
+        running = {}
+        concurrency = self.concurrent_batches
+        successes = 0
+        limit_errors = 0
+        # Incremented for each backoff, to tell which batches were submitted
+        # after the latest one
+        backoffs = 0
+        scheduled_orgs = 0
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.concurrent_batches) as executor:
+            try:
+                while pending or running or not exhausted:
+                    while len(running) < concurrency:
+                        if pending:
+                            batch_num, batch = pending.popleft()
+                        else:
+                            next_batch = next(batches, None)
+                            if next_batch is None:
+                                exhausted = True
+                                break
+                            batch_num, batch = next_batch
+                        self.logger.info(
+                            "Batch {}: Attempting to add {} orgs".format(
+                                batch_num, len(batch)
+                            )
+                        )
+                        future = executor.submit(self._add_batch, batch, request_id)
+                        running[future] = (batch_num, batch, backoffs)
+                    if not running:
+                        continue
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        batch_num, batch, submitted_after = running.pop(future)
+                        try:
+                            valid_batch = future.result()
+                        except SalesforceError as e:
+                            if not is_request_limit_exceeded(e):
+                                raise
+                            pending.appendleft((batch_num, batch))
+                            if submitted_after < backoffs:
+                                continue
+                            limit_errors += 1
+                            if limit_errors > REQUEST_LIMIT_RETRIES:
+                                raise
+                            successes = 0
+                            concurrency = max(1, concurrency // 2)
+                            backoff = REQUEST_LIMIT_BACKOFF * 2 ** (limit_errors - 1)
+                            self.logger.warning(
+                                "Request limit exceeded. Retrying batch {} in {} seconds "
+                                "with up to {} concurrent batches".format(
+                                    batch_num, backoff, concurrency
+                                )
+                            )
+                            time.sleep(backoff)
+                            backoffs += 1
+                            continue
+
+                        if submitted_after == backoffs:
+                            limit_errors = 0
+                        successes += 1
+                        if (
+                            concurrency < self.concurrent_batches
+                            and successes >= concurrency
+                        ):
+                            concurrency += 1
+                            successes = 0
+                        scheduled_orgs += len(valid_batch)
+                        elapsed = max(time.monotonic() - start, 0.001)
+                        self.logger.info(
+                            "Batch {}: {} orgs successfully added "
+                            "({} orgs in {:.0f}s, {:.1f} orgs/s)".format(
+                                batch_num,
+                                len(valid_batch),
+                                scheduled_orgs,
+                                elapsed,
+                                scheduled_orgs / elapsed,
+                            )
+                        )
+            except Exception:
+                for future in running:
+                    future.cancel()
+                raise
+        return scheduled_orgs
 
-        # add orgs to batch data
-        batch_data = {"records": []}
-        for i, org in enumerate(batch):
-            batch_data["records"].append(
-                {
-                    "attributes": {"type": "PackagePushJob", "referenceId": org},
-                    "PackagePushRequestId": request_id,
-                    "SubscriberOrganizationKey": org,
-                }
-            )
+    def _add_batch(self, batch: list, request_id) -> list:
+        """Add a batch of orgs to the push request, leaving out invalid orgs.
+
+        Returns the orgs which were added."""
+        batch = list(batch)
+        while batch:
+            # add orgs to batch data
+            batch_data = {"records": []}
+            for org in batch:
+                batch_data["records"].append(
+                    {
+                        "attributes": {"type": "PackagePushJob", "referenceId": org},
+                        "PackagePushRequestId": request_id,
+                        "SubscriberOrganizationKey": org,
+                    }
+                )
 
-        # add batch to push request
-        try:
-            self.sf._call_salesforce(
-                "POST",
-                self.sf.base_url + "composite/tree/PackagePushJob",
-                data=json.dumps(batch_data),
-            )
-        except SalesforceMalformedRequest as e:
-            invalid_orgs = set()
-            retry_all = False
-            for result in e.content["results"]:
-                for error in result["errors"]:
-                    if "Something bad has happened" in error["message"]:
-                        retry_all = True
+            # add batch to push request
+            try:
+                self.sf._call_salesforce(
+                    "POST",
+                    self.sf.base_url + "composite/tree/PackagePushJob",
+                    data=json.dumps(batch_data),
+                )
+                return batch
+            except SalesforceMalformedRequest as e:
+                invalid_orgs = set()
+                retry_all = False
+                for result in e.content["results"]:
+                    for error in result["errors"]:
+                        if "Something bad has happened" in error["message"]:
+                            retry_all = True
+                            break
+                        if error["statusCode"] in [
+                            "DUPLICATE_VALUE",
+                            "INVALID_OPERATION",
+                            "UNKNOWN_EXCEPTION",
+                        ]:
+                            org_id = result["referenceId"]
+                            invalid_orgs.add(org_id)
+                            self.logger.info(
+                                "Skipping org {} - {}".format(org_id, error["message"])
+                            )
+                        else:
+                            raise
+                    if retry_all:
                         break
-                    if error["statusCode"] in [
-                        "DUPLICATE_VALUE",
-                        "INVALID_OPERATION",
-                        "UNKNOWN_EXCEPTION",
-                    ]:
-                        org_id = result["referenceId"]
-                        invalid_orgs.add(org_id)
-                        self.logger.info(
-                            "Skipping org {} - {}".format(org_id, error["message"])
-                        )
-                    else:
-                        raise
                 if retry_all:
-                    break
-            if retry_all:
-                self.logger.warning("Retrying batch")
-                batch = self._add_batch(batch, request_id)
-            else:
-                for org_id in invalid_orgs:
-                    batch.remove(org_id)
-                if batch:
-                    self.logger.warning("Retrying batch without invalid orgs")
-                    batch = self._add_batch(batch, request_id)
+                    self.logger.warning("Retrying batch")
                 else:
-                    self.logger.error("Skipping batch (no valid orgs)")
+                    batch = [org for org in batch if org not in invalid_orgs]
+                    if batch:
+                        self.logger.warning("Retrying batch without invalid orgs")
+                    else:
+                        self.logger.error("Skipping batch (no valid orgs)")
         return batch
 
     def cancel_push_request(self, request_id):
@@ -1,17 +1,40 @@
+import contextlib
 import csv
 from datetime import datetime
 from datetime import timedelta
 import time
+
+from simple_salesforce.exceptions import SalesforceError
+
 from cumulusci.core.exceptions import TaskOptionsError
 from cumulusci.core.exceptions import CumulusCIException
 from cumulusci.core.exceptions import PushApiObjectNotFound
 from cumulusci.tasks.push.push_api import SalesforcePushApi
 from cumulusci.tasks.salesforce import BaseSalesforceApiTask
+from cumulusci.utils import parse_api_datetime
+
+PUSH_ERROR_FIELDS = (
+    "ErrorSeverity",
+    "ErrorType",
+    "ErrorTitle",
+    "ErrorMessage",
+    "ErrorDetails",
+)
+FAILED_PUSH_JOB_QUERY = (
+    "SELECT Id, SubscriberOrganizationKey, SystemModstamp, "
+    + "(SELECT {} FROM PackagePushErrors) ".format(", ".join(PUSH_ERROR_FIELDS))
+    + "FROM PackagePushJob "
+    + "WHERE PackagePushRequestId = '{request_id}' AND Status = 'Failed'"
+)
 
 
 class BaseSalesforcePushTask(BaseSalesforceApiTask):
     completed_statuses = ["Succeeded", "Failed", "Canceled"]
     api_version = "38.0"
+    # Seconds between job status reports while a push is running
+    status_interval = 10
+    # Completed jobs required before max_failure_rate is enforced
+    failure_rate_min_jobs = 20
 
     def _init_task(self):
         super(BaseSalesforcePushTask, self)._init_task()
@@ -114,85 +137,201 @@ class BaseSalesforcePushTask(BaseSalesforceApiTask):
 
         self.push_request = self.push_request[0]
 
-    def _get_push_request_job_results(self):
-        failed_jobs = []
-        success_jobs = []
-        canceled_jobs = []
-
-        jobs = self.push_request.get_push_job_objs()
-        for job in jobs:
-            if job.status == "Failed":
-                failed_jobs.append(job)
-            elif job.status == "Succeeded":
-                success_jobs.append(job)
-            elif job.status == "Canceled":
-                canceled_jobs.append(job)
+    def _get_push_job_status_counts(self, request_id):
+        result = self.sf.query_all(
+            "SELECT Status, COUNT(Id) FROM PackagePushJob "
+            + "WHERE PackagePushRequestId = '{}' GROUP BY Status".format(request_id)
+        )
+        return {record["Status"]: record["expr0"] for record in result["records"]}
 
+    def _get_push_request_job_results(self):
+        request_id = self.push_request.sf_id
+        counts = self._get_push_job_status_counts(request_id)
         self.logger.info(
             "Push complete: {} succeeded, {} failed, {} canceled".format(
-                len(success_jobs), len(failed_jobs), len(canceled_jobs)
+                counts.get("Succeeded", 0),
+                counts.get("Failed", 0),
+                counts.get("Canceled", 0),
             )
         )
+        if not counts.get("Failed"):
+            return
 
+        # Stream the failed jobs with their errors and count them by error
         failed_by_error = {}
-        for job in failed_jobs:
-            errors = job.get_push_error_objs()
-            for error in errors:
-                error_key = (
-                    error.error_type,
-                    error.title,
-                    error.message,
-                    error.details,
+        failures_csv = self.options.get("failures_csv")
+        with contextlib.ExitStack() as stack:
+            writer = None
+            if failures_csv:
+                f = stack.enter_context(
+                    open(failures_csv, "w", newline="", encoding="utf-8")
                 )
-                if error_key not in failed_by_error:
-                    failed_by_error[error_key] = []
-                failed_by_error[error_key].append(error)
-
-        if failed_jobs:
-            self.logger.info("-----------------------------------")
-            self.logger.info("Failures by error type")
-            self.logger.info("-----------------------------------")
-            for key, errors in failed_by_error.items():
-                self.logger.info("    ")
-                self.logger.info("{} failed with...".format(len(errors)))
-                self.logger.info("    Error Type = {}".format(key[0]))
-                self.logger.info("    Title = {}".format(key[1]))
-                self.logger.info("    Message = {}".format(key[2]))
-                self.logger.info("    Details = {}".format(key[3]))
+                writer = csv.writer(f)
+                writer.writerow(["OrganizationId"] + list(PUSH_ERROR_FIELDS))
+
+            jobs = self.sf.query_all_iter(
+                FAILED_PUSH_JOB_QUERY.format(request_id=request_id)
+            )
+            for job in jobs:
+                errors = (job.get("PackagePushErrors") or {}).get("records") or [{}]
+                for error in errors:
+                    error_key = (
+                        error.get("ErrorType"),
+                        error.get("ErrorTitle"),
+                        error.get("ErrorMessage"),
+                        error.get("ErrorDetails"),
+                    )
+                    failed_by_error[error_key] = failed_by_error.get(error_key, 0) + 1
+                    if writer:
+                        writer.writerow(
+                            [job["SubscriberOrganizationKey"]]
+                            + [error.get(field) or "" for field in PUSH_ERROR_FIELDS]
+                        )
+
+        self.logger.info("-----------------------------------")
+        self.logger.info("Failures by error type")
+        self.logger.info("-----------------------------------")
+        for key, count in failed_by_error.items():
+            self.logger.info("    ")
+            self.logger.info("{} failed with...".format(count))
+            self.logger.info("    Error Type = {}".format(key[0]))
+            self.logger.info("    Title = {}".format(key[1]))
+            self.logger.info("    Message = {}".format(key[2]))
+            self.logger.info("    Details = {}".format(key[3]))
+        if failures_csv:
+            self.logger.info("Wrote failed orgs to {}".format(failures_csv))
 
     def _report_push_status(self, request_id):
         self._get_push_request_query(request_id)
         # Check if the request is complete
-        interval = 10
         if self.push_request.status not in self.completed_statuses:
             self.logger.info(
                 "Push request is not yet complete."
-                + " Polling for status every {} seconds until completion".format(
-                    interval
+                + " Reporting job status every {} seconds until completion".format(
+                    self.status_interval
                 )
             )
-
-        # Loop waiting for request completion
-        i = 0
-        while self.push_request.status not in self.completed_statuses:
-            if i == 10:
-                self.logger.info("This is taking a while! Polling every 60 seconds")
-                interval = 60
-            time.sleep(interval)
-
-            # Clear the method level cache on get_push_requests and
-            # get_push_request_objs
-            self.push_report.get_push_requests.cache_clear()
-            self.push_report.get_push_request_objs.cache_clear()
-            # Get the push_request again
-            self.push_request = self.push_report.get_push_request_objs(
-                "Id = '{}'".format(request_id), limit=1
-            )[0]
-            self.logger.info(self.push_request.status)
-            i += 1
+            self._monitor_push_jobs(request_id)
 
         self._get_push_request_job_results()
 
+    def _get_push_request_status(self, request_id):
+        result = self.sf.query(
+            "SELECT Status FROM PackagePushRequest WHERE Id = '{}'".format(request_id)
+        )
+        return result["records"][0]["Status"]
+
+    def _monitor_push_jobs(self, request_id):
+        """Report job progress from status aggregates until the request completes.
+
+        Each poll logs the per-status counts with the throughput and an
+        estimated completion time, and lists orgs which failed since the
+        previous poll. Raises CumulusCIException if the share of failed jobs
+        exceeds the max_failure_rate option."""
+        start = time.monotonic()
+        completed_at_start = None
+        last_counts = None
+        failed_job_ids = set()
+        failures_since = None
+        while True:
+            counts = self._get_push_job_status_counts(request_id)
+            completed = sum(counts.get(status, 0) for status in self.completed_statuses)
+            if completed_at_start is None:
+                completed_at_start = completed
+            if counts != last_counts:
+                last_counts = counts
+                self.logger.info(
+                    self._format_push_progress(
+                        counts, completed - completed_at_start, start
+                    )
+                )
+                if counts.get("Failed", 0) > len(failed_job_ids):
+                    failures_since = self._report_new_failures(
+                        request_id, failed_job_ids, failures_since
+                    )
+                self._check_failure_rate(request_id, counts, completed)
+
+            if self._get_push_request_status(request_id) in self.completed_statuses:
+                return
+            time.sleep(self.status_interval)
+
+    def _format_push_progress(self, counts, newly_completed, start):
+        total = sum(counts.values())
+        completed = sum(counts.get(status, 0) for status in self.completed_statuses)
+        message = "Push status: {} ({} of {} jobs complete".format(
+            ", ".join(
+                "{} {}".format(count, status)
+                for status, count in sorted(counts.items())
+            ),
+            completed,
+            total,
+        )
+        elapsed_minutes = (time.monotonic() - start) / 60
+        if newly_completed and elapsed_minutes:
+            orgs_per_minute = newly_completed / elapsed_minutes
+            eta = datetime.utcnow() + timedelta(
+                minutes=(total - completed) / orgs_per_minute
+            )
+            message += ", {:.1f} orgs/minute, estimated completion {:%H:%M} UTC".format(
+                orgs_per_minute, eta
+            )
+        return message + ")"
+
+    def _report_new_failures(self, request_id, failed_job_ids, since=None):
+        """Logs the failed jobs which are not in failed_job_ids yet.
+
+        Only jobs modified since the datetime since (to the second) are
+        retrieved. Returns the latest modification time of the failed jobs,
+        to pass as since for the next poll."""
+        query = FAILED_PUSH_JOB_QUERY.format(request_id=request_id)
+        if since is not None:
+            query += " AND SystemModstamp >= {:%Y-%m-%dT%H:%M:%SZ}".format(since)
+        for job in self.sf.query_all_iter(query):
+            modstamp = parse_api_datetime(job["SystemModstamp"])
+            if since is None or modstamp > since:
+                since = modstamp
+            if job["Id"] in failed_job_ids:
+                continue
+            failed_job_ids.add(job["Id"])
+            errors = (job.get("PackagePushErrors") or {}).get("records") or [{}]
+            self.logger.warning(
+                "Push failed for org {}: {}".format(
+                    job["SubscriberOrganizationKey"],
+                    "; ".join(
+                        "{} - {}".format(
+                            error.get("ErrorTitle"), error.get("ErrorMessage")
+                        )
+                        for error in errors
+                    ),
+                )
+            )
+        return since
+
+    def _check_failure_rate(self, request_id, counts, completed):
+        max_failure_rate = self.options.get("max_failure_rate")
+        if max_failure_rate is None or completed < self.failure_rate_min_jobs:
+            return
+        failure_rate = 100 * counts.get("Failed", 0) / completed
+        if failure_rate <= max_failure_rate:
+            return
+
+        self.logger.error(
+            "{:.1f}% of completed jobs failed, which exceeds max_failure_rate of {}%."
+            " Canceling push request {}".format(
+                failure_rate, max_failure_rate, request_id
+            )
+        )
+        try:
+            self.push_report.cancel_push_request(request_id)
+        except SalesforceError as e:
+            # Requests can only be canceled before they start running
+            self.logger.warning("Unable to cancel push request: {}".format(e))
+        raise CumulusCIException(
+            "Push request {} aborted: {:.1f}% of completed jobs failed".format(
+                request_id, failure_rate
+            )
+        )
+
 
 class SchedulePushOrgList(BaseSalesforcePushTask):
 
@@ -228,11 +367,36 @@ class SchedulePushOrgList(BaseSalesforcePushTask):
                 + " Defaults to 200."
             )
         },
+        "concurrent_batches": {
+            "description": (
+                "Number of batches of orgs to add to the push request at the same time."
+                + " Reduced automatically while Salesforce reports REQUEST_LIMIT_EXCEEDED."
+                + " Defaults to 1."
+            )
+        },
+        "failures_csv": {
+            "description": (
+                "If set, the path of a CSV file to write with each failed org"
+                + " and its errors once the push completes."
+            )
+        },
+        "max_failure_rate": {
+            "description": (
+                "If set, the percentage of completed jobs that may fail before"
+                + " the task attempts to cancel the push request and stops."
+                + " Only checked while reporting the status of a running push."
+            )
+        },
     }
 
     def _init_task(self):
         super(SchedulePushOrgList, self)._init_task()
-        self.push = SalesforcePushApi(self.sf, self.logger, self.options["batch_size"])
+        self.push = SalesforcePushApi(
+            self.sf,
+            self.logger,
+            batch_size=self.options["batch_size"],
+            concurrent_batches=self.options["concurrent_batches"],
+        )
 
     def _init_options(self, kwargs):
         super(SchedulePushOrgList, self)._init_options(kwargs)
@@ -247,8 +411,26 @@ class SchedulePushOrgList(BaseSalesforcePushTask):
         # already set
         if "namespace" not in self.options:
             self.options["namespace"] = self.project_config.project__package__namespace
-        if "batch_size" not in self.options:
-            self.options["batch_size"] = 200
+        try:
+            self.options["batch_size"] = int(self.options.get("batch_size", 200))
+            self.options["concurrent_batches"] = int(
+                self.options.get("concurrent_batches", 1)
+            )
+        except ValueError:
+            raise TaskOptionsError("batch_size and concurrent_batches must be integers")
+        if self.options["batch_size"] < 1 or self.options["concurrent_batches"] < 1:
+            raise TaskOptionsError(
+                "batch_size and concurrent_batches must be at least 1"
+            )
+        if self.options.get("max_failure_rate") is not None:
+            try:
+                self.options["max_failure_rate"] = float(
+                    self.options["max_failure_rate"]
+                )
+            except ValueError:
+                raise TaskOptionsError("max_failure_rate must be a number")
+            if not 0 <= self.options["max_failure_rate"] <= 100:
+                raise TaskOptionsError("max_failure_rate must be between 0 and 100")
         if "csv" not in self.options and "csv_field_name" in self.options:
             raise TaskOptionsError("Please provide a csv file for this task to run.")
 
@@ -349,9 +531,17 @@ class SchedulePushOrgQuery(SchedulePushOrgList):
                 + " Ex: 2016-10-19T10:00"
             )
         },
+        "batch_size": SchedulePushOrgList.task_options["batch_size"],
+        "concurrent_batches": SchedulePushOrgList.task_options["concurrent_batches"],
+        "failures_csv": SchedulePushOrgList.task_options["failures_csv"],
+        "max_failure_rate": SchedulePushOrgList.task_options["max_failure_rate"],
     }
 
     def _get_orgs(self):
+        """Returns a generator of the OrgKeys of the matching subscribers.
+
+        Subscribers are streamed from the API, so scheduling can begin
+        before every page of results has been retrieved."""
         subscriber_where = self.options.get("subscriber_where")
         default_where = {
             "PackageSubscriber": ("OrgStatus = 'Active' AND InstalledStatus = 'i'")
@@ -369,8 +559,6 @@ class SchedulePushOrgQuery(SchedulePushOrgList):
         if min_version:
             min_version = self._get_version(package, self.options.get("min_version"))
 
-        orgs = []
-
         if min_version:
             # If working with a range of versions, use an inclusive search
             versions = version.get_older_released_version_objs(
@@ -388,16 +576,12 @@ class SchedulePushOrgQuery(SchedulePushOrgList):
 
             # Query orgs for each version in the range individually to avoid
             # query timeout errors with querying multiple versions
-            for included_version in included_versions:
-                # Clear the get_subscribers method cache before each call
-                push_api.get_subscribers.cache_clear()
-                push_api.default_where[
-                    "PackageSubscriber"
-                ] = "{} AND MetadataPackageVersionId = '{}'".format(
-                    default_where["PackageSubscriber"], included_version
-                )
-                for subscriber in push_api.get_subscribers():
-                    orgs.append(subscriber["OrgKey"])
+            subscribers = push_api.iter_subscribers_concurrently(
+                [
+                    "MetadataPackageVersionId = '{}'".format(included_version)
+                    for included_version in included_versions
+                ]
+            )
 
         else:
             # If working with a specific version rather than a range, use an
@@ -420,7 +604,6 @@ class SchedulePushOrgQuery(SchedulePushOrgList):
                     "('" + "','".join(excluded_versions) + "')"
                 )
 
-            for subscriber in push_api.get_subscribers():
-                orgs.append(subscriber["OrgKey"])
+            subscribers = push_api.iter_subscribers()
 
-        return orgs
+        return (subscriber["OrgKey"] for subscriber in subscribers)
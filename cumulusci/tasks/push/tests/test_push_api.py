@@ -1,9 +1,13 @@
+import collections
 import datetime
 import json
+import threading
+import time
 from unittest import mock
 
 import pytest
 from simple_salesforce import SalesforceMalformedRequest
+from simple_salesforce.exceptions import SalesforceRefusedRequest
 
 from cumulusci.tasks.push.push_api import (
     BasePushApiObject,
@@ -15,6 +19,8 @@ from cumulusci.tasks.push.push_api import (
     PackageSubscriber,
     SalesforcePushApi,
     batch_list,
+    is_request_limit_exceeded,
+    iter_batches,
 )
 
 NAME = "Chewbacca"
@@ -273,6 +279,56 @@ def test_sf_push_get_subscribers(sf_push_api):
     sf_push_api.return_query_records.assert_called_with(query)
 
 
+def test_sf_push_iter_subscribers(sf_push_api):
+    query = "SELECT Id, MetadataPackageVersionId, InstalledStatus, OrgName, OrgKey, OrgStatus, OrgType from PackageSubscriber WHERE Name='foo'"
+    sf_push_api.sf.query_all_iter.return_value = iter([{"OrgKey": ORG_KEY}])
+    assert [{"OrgKey": ORG_KEY}] == list(sf_push_api.iter_subscribers("Name='foo'"))
+    sf_push_api.sf.query_all_iter.assert_called_once_with(query)
+
+
+def test_sf_push_iter_subscribers_concurrently(sf_push_api):
+    sf_push_api.default_where = {"PackageSubscriber": "OrgStatus = 'Active'"}
+    sf_push_api.sf.query_all_iter.side_effect = lambda query: iter(
+        [{"OrgKey": query[-4:-2]}, {"OrgKey": query[-4:-2] + "2"}]
+    )
+
+    records = sf_push_api.iter_subscribers_concurrently(["Id = '01'", "Id = '02'"])
+
+    assert ["01", "012", "02", "022"] == sorted(r["OrgKey"] for r in records)
+    assert 2 == sf_push_api.sf.query_all_iter.call_count
+    assert (
+        "WHERE (OrgStatus = 'Active') AND (Id = '01')"
+        in sf_push_api.sf.query_all_iter.call_args_list[0][0][0]
+    )
+
+
+def test_sf_push_iter_subscribers_concurrently__error(sf_push_api):
+    sf_push_api.sf.query_all_iter.side_effect = SalesforceMalformedRequest(
+        "url", 400, "PackageSubscriber", "Malformed"
+    )
+
+    with pytest.raises(SalesforceMalformedRequest):
+        list(sf_push_api.iter_subscribers_concurrently(["Id = '01'"]))
+
+
+def test_sf_push_iter_subscribers_concurrently__backpressure(sf_push_api):
+    produced = []
+
+    def query_all_iter(query):
+        for i in range(100):
+            produced.append(i)
+            yield {"OrgKey": str(i)}
+
+    sf_push_api.sf.query_all_iter.side_effect = query_all_iter
+
+    with mock.patch("cumulusci.tasks.push.push_api.SUBSCRIBER_QUEUE_SIZE", 5):
+        records = sf_push_api.iter_subscribers_concurrently(["Id = '01'"])
+        assert "0" == next(records)["OrgKey"]
+        time.sleep(0.2)
+        assert len(produced) <= 7
+        records.close()
+
+
 def test_sf_push_get_subscriber_objs(sf_push_api):
     query = "SELECT Id, MetadataPackageVersionId, InstalledStatus, OrgName, OrgKey, OrgStatus, OrgType from PackageSubscriber WHERE Name='foo'"
     sf_push_api.return_query_records = mock.MagicMock()
@@ -418,6 +474,138 @@ def test_sf_push_create_push_request(sf_push_api, metadata_package_version):
     assert 2 == actual_org_count
 
 
+def test_sf_push_create_push_request__streamed_orgs(
+    sf_push_api, metadata_package_version
+):
+    sf_push_api.batch_size = 2
+    sf_push_api.sf.PackagePushRequest.create.return_value = {"id": "0DV"}
+    sf_push_api._add_batch = mock.Mock(side_effect=lambda batch, request_id: batch)
+    orgs = (org for org in ["00D1", "00D2", "00D1", "00D3"])
+
+    actual_id, actual_org_count = sf_push_api.create_push_request(
+        metadata_package_version, orgs, datetime.datetime.now()
+    )
+
+    assert "0DV" == actual_id
+    assert 3 == actual_org_count
+    assert [
+        mock.call(["00D1", "00D2"], "0DV"),
+        mock.call(["00D3"], "0DV"),
+    ] == sf_push_api._add_batch.call_args_list
+    sf_push_api.logger.warning.assert_called_once_with(
+        "Removed 1 duplicate orgs (3 remain)"
+    )
+
+
+def test_sf_push_create_push_request__error(sf_push_api, metadata_package_version):
+    sf_push_api.sf.PackagePushRequest.create.return_value = {"id": "0DV"}
+    sf_push_api._add_batch = mock.Mock(side_effect=lambda batch, request_id: batch)
+
+    def orgs():
+        yield "00D1"
+        raise SalesforceMalformedRequest("url", 400, "PackageSubscriber", "Malformed")
+
+    with pytest.raises(SalesforceMalformedRequest):
+        sf_push_api.create_push_request(
+            metadata_package_version, orgs(), datetime.datetime.now()
+        )
+
+    sf_push_api.sf.PackagePushRequest.update.assert_called_once_with(
+        "0DV", {"Status": "Canceled"}
+    )
+
+
+def request_limit_exceeded():
+    return SalesforceRefusedRequest(
+        "url",
+        403,
+        "PackagePushJob",
+        [{"errorCode": "REQUEST_LIMIT_EXCEEDED", "message": "Limit exceeded"}],
+    )
+
+
+def test_is_request_limit_exceeded():
+    assert is_request_limit_exceeded(request_limit_exceeded())
+    assert not is_request_limit_exceeded(
+        SalesforceRefusedRequest("url", 403, "PackagePushJob", "Forbidden")
+    )
+
+
+def test_sf_push_add_batches__concurrent(sf_push_api):
+    sf_push_api.concurrent_batches = 3
+    sf_push_api._add_batch = mock.Mock(side_effect=lambda batch, request_id: batch)
+    batches = batch_list([f"00D00000000000{i}" for i in range(10)], 2)
+
+    assert 10 == sf_push_api._add_batches(batches, "0DV")
+    assert 5 == sf_push_api._add_batch.call_count
+
+
+@mock.patch("time.sleep")
+def test_sf_push_add_batches__request_limit_exceeded(sleep, sf_push_api):
+    sf_push_api.concurrent_batches = 2
+    responses = iter([request_limit_exceeded(), None, None, None])
+
+    def add_batch(batch, request_id):
+        error = next(responses)
+        if error:
+            raise error
+        return batch
+
+    sf_push_api._add_batch = mock.Mock(side_effect=add_batch)
+    batches = [["00D000000000001"], ["00D000000000002"], ["00D000000000003"]]
+
+    assert 3 == sf_push_api._add_batches(batches, "0DV")
+    assert 4 == sf_push_api._add_batch.call_count
+    sleep.assert_called_once_with(5)
+    sf_push_api.logger.warning.assert_called_once_with(
+        "Request limit exceeded. Retrying batch 1 in 5 seconds "
+        "with up to 1 concurrent batches"
+    )
+
+
+@mock.patch("time.sleep")
+def test_sf_push_add_batches__request_limit_exceeded_repeatedly(sleep, sf_push_api):
+    sf_push_api._add_batch = mock.Mock(side_effect=request_limit_exceeded())
+
+    with pytest.raises(SalesforceRefusedRequest):
+        sf_push_api._add_batches([["00D000000000001"]], "0DV")
+    assert [mock.call(5), mock.call(10), mock.call(20), mock.call(40)] == (
+        sleep.call_args_list[:4]
+    )
+    assert 6 == sf_push_api._add_batch.call_count
+
+
+@mock.patch("time.sleep")
+def test_sf_push_add_batches__request_limit_exceeded_concurrently(sleep, sf_push_api):
+    sf_push_api.concurrent_batches = 8
+    started = threading.Barrier(8)
+    attempts = collections.Counter()
+
+    def add_batch(batch, request_id):
+        attempts[batch[0]] += 1
+        if attempts[batch[0]] == 1:
+            started.wait(timeout=5)
+            raise request_limit_exceeded()
+        return batch
+
+    sf_push_api._add_batch = mock.Mock(side_effect=add_batch)
+    batches = [[f"00D00000000000{i}"] for i in range(8)]
+
+    assert 8 == sf_push_api._add_batches(batches, "0DV")
+    assert 16 == sf_push_api._add_batch.call_count
+    sleep.assert_called_once_with(5)
+
+
+def test_sf_push_add_batches__error(sf_push_api):
+    sf_push_api._add_batch = mock.Mock(
+        side_effect=SalesforceRefusedRequest("url", 403, "PackagePushJob", "Forbidden")
+    )
+
+    with pytest.raises(SalesforceRefusedRequest):
+        sf_push_api._add_batches([["00D000000000001"], ["00D000000000002"]], "0DV")
+    assert 1 == sf_push_api._add_batch.call_count
+
+
 def test_sf_push_add_push_batch(sf_push_api, metadata_package_version):
     push_request_id = "0DV?xxxxxx?"
     metadata_package_version.sf_id = "0KM?xxxxx?"
@@ -507,6 +695,13 @@ def test_sf_push_add_push_batch_retry(sf_push_api, metadata_package_version):
     assert 4 == sf_push_api.sf._call_salesforce.call_count
 
 
+def test_push_iter_batches():
+    batches = iter_batches(iter(["zero", "one", "two"]), 2)
+    assert ["zero", "one"] == next(batches)
+    assert [["two"]] == list(batches)
+    assert [] == list(iter_batches([], 2))
+
+
 def test_push_batch_list():
     data = ["zero", "one", "two", "three"]
 
@@ -1,8 +1,10 @@
+import csv
 import datetime
 import os
 from unittest import mock
 import pytest
 import logging
+from simple_salesforce import SalesforceMalformedRequest
 
 from cumulusci.core.exceptions import (
     CumulusCIException,
@@ -13,7 +15,6 @@ from cumulusci.tasks.push.push_api import (
     MetadataPackage,
     MetadataPackageVersion,
     PackagePushRequest,
-    PackagePushJob,
 )
 from cumulusci.tasks.push.tasks import (
     BaseSalesforcePushTask,
@@ -167,39 +168,6 @@ def metadata_package_version_2(metadata_package):
     )
 
 
-@pytest.fixture
-def package_push_job_success():
-    return PackagePushJob(
-        push_api=mock.MagicMock(),
-        request=mock.Mock(),
-        org="00D63000000ApoXEAS",
-        status="Succeeded",
-        sf_id=SF_ID,
-    )
-
-
-@pytest.fixture
-def package_push_job_failure():
-    return PackagePushJob(
-        push_api=mock.MagicMock(),
-        request=mock.Mock(),
-        org="00D63000000ApoXEAS",
-        status="Failed",
-        sf_id=SF_ID,
-    )
-
-
-@pytest.fixture
-def package_push_job_cancel():
-    return PackagePushJob(
-        push_api=mock.MagicMock(),
-        request=mock.Mock(),
-        org="00D63000000ApoXEAS",
-        status="Canceled",
-        sf_id=SF_ID,
-    )
-
-
 @pytest.fixture
 def package_push_request_failure():
     return PackagePushRequest(
@@ -355,6 +323,36 @@ def test_schedule_push_org_list_init_options(org_file):
     assert task.options["version"] == VERSION
 
 
+@pytest.mark.parametrize("concurrent_batches", ["two", "0"])
+def test_schedule_push_org_list_init_options__bad_concurrent_batches(
+    org_file, concurrent_batches
+):
+    with pytest.raises(TaskOptionsError):
+        create_task(
+            SchedulePushOrgList,
+            options={
+                "orgs": ORG_FILE,
+                "version": VERSION,
+                "concurrent_batches": concurrent_batches,
+            },
+        )
+
+
+def test_schedule_push_org_list_init_task__concurrent_batches(org_file):
+    task = create_task(
+        SchedulePushOrgList,
+        options={
+            "orgs": ORG_FILE,
+            "version": VERSION,
+            "batch_size": "50",
+            "concurrent_batches": "4",
+        },
+    )
+    task._init_task()
+    assert task.push.batch_size == 50
+    assert task.push.concurrent_batches == 4
+
+
 # Should set csv_field_name to OrganizationId by default
 def test_schedule_push_org_list__init_options__csv_field_default(tmp_path):
     orgs = tmp_path / ORG_FILE
@@ -422,22 +420,201 @@ def test_report_push_status_error():
         task._report_push_status("0DV1R000000k9dEWAQ")
 
 
-def test_get_push_request_job_results(
-    package_push_job_success, package_push_job_failure, package_push_job_cancel, caplog
-):
+STATUS_COUNTS = {
+    "totalSize": 3,
+    "done": True,
+    "records": [
+        {"Status": "Succeeded", "expr0": 1},
+        {"Status": "Failed", "expr0": 2},
+        {"Status": "Canceled", "expr0": 1},
+    ],
+}
+FAILED_JOBS = [
+    {
+        "Id": "0DX000000000001",
+        "SubscriberOrganizationKey": "00D000000000001",
+        "SystemModstamp": "2021-01-01T10:00:00.000+0000",
+        "PackagePushErrors": {
+            "records": [
+                {
+                    "ErrorSeverity": "Error",
+                    "ErrorType": "IneligibleUpgrade",
+                    "ErrorTitle": "Dependent Package Conflict",
+                    "ErrorMessage": "Install the dependent package",
+                    "ErrorDetails": None,
+                }
+            ]
+        },
+    },
+    {
+        "Id": "0DX000000000002",
+        "SubscriberOrganizationKey": "00D000000000002",
+        "SystemModstamp": "2021-01-01T10:01:00.000+0000",
+        "PackagePushErrors": None,
+    },
+]
+
+
+def test_get_push_request_job_results(caplog):
     caplog.set_level(logging.INFO)
     task = create_task(BaseSalesforcePushTask, options={})
     task.sf = mock.MagicMock()
-    task.push_report = mock.MagicMock()
-    task.push_request = mock.MagicMock()
-    task.push_request.get_push_job_objs.return_value = [
-        package_push_job_success,
-        package_push_job_failure,
-        package_push_job_cancel,
-    ]
+    task.sf.query_all.return_value = STATUS_COUNTS
+    task.sf.query_all_iter.return_value = iter(FAILED_JOBS)
+    task.push_request = mock.MagicMock(sf_id="0DV000000000001")
     task._get_push_request_job_results()
-    task.push_request.get_push_job_objs.assert_called_once()
-    assert "Push complete: 1 succeeded, 1 failed, 1 canceled" in caplog.text
+    task.sf.query_all.assert_called_once_with(
+        "SELECT Status, COUNT(Id) FROM PackagePushJob "
+        "WHERE PackagePushRequestId = '0DV000000000001' GROUP BY Status"
+    )
+    task.sf.query_all_iter.assert_called_once_with(
+        "SELECT Id, SubscriberOrganizationKey, SystemModstamp, "
+        "(SELECT ErrorSeverity, ErrorType, ErrorTitle, ErrorMessage, ErrorDetails "
+        "FROM PackagePushErrors) FROM PackagePushJob "
+        "WHERE PackagePushRequestId = '0DV000000000001' AND Status = 'Failed'"
+    )
+    assert "Push complete: 1 succeeded, 2 failed, 1 canceled" in caplog.text
+    assert "Title = Dependent Package Conflict" in caplog.text
+
+
+def test_get_push_request_job_results__no_failures(caplog):
+    caplog.set_level(logging.INFO)
+    task = create_task(BaseSalesforcePushTask, options={})
+    task.sf = mock.MagicMock()
+    task.sf.query_all.return_value = {
+        "totalSize": 1,
+        "done": True,
+        "records": [{"Status": "Succeeded", "expr0": 3}],
+    }
+    task.push_request = mock.MagicMock(sf_id="0DV000000000001")
+    task._get_push_request_job_results()
+    task.sf.query_all_iter.assert_not_called()
+    assert "Push complete: 3 succeeded, 0 failed, 0 canceled" in caplog.text
+
+
+def test_get_push_request_job_results__failures_csv(tmp_path):
+    failures_csv = tmp_path / "failures.csv"
+    task = create_task(
+        SchedulePushOrgList,
+        options={"orgs": ORG_FILE, "version": VERSION, "failures_csv": failures_csv},
+    )
+    task.sf = mock.MagicMock()
+    task.sf.query_all.return_value = STATUS_COUNTS
+    task.sf.query_all_iter.return_value = iter(FAILED_JOBS)
+    task.push_request = mock.MagicMock(sf_id="0DV000000000001")
+    task._get_push_request_job_results()
+    with open(failures_csv, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows == [
+        [
+            "OrganizationId",
+            "ErrorSeverity",
+            "ErrorType",
+            "ErrorTitle",
+            "ErrorMessage",
+            "ErrorDetails",
+        ],
+        [
+            "00D000000000001",
+            "Error",
+            "IneligibleUpgrade",
+            "Dependent Package Conflict",
+            "Install the dependent package",
+            "",
+        ],
+        ["00D000000000002", "", "", "", "", ""],
+    ]
+
+
+def status_counts(**counts):
+    return {
+        "totalSize": len(counts),
+        "done": True,
+        "records": [
+            {"Status": status, "expr0": count} for status, count in counts.items()
+        ],
+    }
+
+
+@mock.patch("time.monotonic", side_effect=[0, 60, 120, 180])
+@mock.patch("time.sleep")
+def test_report_push_status__monitor(sleep, monotonic, caplog):
+    caplog.set_level(logging.INFO)
+    task = create_task(BaseSalesforcePushTask, options={})
+    task.sf = mock.MagicMock()
+    task.push_request = mock.MagicMock(sf_id="0DV000000000001", status="In Progress")
+    task._get_push_request_query = mock.Mock()
+    task._get_push_request_job_results = mock.Mock()
+    task.sf.query_all.side_effect = [
+        status_counts(Pending=4),
+        status_counts(Pending=2, Succeeded=1, Failed=1),
+        status_counts(Pending=2, Succeeded=1, Failed=1),
+        status_counts(Succeeded=2, Failed=2),
+    ]
+    task.sf.query.side_effect = [
+        {"records": [{"Status": status}]}
+        for status in ["In Progress", "In Progress", "In Progress", "Succeeded"]
+    ]
+    task.sf.query_all_iter.side_effect = [
+        iter(FAILED_JOBS[:1]),
+        iter(FAILED_JOBS),
+    ]
+
+    task._report_push_status("0DV000000000001")
+
+    assert 3 == sleep.call_count
+    assert "Push status: 4 Pending (0 of 4 jobs complete)" in caplog.text
+    assert "Push status: 1 Failed, 2 Pending, 1 Succeeded (2 of 4 jobs complete" in (
+        caplog.text
+    )
+    assert "1.0 orgs/minute, estimated completion" in caplog.text
+    assert 1 == caplog.text.count("Push failed for org 00D000000000001")
+    assert 1 == caplog.text.count("Push failed for org 00D000000000002")
+    assert "Dependent Package Conflict - Install the dependent package" in caplog.text
+    queries = [c[0][0] for c in task.sf.query_all_iter.call_args_list]
+    assert "SystemModstamp >=" not in queries[0]
+    assert queries[1].endswith(
+        "AND Status = 'Failed' AND SystemModstamp >= 2021-01-01T10:00:00Z"
+    )
+    task._get_push_request_job_results.assert_called_once_with()
+
+
+def test_report_push_status__max_failure_rate():
+    task = create_task(BaseSalesforcePushTask, options={"max_failure_rate": 10})
+    task.failure_rate_min_jobs = 2
+    task.sf = mock.MagicMock()
+    task.push_request = mock.MagicMock(sf_id="0DV000000000001", status="In Progress")
+    task._get_push_request_query = mock.Mock()
+    task.push_report = mock.MagicMock()
+    task.push_report.cancel_push_request.side_effect = SalesforceMalformedRequest(
+        "url", 400, "PackagePushRequest", "Cannot cancel"
+    )
+    task.sf.query_all.return_value = status_counts(Succeeded=1, Failed=2)
+    task.sf.query_all_iter.return_value = iter(FAILED_JOBS)
+
+    with pytest.raises(CumulusCIException, match="66.7% of completed jobs failed"):
+        task._report_push_status("0DV000000000001")
+    task.push_report.cancel_push_request.assert_called_once_with("0DV000000000001")
+    task.sf.query.assert_not_called()
+
+
+def test_schedule_push_org_list_init_options__max_failure_rate(org_file):
+    task = create_task(
+        SchedulePushOrgList,
+        options={"orgs": ORG_FILE, "version": VERSION, "max_failure_rate": "5"},
+    )
+    assert task.options["max_failure_rate"] == 5.0
+
+    for value in ("lots", "101"):
+        with pytest.raises(TaskOptionsError):
+            create_task(
+                SchedulePushOrgList,
+                options={
+                    "orgs": ORG_FILE,
+                    "version": VERSION,
+                    "max_failure_rate": value,
+                },
+            )
 
 
 def test_schedule_push_org_query_get_org_error():
@@ -478,7 +655,38 @@ def test_schedule_push_org_query_get_org():
     task.push_api = mock.MagicMock()
     task.sf = mock.Mock()
     task.sf.query_all.return_value = PACKAGE_OBJ_SUBSCRIBER
-    assert task._get_orgs() == ["bar"]
+    task.sf.query_all_iter.return_value = iter(PACKAGE_OBJ_SUBSCRIBER["records"])
+    assert list(task._get_orgs()) == ["bar"]
+    assert (
+        "AND (OrgType = 'Sandbox') AND MetadataPackageVersionId != "
+        in task.sf.query_all_iter.call_args[0][0]
+    )
+
+
+def test_schedule_push_org_query_get_org_version_range():
+    task = create_task(
+        SchedulePushOrgQuery,
+        options={
+            "orgs": ORG,
+            "version": VERSION,
+            "namespace": NAMESPACE,
+            "start_time": None,
+            "min_version": "1.1",
+        },
+    )
+    task.push = mock.MagicMock()
+    task.sf = mock.Mock()
+    version = task.push.get_package_objs.return_value[
+        0
+    ].get_package_version_objs.return_value[0]
+    version.get_older_released_version_objs.return_value = [
+        mock.Mock(sf_id="04t000000000001"),
+        mock.Mock(sf_id="04t000000000002"),
+    ]
+    task.sf.query_all_iter.side_effect = lambda query: iter([{"OrgKey": query[-17:-2]}])
+
+    assert sorted(task._get_orgs()) == ["04t000000000001", "04t000000000002"]
+    assert task.sf.query_all_iter.call_count == 2
 
 
 def test_schedule_push_org_list_run_task_with_time_assertion(org_file):
@@ -566,7 +774,7 @@ def test_schedule_push_org_list_run_task_many_orgs(org_file):
 
 
 def test_schedule_push_org_list_run_task_many_orgs_now(org_file):
-    query = "SELECT Id, PackagePushRequestId, SubscriberOrganizationKey, Status FROM PackagePushJob WHERE Id = '0DV1R000000k9dEWAQ'"
+    query = "SELECT Status, COUNT(Id) FROM PackagePushJob WHERE PackagePushRequestId = '0DV1R000000k9dEWAQ' GROUP BY Status"
     task = create_task(
         SchedulePushOrgList,
         options={
@@ -579,6 +787,9 @@ def test_schedule_push_org_list_run_task_many_orgs_now(org_file):
     task.push = mock.MagicMock()
     task.sf = mock.MagicMock()
     task.sf.query_all.return_value = PACKAGE_OBJS
+    task.sf.query_all.side_effect = (
+        lambda query: STATUS_COUNTS if "GROUP BY" in query else PACKAGE_OBJS
+    )
     task.push.create_push_request.return_value = ("0DV000000000001", 1001)
     task._run_task()
     task.sf.query_all.assert_called_with(query)
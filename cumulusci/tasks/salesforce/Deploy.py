@@ -1,13 +1,61 @@
+from collections import defaultdict
+import contextlib
+import hashlib
+import json
+import os
 import pathlib
+import re
 from typing import Optional
 
 from cumulusci.core.exceptions import TaskOptionsError
 from cumulusci.core.utils import process_bool_arg, process_list_arg
 from cumulusci.salesforce_api.metadata import ApiDeploy
+from cumulusci.salesforce_api.metadata import parse_package_xml_types
+from cumulusci.salesforce_api.package_zip import BasePackageZipBuilder
 from cumulusci.salesforce_api.package_zip import MetadataPackageZipBuilder
+from cumulusci.tasks.metadata.package import MetadataParserMissingError
+from cumulusci.tasks.metadata.package import PackageXmlGenerator
 from cumulusci.tasks.salesforce.BaseSalesforceMetadataApiTask import (
     BaseSalesforceMetadataApiTask,
 )
+from cumulusci.utils import hash_directory
+from cumulusci.utils import package_xml_from_dict
+from cumulusci.utils import temporary_dir
+from cumulusci.utils.xml import metadata_tree
+
+
+def get_component_key(name):
+    """Return the key of the component which a file in a package zip belongs to.
+
+    Files in subfolders (such as aura and lwc bundles or document folders)
+    belong to the subfolder. Other files belong to the component named
+    by the filename without extensions, so that a file and its -meta.xml
+    file are grouped together.
+    """
+    parts = name.split("/")
+    if len(parts) > 2:
+        return "/".join(parts[:2])
+    filename = parts[-1]
+    if filename.endswith("-meta.xml"):
+        filename = filename[: -len("-meta.xml")]
+    parts[-1] = filename.split(".")[0]
+    return "/".join(parts)
+
+
+def hash_package_components(zf):
+    """Returns a dict of component key -> hash of the component's file contents."""
+    files = defaultdict(list)
+    for name in sorted(zf.namelist()):
+        if name != "package.xml":
+            files[get_component_key(name)].append(name)
+    hashes = {}
+    for key, names in files.items():
+        h = hashlib.blake2b()
+        for name in names:
+            h.update(name.encode("utf-8"))
+            h.update(zf.read(name))
+        hashes[key] = h.hexdigest()
+    return hashes
 
 
 class Deploy(BaseSalesforceMetadataApiTask):
@@ -44,6 +92,12 @@ class Deploy(BaseSalesforceMetadataApiTask):
         "clean_meta_xml": {
             "description": "Defaults to True which strips the <packageVersions/> element from all meta.xml files.  The packageVersion element gets added automatically by the target org and is set to whatever version is installed in the org.  To disable this, set this option to False"
         },
+        "incremental": {
+            "description": "If True, only components which changed since the last successful deploy of this path to the org are deployed. Defaults to False."
+        },
+        "incremental_delete": {
+            "description": "If True and incremental is set, components which were removed since the last successful deploy of this path to the org are deleted from the org. Defaults to False."
+        },
     }
 
     namespaces = {"sf": "http://soap.sforce.com/2006/04/metadata"}
@@ -75,6 +129,28 @@ class Deploy(BaseSalesforceMetadataApiTask):
             or self.project_config.project__package__namespace
         )
 
+        self.incremental = process_bool_arg(self.options.get("incremental", False))
+        self.incremental_delete = process_bool_arg(
+            self.options.get("incremental_delete", False)
+        )
+        self._pending_deploy_manifest = None
+
+    def _run_task(self):
+        result = super(Deploy, self)._run_task()
+        self._store_deploy_manifest()
+        return result
+
+    def get_fingerprint(self):
+        repo_root = self.project_config.repo_root or ""
+        paths = [self.options.get("path"), self.options.get("static_resource_path")]
+        hashes = [
+            hash_directory(os.path.join(repo_root, path))
+            for path in paths
+            if path and os.path.isdir(os.path.join(repo_root, path))
+        ]
+        if hashes:
+            return ":".join(hashes)
+
     def _get_api(self, path=None):
         if not path:
             path = self.options.get("path")
@@ -126,8 +202,125 @@ class Deploy(BaseSalesforceMetadataApiTask):
         )
         if not package_zip.zf.namelist():
             return
+        if self.incremental:
+            return self._get_incremental_package_zip(path, package_zip)
         return package_zip.as_base64()
 
+    @contextlib.contextmanager
+    def _deploy_manifest_file(self, path):
+        repo_root = self.project_config.repo_root or os.getcwd()
+        relpath = os.path.relpath(os.path.realpath(path), os.path.realpath(repo_root))
+        filename = re.sub(r"[^\w.-]+", "_", relpath)
+        with self.org_config.get_orginfo_cache_dir("deploy_manifests") as cache:
+            yield cache / f"{filename}.json"
+
+    def _load_deploy_manifest(self, path):
+        """Load the manifest of components from the last deploy of path to this org."""
+        with self._deploy_manifest_file(path) as manifest_file:
+            if not manifest_file.exists():
+                return
+            with manifest_file.open("r") as f:
+                manifest = json.load(f)
+        # The org may have been recreated with the same username
+        if manifest.get("org_id") == self.org_config.org_id:
+            return manifest
+
+    def _store_deploy_manifest(self):
+        """Record the components of a successful incremental deploy."""
+        if self._pending_deploy_manifest is None or self.check_only:
+            return
+        path, manifest = self._pending_deploy_manifest
+        self._pending_deploy_manifest = None
+        with self._deploy_manifest_file(path) as manifest_file:
+            with manifest_file.open("w") as f:
+                json.dump(manifest, f)
+
+    def _get_incremental_package_zip(self, path, package_zip):
+        """Build a package with only the components changed since the last deploy.
+
+        The manifest of the full package is stored after the deploy succeeds,
+        so it is compared against the last successful deploy.
+        """
+        zf = package_zip.zf
+        package_xml = zf.read("package.xml").decode("utf-8")
+        manifest = {
+            "org_id": self.org_config.org_id,
+            "components": hash_package_components(zf),
+            "types": parse_package_xml_types(package_xml),
+        }
+        self._pending_deploy_manifest = (path, manifest)
+
+        previous = self._load_deploy_manifest(path)
+        if previous is None:
+            self.logger.info(
+                "No previous deploy of this path to the org was found; "
+                "deploying all components."
+            )
+            return package_zip.as_base64()
+
+        changed = {
+            key
+            for key, component_hash in manifest["components"].items()
+            if previous["components"].get(key) != component_hash
+        }
+        # Members removed from the package are kept in the manifest until a
+        # deploy with incremental_delete actually deletes them.
+        removed = {}
+        for types in (previous["types"], previous.get("undeleted", {})):
+            for md_type, members in types.items():
+                current = set(manifest["types"].get(md_type, []))
+                removed_members = removed.setdefault(md_type, [])
+                removed_members.extend(
+                    m for m in members if m not in current and m not in removed_members
+                )
+        removed = {md_type: members for md_type, members in removed.items() if members}
+        if not self.incremental_delete:
+            if removed:
+                manifest["undeleted"] = removed
+            removed = {}
+        if not changed and not removed:
+            self.logger.info("No components have changed since the last deploy.")
+            return
+
+        Package = metadata_tree.fromstring(package_xml.encode("utf-8"))
+        api_version = Package.version.text
+        full_name = Package.find("fullName")
+        delta_zip = BasePackageZipBuilder()
+        with temporary_dir(chdir=False) as delta_dir:
+            for name in zf.namelist():
+                if name != "package.xml" and get_component_key(name) in changed:
+                    content = zf.read(name)
+                    delta_path = pathlib.Path(delta_dir, name)
+                    delta_path.parent.mkdir(parents=True, exist_ok=True)
+                    delta_path.write_bytes(content)
+                    delta_zip._write_file(name, content)
+            try:
+                delta_package_xml = PackageXmlGenerator(
+                    delta_dir,
+                    api_version,
+                    package_name=full_name.text if full_name is not None else None,
+                )()
+            except MetadataParserMissingError as e:
+                self.logger.warning(
+                    f"Could not build an incremental package.xml ({e}); "
+                    "deploying all components."
+                )
+                return package_zip.as_base64()
+        delta_zip._write_package_xml(delta_package_xml)
+        self.logger.info(
+            f"Deploying {len(changed)} of {len(manifest['components'])} components "
+            "which changed since the last deploy."
+        )
+        if removed:
+            self.logger.info(
+                f"Deleting {sum(len(m) for m in removed.values())} components "
+                "which were removed since the last deploy."
+            )
+            delta_zip._write_file(
+                "destructiveChanges.xml", package_xml_from_dict(removed, api_version)
+            )
+        return delta_zip.as_base64()
+
     def freeze(self, step):
         steps = super(Deploy, self).freeze(step)
         for step in steps:
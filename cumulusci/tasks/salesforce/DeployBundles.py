@@ -38,7 +38,11 @@ class DeployBundles(Deploy):
 
     def _deploy_bundle(self, path):
         api = self._get_api(path)
-        return api()
+        result = None
+        if api:
+            result = api()
+        self._store_deploy_manifest()
+        return result
 
     def freeze(self, step):
         ui_options = self.task_config.config.get("ui_options", {})
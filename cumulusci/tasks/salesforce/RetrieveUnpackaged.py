@@ -1,4 +1,4 @@
-from cumulusci.salesforce_api.metadata import ApiRetrieveUnpackaged
+from cumulusci.salesforce_api.metadata import ApiRetrieveUnpackagedChunked
 from cumulusci.tasks.salesforce import BaseRetrieveMetadata
 
 
@@ -15,12 +15,21 @@ retrieve_unpackaged_options.update(
                 + " Defaults to project__package__api_version"
             )
         },
+        "chunk_size": {
+            "description": "The maximum number of components to retrieve in a single"
+            " request. Larger manifests are split into chunks which are retrieved"
+            " concurrently. Defaults to 2500."
+        },
+        "max_workers": {
+            "description": "The maximum number of chunks to retrieve concurrently."
+            " Defaults to 4."
+        },
     }
 )
 
 
 class RetrieveUnpackaged(BaseRetrieveMetadata):
-    api_class = ApiRetrieveUnpackaged
+    api_class = ApiRetrieveUnpackagedChunked
 
     task_options = retrieve_unpackaged_options
 
@@ -34,5 +43,9 @@ class RetrieveUnpackaged(BaseRetrieveMetadata):
 
     def _get_api(self):
         return self.api_class(
-            self, self.options["package_xml"], self.options.get("api_version")
+            self,
+            self.options["package_xml"],
+            self.options.get("api_version"),
+            chunk_size=self.options.get("chunk_size"),
+            max_workers=self.options.get("max_workers"),
         )
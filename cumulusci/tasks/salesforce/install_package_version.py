@@ -102,6 +102,9 @@ class InstallPackageVersion(Deploy):
         api = self._get_api()
         api()
 
+    def get_fingerprint(self):
+        return str(self.options["version"])
+
     def _is_retry_valid(self, e):
         if isinstance(e, MetadataApiError) and (
             "This package is not yet available" in str(e)
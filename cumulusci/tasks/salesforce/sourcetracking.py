@@ -4,6 +4,7 @@ import functools
 import json
 import os
 import re
+import sqlite3
 import time
 
 from cumulusci.core.config import ScratchOrgConfig
@@ -19,6 +20,28 @@ from cumulusci.utils import inject_namespace
 from cumulusci.utils import process_text_in_directory
 from cumulusci.utils import tokenize_namespace
 
+# source_members mirrors the org's SourceMember records as of the
+# revision_counter high-water mark stored in meta; snapshot holds the
+# revision of each component as of the last retrieve or snapshot.
+SNAPSHOT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS source_members (
+    member_type TEXT NOT NULL,
+    member_name TEXT NOT NULL,
+    revision_counter INTEGER,
+    PRIMARY KEY (member_type, member_name)
+);
+CREATE TABLE IF NOT EXISTS snapshot (
+    member_type TEXT NOT NULL,
+    member_name TEXT NOT NULL,
+    revision_counter INTEGER NOT NULL,
+    PRIMARY KEY (member_type, member_name)
+);
+"""
+
 
 class ListChanges(BaseSalesforceApiTask):
     api_version = "48.0"
@@ -51,22 +74,53 @@ class ListChanges(BaseSalesforceApiTask):
         self._exclude = self.options["exclude"]
         self._exclude.extend(self.project_config.project__source__ignore or [])
 
-    @property
     @contextlib.contextmanager
-    def _snapshot_file(self):
+    def _open_snapshot_db(self):
+        """Open the SQLite database holding the snapshot for this org.
+
+        The database is reset if the org has been recreated with the same
+        name, and a snapshot from the older JSON format is imported the
+        first time it is opened."""
         with self.project_config.open_cache("snapshot") as parent_dir:
-            yield parent_dir / f"{self.org_config.name}.json"
+            db_file = parent_dir / f"{self.org_config.name}.db"
+            json_file = parent_dir / f"{self.org_config.name}.json"
+            is_new = not db_file.exists()
+            conn = sqlite3.connect(str(db_file.getsyspath()))
+            try:
+                with conn:
+                    conn.executescript(SNAPSHOT_SCHEMA)
+                    self._check_snapshot_org(conn)
+                    if is_new and json_file.exists():
+                        with json_file.open("r") as f:
+                            self._import_json_snapshot(conn, json.load(f))
+                yield conn
+            finally:
+                conn.close()
+
+    def _check_snapshot_org(self, conn):
+        # The org may have been recreated with the same name,
+        # in which case its revision counters start over.
+        org_id = self.org_config.org_id
+        row = conn.execute("SELECT value FROM meta WHERE key = 'org_id'").fetchone()
+        if row and row[0] != org_id:
+            conn.execute("DELETE FROM source_members")
+            conn.execute("DELETE FROM snapshot")
+            conn.execute("DELETE FROM meta")
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('org_id', ?)", (org_id,)
+        )
 
-    def _load_snapshot(self):
-        """Load the snapshot of which component revisions have been retrieved."""
-        self._snapshot = {}
-        with self._snapshot_file as sf:
-            if sf.exists():
-                with sf.open("r") as f:
-                    self._snapshot = json.load(f)
+    def _import_json_snapshot(self, conn, snapshot):
+        conn.executemany(
+            "INSERT OR REPLACE INTO snapshot VALUES (?, ?, ?)",
+            (
+                (mdtype, name, revnum)
+                for mdtype, members in snapshot.items()
+                for name, revnum in members.items()
+            ),
+        )
 
     def _run_task(self):
-        self._load_snapshot()
         changes = self._get_changes()
         if changes:
             self.logger.info(
@@ -89,22 +143,80 @@ class ListChanges(BaseSalesforceApiTask):
             self.logger.info("Storing snapshot of changes")
             self._store_snapshot(filtered)
 
-    def _get_changes(self):
-        """Get the SourceMember records that have changed since the last snapshot."""
+    def _sync_source_members(self, conn):
+        """Update the local copy of SourceMember with records changed since the
+        highest RevisionCounter seen so far.
+
+        Records without a RevisionCounter can't be found that way,
+        so all of them are retrieved each time."""
+        row = conn.execute(
+            "SELECT value FROM meta WHERE key = 'revision_counter'"
+        ).fetchone()
+        if row:
+            revision_counter = int(row[0])
+            where = f"RevisionCounter > {revision_counter} OR RevisionCounter = null"
+        else:
+            where = "IsNameObsolete=false"
+            revision_counter = None
         sourcemembers = self.tooling.query_all(
-            "SELECT MemberName, MemberType, RevisionCounter FROM SourceMember "
-            "WHERE IsNameObsolete=false"
+            "SELECT MemberName, MemberType, RevisionCounter, IsNameObsolete "
+            f"FROM SourceMember WHERE {where}"
         )
-        changes = []
-        for sourcemember in sourcemembers["records"]:
-            mdtype = sourcemember["MemberType"]
-            name = sourcemember["MemberName"]
-            current_revnum = self._snapshot.get(mdtype, {}).get(name)
-            new_revnum = sourcemember["RevisionCounter"] or -1
-            if current_revnum and current_revnum == new_revnum:
-                continue
-            changes.append(sourcemember)
-        return changes
+        with conn:
+            conn.execute("DELETE FROM source_members WHERE revision_counter IS NULL")
+            for sourcemember in sourcemembers["records"]:
+                key = (sourcemember["MemberType"], sourcemember["MemberName"])
+                revnum = sourcemember["RevisionCounter"]
+                if revnum is not None:
+                    revision_counter = max(revision_counter or 0, revnum)
+                if sourcemember.get("IsNameObsolete"):
+                    conn.execute(
+                        "DELETE FROM source_members "
+                        "WHERE member_type = ? AND member_name = ?",
+                        key,
+                    )
+                else:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO source_members VALUES (?, ?, ?)",
+                        key + (revnum,),
+                    )
+            if revision_counter is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) "
+                    "VALUES ('revision_counter', ?)",
+                    (str(revision_counter),),
+                )
+
+    def _get_source_members(self):
+        """Get all SourceMember records which are not obsolete."""
+        with self._open_snapshot_db() as conn:
+            self._sync_source_members(conn)
+            rows = conn.execute(
+                "SELECT member_type, member_name, revision_counter "
+                "FROM source_members ORDER BY member_type, member_name"
+            ).fetchall()
+        return [_sourcemember_from_row(row) for row in rows]
+
+    def _get_changes(self):
+        """Get the SourceMember records that have changed since the last snapshot."""
+        with self._open_snapshot_db() as conn:
+            self._sync_source_members(conn)
+            rows = conn.execute(
+                "SELECT m.member_type, m.member_name, m.revision_counter "
+                "FROM source_members m LEFT JOIN snapshot s "
+                "ON s.member_type = m.member_type AND s.member_name = m.member_name "
+                "WHERE s.revision_counter IS NULL "
+                "OR s.revision_counter != COALESCE(m.revision_counter, -1) "
+                "ORDER BY m.member_type, m.member_name"
+            ).fetchall()
+        return [_sourcemember_from_row(row) for row in rows]
+
+    def get_changes(self):
+        """Returns the changes since the last snapshot which match
+        the include/exclude options, without updating the snapshot."""
+        self._init_task()
+        filtered, _ = self._filter_changes(self._get_changes())
+        return filtered
 
     def _filter_changes(self, changes):
         """Filter changes using the include/exclude options"""
@@ -123,16 +235,26 @@ class ListChanges(BaseSalesforceApiTask):
                 filtered.append(change)
         return filtered, ignored
 
-    def _store_snapshot(self, changes):
-        """Update the snapshot of which component revisions have been retrieved."""
-        for change in changes:
-            mdtype = change["MemberType"]
-            name = change["MemberName"]
-            revnum = change["RevisionCounter"] or -1
-            self._snapshot.setdefault(mdtype, {})[name] = revnum
-        with self._snapshot_file as sf:
-            with sf.open("w") as f:
-                json.dump(self._snapshot, f)
+    def _store_snapshot(self, changes, replace=False):
+        """Update the snapshot of which component revisions have been retrieved.
+
+        If replace is True, components which are not in changes are removed
+        from the snapshot."""
+        with self._open_snapshot_db() as conn:
+            with conn:
+                if replace:
+                    conn.execute("DELETE FROM snapshot")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO snapshot VALUES (?, ?, ?)",
+                    (
+                        (
+                            change["MemberType"],
+                            change["MemberName"],
+                            change["RevisionCounter"] or -1,
+                        )
+                        for change in changes
+                    ),
+                )
 
     def _reset_sfdx_snapshot(self):
         # If org is from sfdx, reset sfdx source tracking
@@ -164,6 +286,11 @@ retrieve_changes_task_options["namespace_tokenize"] = BaseRetrieveMetadata.task_
 ]
 
 
+def _sourcemember_from_row(row):
+    mdtype, name, revnum = row
+    return {"MemberType": mdtype, "MemberName": name, "RevisionCounter": revnum}
+
+
 def _write_manifest(changes, path, api_version):
     """Write a package.xml for the specified changes and API version."""
     type_members = defaultdict(list)
@@ -330,7 +457,6 @@ class RetrieveChanges(ListChanges, BaseSalesforceApiTask):
             ] = self.project_config.project__package__api_version
 
     def _run_task(self):
-        self._load_snapshot()
         self.logger.info("Querying Salesforce for changed source members")
         changes = self._get_changes()
         filtered, ignored = self._filter_changes(changes)
@@ -381,16 +507,14 @@ class SnapshotChanges(ListChanges):
 
     def _run_task(self):
         if self.org_config.scratch:
-            self._snapshot = {}
-
-            changes = self._get_changes()
-            if not changes:
+            members = self._get_source_members()
+            if not members:
                 # Try again if source tracking hasn't updated
                 time.sleep(5)
-                changes = self._get_changes()
+                members = self._get_source_members()
 
-            if changes:
-                self._store_snapshot(changes)
+            if members:
+                self._store_snapshot(members, replace=True)
             self._reset_sfdx_snapshot()
 
     def freeze(self, step):
@@ -1,12 +1,14 @@
 import base64
 import io
 import os
+import pathlib
 import unittest
 import zipfile
 
 from cumulusci.core.exceptions import TaskOptionsError
 from cumulusci.core.flowrunner import StepSpec
 from cumulusci.tasks.salesforce import Deploy
+from cumulusci.tasks.salesforce.Deploy import get_component_key
 from cumulusci.utils import temporary_dir
 from cumulusci.utils import touch
 from .util import create_task
@@ -185,3 +187,208 @@ class TestDeploy(unittest.TestCase):
         )
 
         assert all(s["kind"] == "metadata" for s in task.freeze(step))
+
+    def test_get_fingerprint(self):
+        with temporary_dir() as path:
+            touch("package.xml")
+            task = create_task(Deploy, {"path": path})
+            fingerprint = task.get_fingerprint()
+            assert fingerprint == task.get_fingerprint()
+
+            touch("Foo.cls")
+            assert fingerprint != task.get_fingerprint()
+
+    def test_get_fingerprint__missing_path(self):
+        task = create_task(Deploy, {"path": "nonexistent"})
+        assert task.get_fingerprint() is None
+
+
+def _write_metadata(path, files):
+    for name, content in files.items():
+        file_path = pathlib.Path(path, name)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(content)
+
+
+def _deployed_zip(api):
+    return zipfile.ZipFile(io.BytesIO(base64.b64decode(api.package_zip)), "r")
+
+
+PACKAGE_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<Package xmlns="http://soap.sforce.com/2006/04/metadata">
+    <types>
+        <members>Bar</members>
+        <members>Foo</members>
+        <name>ApexClass</name>
+    </types>
+    <version>50.0</version>
+</Package>"""
+
+CLASS_META = """<?xml version="1.0" encoding="UTF-8"?>
+<ApexClass xmlns="http://soap.sforce.com/2006/04/metadata">
+    <apiVersion>50.0</apiVersion>
+    <status>Active</status>
+</ApexClass>"""
+
+
+class TestDeployIncremental:
+    def test_get_component_key(self):
+        assert get_component_key("classes/Foo.cls") == "classes/Foo"
+        assert get_component_key("classes/Foo.cls-meta.xml") == "classes/Foo"
+        assert get_component_key("lwc/foo/foo.js") == "lwc/foo"
+        assert get_component_key("documents/Folder-meta.xml") == "documents/Folder"
+
+    def test_incremental(self, create_task_fixture):
+        with temporary_dir() as path:
+            _write_metadata(
+                path,
+                {
+                    "package.xml": PACKAGE_XML,
+                    "classes/Foo.cls": "foo",
+                    "classes/Foo.cls-meta.xml": CLASS_META,
+                    "classes/Bar.cls": "bar",
+                    "classes/Bar.cls-meta.xml": CLASS_META,
+                },
+            )
+            options = {"path": path, "unmanaged": True, "incremental": True}
+
+            # The first deploy includes all components
+            task = create_task_fixture(Deploy, options)
+            api = task._get_api()
+            assert len(_deployed_zip(api).namelist()) == 5
+            task._store_deploy_manifest()
+
+            # Nothing changed
+            task = create_task_fixture(Deploy, options)
+            assert task._get_api() is None
+
+            # Only the changed class is deployed
+            _write_metadata(path, {"classes/Foo.cls": "foo changed"})
+            task = create_task_fixture(Deploy, options)
+            zf = _deployed_zip(task._get_api())
+            assert sorted(zf.namelist()) == [
+                "classes/Foo.cls",
+                "classes/Foo.cls-meta.xml",
+                "package.xml",
+            ]
+            package_xml = zf.read("package.xml").decode("utf-8")
+            assert "<members>Foo</members>" in package_xml
+            assert "<members>Bar</members>" not in package_xml
+
+    def test_incremental__delete(self, create_task_fixture):
+        with temporary_dir() as path:
+            _write_metadata(
+                path,
+                {
+                    "package.xml": PACKAGE_XML,
+                    "classes/Foo.cls": "foo",
+                    "classes/Foo.cls-meta.xml": CLASS_META,
+                    "classes/Bar.cls": "bar",
+                    "classes/Bar.cls-meta.xml": CLASS_META,
+                },
+            )
+            options = {
+                "path": path,
+                "unmanaged": True,
+                "incremental": True,
+                "incremental_delete": True,
+            }
+            task = create_task_fixture(Deploy, options)
+            task._get_api()
+            task._store_deploy_manifest()
+
+            os.remove(os.path.join(path, "classes/Bar.cls"))
+            os.remove(os.path.join(path, "classes/Bar.cls-meta.xml"))
+            _write_metadata(
+                path, {"package.xml": PACKAGE_XML.replace("<members>Bar</members>", "")}
+            )
+            task = create_task_fixture(Deploy, options)
+            zf = _deployed_zip(task._get_api())
+            assert sorted(zf.namelist()) == ["destructiveChanges.xml", "package.xml"]
+            destructive = zf.read("destructiveChanges.xml").decode("utf-8")
+            assert "<members>Bar</members>" in destructive
+
+    def test_incremental__delete_later(self, create_task_fixture):
+        with temporary_dir() as path:
+            _write_metadata(
+                path,
+                {
+                    "package.xml": PACKAGE_XML,
+                    "classes/Foo.cls": "foo",
+                    "classes/Foo.cls-meta.xml": CLASS_META,
+                    "classes/Bar.cls": "bar",
+                    "classes/Bar.cls-meta.xml": CLASS_META,
+                },
+            )
+            options = {"path": path, "unmanaged": True, "incremental": True}
+            task = create_task_fixture(Deploy, options)
+            task._get_api()
+            task._store_deploy_manifest()
+
+            # Bar is removed while deletes are off, so it is not deleted
+            os.remove(os.path.join(path, "classes/Bar.cls"))
+            os.remove(os.path.join(path, "classes/Bar.cls-meta.xml"))
+            _write_metadata(
+                path,
+                {
+                    "package.xml": PACKAGE_XML.replace("<members>Bar</members>", ""),
+                    "classes/Foo.cls": "foo changed",
+                },
+            )
+            task = create_task_fixture(Deploy, options)
+            zf = _deployed_zip(task._get_api())
+            assert "destructiveChanges.xml" not in zf.namelist()
+            task._store_deploy_manifest()
+
+            # A later deploy with deletes on still deletes it
+            task = create_task_fixture(Deploy, {**options, "incremental_delete": True})
+            zf = _deployed_zip(task._get_api())
+            assert sorted(zf.namelist()) == ["destructiveChanges.xml", "package.xml"]
+            destructive = zf.read("destructiveChanges.xml").decode("utf-8")
+            assert "<members>Bar</members>" in destructive
+
+    def test_incremental__check_only_not_recorded(self, create_task_fixture):
+        with temporary_dir() as path:
+            _write_metadata(
+                path, {"package.xml": PACKAGE_XML, "classes/Foo.cls": "foo"}
+            )
+            options = {
+                "path": path,
+                "unmanaged": True,
+                "incremental": True,
+                "check_only": True,
+            }
+            task = create_task_fixture(Deploy, options)
+            task._get_api()
+            task._store_deploy_manifest()
+
+            task = create_task_fixture(Deploy, options)
+            assert task._get_api() is not None
+
+    def test_incremental__different_org(self, create_task_fixture):
+        with temporary_dir() as path:
+            _write_metadata(
+                path, {"package.xml": PACKAGE_XML, "classes/Foo.cls": "foo"}
+            )
+            options = {"path": path, "unmanaged": True, "incremental": True}
+            task = create_task_fixture(Deploy, options)
+            task._get_api()
+            task._store_deploy_manifest()
+
+            task = create_task_fixture(Deploy, options)
+            task.org_config.config["org_id"] = "OTHER_ORG_ID"
+            assert task._get_api() is not None
+
+    def test_incremental__unknown_metadata_type(self, create_task_fixture):
+        with temporary_dir() as path:
+            _write_metadata(path, {"package.xml": PACKAGE_XML, "bogus/Foo.txt": "foo"})
+            options = {"path": path, "unmanaged": True, "incremental": True}
+            task = create_task_fixture(Deploy, options)
+            task._get_api()
+            task._store_deploy_manifest()
+
+            _write_metadata(path, {"bogus/Foo.txt": "changed"})
+            task = create_task_fixture(Deploy, options)
+            zf = _deployed_zip(task._get_api())
+            assert sorted(zf.namelist()) == ["bogus/Foo.txt", "package.xml"]
+            assert zf.read("package.xml").decode("utf-8") == PACKAGE_XML
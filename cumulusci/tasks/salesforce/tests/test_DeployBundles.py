@@ -5,6 +5,9 @@ import unittest
 from cumulusci.core.flowrunner import StepSpec
 from cumulusci.tasks.salesforce import DeployBundles
 from cumulusci.utils import temporary_dir
+from .test_Deploy import CLASS_META
+from .test_Deploy import PACKAGE_XML
+from .test_Deploy import _write_metadata
 from .util import create_task
 
 
@@ -74,3 +77,27 @@ class TestDeployBundles(unittest.TestCase):
         step = StepSpec(1, "deploy_bundles", task.task_config, None, None)
         steps = task.freeze(step)
         self.assertEqual([], steps)
+
+
+def test_run_task__incremental_unchanged(create_task_fixture):
+    with temporary_dir() as path:
+        _write_metadata(
+            os.path.join(path, "bundle"),
+            {
+                "package.xml": PACKAGE_XML,
+                "classes/Foo.cls": "foo",
+                "classes/Foo.cls-meta.xml": CLASS_META,
+            },
+        )
+        options = {"path": path, "unmanaged": True, "incremental": True}
+
+        task = create_task_fixture(DeployBundles, options)
+        task.api_class = mock.Mock()
+        task()
+        task.api_class.return_value.assert_called_once_with()
+
+        # The unchanged bundle is skipped
+        task = create_task_fixture(DeployBundles, options)
+        task.api_class = mock.Mock()
+        task()
+        task.api_class.assert_not_called()
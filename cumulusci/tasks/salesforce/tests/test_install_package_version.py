@@ -87,3 +87,9 @@ class TestInstallPackageVersion(unittest.TestCase):
         ) as mocked:
             task()
         mocked.assert_called_once()
+
+    def test_get_fingerprint(self):
+        project_config = create_project_config()
+        project_config.config["project"]["package"]["namespace"] = "ns"
+        task = create_task(InstallPackageVersion, {"version": 1.1}, project_config)
+        assert task.get_fingerprint() == "1.1"
@@ -4,6 +4,7 @@ import os
 import pathlib
 
 from cumulusci.core.config import OrgConfig
+from cumulusci.core.config import ScratchOrgConfig
 from cumulusci.tasks.salesforce.sourcetracking import ListChanges
 from cumulusci.tasks.salesforce.sourcetracking import RetrieveChanges
 from cumulusci.tasks.salesforce.sourcetracking import SnapshotChanges
@@ -12,6 +13,13 @@ from cumulusci.tests.util import create_project_config
 from cumulusci.utils import temporary_dir
 
 
+def _query_after(task):
+    """Run _get_changes with no new records and return the query used."""
+    task.tooling.query_all.return_value = {"totalSize": 0, "records": []}
+    task._get_changes()
+    return task.tooling.query_all.call_args[0][0]
+
+
 class TestListChanges:
     """List the changes from a scratch org"""
 
@@ -67,7 +75,7 @@ class TestListChanges:
             }
             task._run_task()
             assert os.path.exists(
-                os.path.join(task.project_config.cache_dir, "snapshot", "test.json")
+                os.path.join(task.project_config.cache_dir, "snapshot", "test.db")
             )
 
             assert "CustomObject: Test__c" in messages
@@ -89,6 +97,235 @@ class TestListChanges:
             }
             task._run_task()
             assert "Found no changes." in messages
+            task.tooling.query_all.assert_called_once_with(
+                "SELECT MemberName, MemberType, RevisionCounter, IsNameObsolete "
+                "FROM SourceMember WHERE RevisionCounter > 1 OR RevisionCounter = null"
+            )
+
+    def test_get_changes__incremental(self, create_task_fixture):
+        with temporary_dir():
+            task = create_task_fixture(ListChanges)
+            task._init_task()
+            task.tooling = mock.Mock()
+            task.tooling.query_all.return_value = {
+                "totalSize": 3,
+                "records": [
+                    {
+                        "MemberType": "CustomObject",
+                        "MemberName": "Test__c",
+                        "RevisionCounter": 1,
+                    },
+                    {
+                        "MemberType": "CustomObject",
+                        "MemberName": "Deleted__c",
+                        "RevisionCounter": 2,
+                    },
+                    {
+                        "MemberType": "Profile",
+                        "MemberName": "Admin",
+                        "RevisionCounter": None,
+                    },
+                ],
+            }
+            changes = task._get_changes()
+            assert [change["MemberName"] for change in changes] == [
+                "Deleted__c",
+                "Test__c",
+                "Admin",
+            ]
+            task._store_snapshot(changes)
+
+            task.tooling.query_all.return_value = {
+                "totalSize": 2,
+                "records": [
+                    {
+                        "MemberType": "CustomObject",
+                        "MemberName": "Deleted__c",
+                        "RevisionCounter": 3,
+                        "IsNameObsolete": True,
+                    },
+                    {
+                        "MemberType": "CustomObject",
+                        "MemberName": "Test__c",
+                        "RevisionCounter": 4,
+                        "IsNameObsolete": False,
+                    },
+                ],
+            }
+            assert task._get_changes() == [
+                {
+                    "MemberType": "CustomObject",
+                    "MemberName": "Test__c",
+                    "RevisionCounter": 4,
+                }
+            ]
+            assert "RevisionCounter > 2" in task.tooling.query_all.call_args[0][0]
+            assert "RevisionCounter > 4" in _query_after(task)
+
+    def test_get_changes__org_recreated(self, create_task_fixture):
+        with temporary_dir():
+            task = create_task_fixture(ListChanges)
+            task.org_config.config["id"] = "https://login.salesforce.com/id/00D1/005"
+            task._init_task()
+            task.tooling = mock.Mock()
+            task.tooling.query_all.return_value = {
+                "totalSize": 1,
+                "records": [
+                    {
+                        "MemberType": "CustomObject",
+                        "MemberName": "Test__c",
+                        "RevisionCounter": 5,
+                    }
+                ],
+            }
+            task._store_snapshot(task._get_changes())
+
+            task.org_config.config["id"] = "https://login.salesforce.com/id/00D2/005"
+            changes = task._get_changes()
+            assert [change["MemberName"] for change in changes] == ["Test__c"]
+            assert "IsNameObsolete=false" in task.tooling.query_all.call_args[0][0]
+
+    def test_get_changes__scratch_org_recreated(self, create_task_fixture):
+        with temporary_dir():
+            org_config = ScratchOrgConfig(
+                {"org_id": "00D1", "username": "test@example.com"}, "test"
+            )
+            task = create_task_fixture(ListChanges, org_config=org_config)
+            task.tooling = mock.Mock()
+            task.tooling.query_all.return_value = {
+                "totalSize": 1,
+                "records": [
+                    {
+                        "MemberType": "CustomObject",
+                        "MemberName": "Test__c",
+                        "RevisionCounter": 5,
+                    }
+                ],
+            }
+            task._store_snapshot(task._get_changes())
+            assert "RevisionCounter > 5" in _query_after(task)
+
+            org_config.config["org_id"] = "00D2"
+            task.tooling.query_all.return_value = {
+                "totalSize": 1,
+                "records": [
+                    {
+                        "MemberType": "CustomObject",
+                        "MemberName": "Test__c",
+                        "RevisionCounter": 1,
+                    }
+                ],
+            }
+            changes = task._get_changes()
+            assert [change["MemberName"] for change in changes] == ["Test__c"]
+            assert "IsNameObsolete=false" in task.tooling.query_all.call_args[0][0]
+
+    def test_get_changes__null_revnum(self, create_task_fixture):
+        with temporary_dir():
+            task = create_task_fixture(ListChanges)
+            task._init_task()
+            task.tooling = mock.Mock()
+            admin = {
+                "MemberType": "Profile",
+                "MemberName": "Admin",
+                "RevisionCounter": None,
+            }
+            task.tooling.query_all.return_value = {
+                "totalSize": 2,
+                "records": [
+                    admin,
+                    {
+                        "MemberType": "CustomObject",
+                        "MemberName": "Test__c",
+                        "RevisionCounter": 1,
+                    },
+                ],
+            }
+            task._store_snapshot(task._get_changes())
+
+            # Members without a RevisionCounter are retrieved again each time
+            standard = {
+                "MemberType": "Profile",
+                "MemberName": "Standard",
+                "RevisionCounter": None,
+            }
+            task.tooling.query_all.return_value = {
+                "totalSize": 2,
+                "records": [admin, standard],
+            }
+            assert task._get_changes() == [standard]
+
+            task.tooling.query_all.return_value = {
+                "totalSize": 1,
+                "records": [admin],
+            }
+            assert task._get_changes() == []
+            assert [change["MemberName"] for change in task._get_source_members()] == [
+                "Test__c",
+                "Admin",
+            ]
+
+    def test_load_json_snapshot(self, create_task_fixture):
+        with temporary_dir():
+            task = create_task_fixture(ListChanges)
+            task._init_task()
+            with task.project_config.open_cache("snapshot") as cache_dir:
+                with (cache_dir / "test.json").open("w") as f:
+                    json.dump({"CustomObject": {"Test__c": 1}}, f)
+            task.tooling = mock.Mock()
+            task.tooling.query_all.return_value = {
+                "totalSize": 2,
+                "records": [
+                    {
+                        "MemberType": "CustomObject",
+                        "MemberName": "Test__c",
+                        "RevisionCounter": 1,
+                    },
+                    {
+                        "MemberType": "CustomObject",
+                        "MemberName": "New__c",
+                        "RevisionCounter": 2,
+                    },
+                ],
+            }
+            changes = task._get_changes()
+            assert [change["MemberName"] for change in changes] == ["New__c"]
+
+    def test_get_changes__public(self, create_task_fixture):
+        with temporary_dir():
+            task = create_task_fixture(ListChanges, {"exclude": "Ignored"})
+            task._init_task = mock.Mock()
+            task.tooling = mock.Mock()
+            task.tooling.query_all.return_value = {
+                "totalSize": 2,
+                "records": [
+                    {
+                        "MemberType": "CustomObject",
+                        "MemberName": "Test__c",
+                        "RevisionCounter": 1,
+                    },
+                    {
+                        "MemberType": "CustomObject",
+                        "MemberName": "Ignored__c",
+                        "RevisionCounter": 2,
+                    },
+                ],
+            }
+            changes = task.get_changes()
+            task._init_task.assert_called_once_with()
+            assert [change["MemberName"] for change in changes] == ["Test__c"]
+            assert task._get_changes() == [
+                {
+                    "MemberType": "CustomObject",
+                    "MemberName": "Ignored__c",
+                    "RevisionCounter": 2,
+                },
+                {
+                    "MemberType": "CustomObject",
+                    "MemberName": "Test__c",
+                    "RevisionCounter": 1,
+                },
+            ]
 
     def test_filter_changes__include(self, create_task_fixture):
         foo = {
@@ -219,6 +456,10 @@ class TestSnapshotChanges:
             task._reset_sfdx_snapshot = mock.Mock()
             task._run_task()
             task._reset_sfdx_snapshot.assert_called_once()
+            task.tooling.query = mock.Mock(
+                return_value={"totalSize": 0, "records": [], "done": True}
+            )
+            assert task._get_changes() == []
 
     def test_freeze(self, create_task_fixture):
         task = create_task_fixture(SnapshotChanges)
@@ -5,8 +5,10 @@ import zipfile
 
 from cumulusci.core.exceptions import TaskOptionsError
 from cumulusci.core.flowrunner import StepSpec
+from cumulusci.core.utils import hash_dependencies
 from cumulusci.tasks.salesforce.update_dependencies import UpdateDependencies
 from cumulusci.tests.util import create_project_config
+from cumulusci.utils import temporary_dir
 from .util import create_task
 
 
@@ -191,6 +193,26 @@ class TestUpdateDependencies(unittest.TestCase):
         with self.assertRaises(TaskOptionsError):
             task()
 
+    def test_get_fingerprint(self):
+        project_config = create_project_config()
+        project_config.get_static_dependencies = mock.Mock(
+            return_value=[{"namespace": "foo", "version": "1.0"}]
+        )
+        project_config.config["project"]["dependencies"] = [
+            {"namespace": "foo", "version": "1.0"}
+        ]
+        task = create_task(UpdateDependencies, project_config=project_config)
+
+        assert task.get_fingerprint() == '[{"namespace": "foo", "version": "1.0"}]'
+        assert task._get_static_dependencies() == [
+            {"namespace": "foo", "version": "1.0"}
+        ]
+        project_config.get_static_dependencies.assert_called_once()
+
+    def test_get_fingerprint__no_dependencies(self):
+        task = create_task(UpdateDependencies)
+        assert task.get_fingerprint() is None
+
     def test_run_task__no_dependencies(self):
         task = create_task(UpdateDependencies)
         api = mock.Mock()
@@ -233,6 +255,42 @@ class TestUpdateDependencies(unittest.TestCase):
             },
         ]
 
+    def test_run_task__installed_from_snapshot(self):
+        dependencies = [{"namespace": "package", "version": "1.0"}]
+        project_config = create_project_config()
+        project_config.get_static_dependencies = mock.Mock(return_value=dependencies)
+        task = create_task(
+            UpdateDependencies,
+            {"dependencies": dependencies},
+            project_config=project_config,
+        )
+        task.org_config.config["dependencies_hash"] = hash_dependencies(dependencies)
+        task._install_dependencies = mock.Mock()
+
+        task()
+
+        task._install_dependencies.assert_not_called()
+
+    def test_run_task__snapshot_with_different_dependencies(self):
+        dependencies = [{"namespace": "package", "version": "1.0"}]
+        project_config = create_project_config()
+        project_config.get_static_dependencies = mock.Mock(return_value=dependencies)
+        task = create_task(
+            UpdateDependencies,
+            {"dependencies": dependencies},
+            project_config=project_config,
+        )
+        task.org_config.config["dependencies_hash"] = hash_dependencies(
+            [{"namespace": "package", "version": "1.0 (Beta 1)"}]
+        )
+        task._process_dependencies = mock.Mock()
+        task._install_dependencies = mock.Mock()
+        task._uninstall_dependencies = mock.Mock()
+
+        task()
+
+        task._install_dependencies.assert_called_once_with()
+
     def test_init_options__include_beta_with_persistent_org(self):
         project_config = create_project_config()
         project_config.config["project"]["dependencies"] = [{"namespace": "foo"}]
@@ -257,6 +315,29 @@ class TestUpdateDependencies(unittest.TestCase):
             task()
         assert "Could not find package for" in str(e.exception)
 
+    @mock.patch(
+        "cumulusci.tasks.salesforce.update_dependencies.download_extract_github"
+    )
+    def test_download_extract_github__cache(self, download_extract_github):
+        sha = "a" * 40
+        with temporary_dir() as d:
+            # Outside of a repository nothing is cached
+            project_config = create_project_config()
+            task = create_task(UpdateDependencies, project_config=project_config)
+            task._download_extract_github("gh", "owner", "repo", "src", ref="main")
+            download_extract_github.assert_called_once_with(
+                "gh", "owner", "repo", "src", ref="main", cache_dir=None
+            )
+
+            # In a repository, archives at a commit SHA are cached
+            project_config.repo_info["root"] = d
+            task._download_extract_github("gh", "owner", "repo", "src", ref="main")
+            assert download_extract_github.call_args[1]["cache_dir"] is None
+            task._download_extract_github("gh", "owner", "repo", "src", ref=sha)
+            assert download_extract_github.call_args[1]["cache_dir"] == (
+                project_config.cache_dir / "projects"
+            )
+
     def test_run_task__bad_security_type(self):
         project_config = create_project_config()
         project_config.config["project"]["dependencies"] = PROJECT_DEPENDENCIES
@@ -268,6 +349,18 @@ class TestUpdateDependencies(unittest.TestCase):
                 mock.Mock(),
             )
 
+    def test_run_task__bad_max_parallel_installs(self):
+        project_config = create_project_config()
+        project_config.config["project"]["dependencies"] = PROJECT_DEPENDENCIES
+        for value in ("many", "0"):
+            with self.assertRaises(TaskOptionsError):
+                create_task(
+                    UpdateDependencies,
+                    {"max_parallel_installs": value},
+                    project_config,
+                    mock.Mock(),
+                )
+
     def test_run_task__bad_ignore_dependencies(self):
         project_config = create_project_config()
         project_config.config["project"]["dependencies"] = PROJECT_DEPENDENCIES
@@ -363,6 +456,71 @@ class TestUpdateDependencies(unittest.TestCase):
             task()
         api.assert_called_once()
 
+    @mock.patch(
+        "cumulusci.salesforce_api.metadata.ApiRetrieveInstalledPackages.__call__"
+    )
+    def test_run_task__parallel(self, ApiRetrieveInstalledPackages):
+        shared = {"namespace": "shared", "version": "1.0"}
+        static_dependencies = {
+            "foo": [
+                {"repo_name": "foo", "subfolder": "unpackaged/pre/first"},
+                {"namespace": "foo", "version": "1.0", "dependencies": [shared]},
+                {"repo_name": "foo", "subfolder": "unpackaged/post/first"},
+            ],
+            "bar": [
+                {"namespace": "bar", "version": "1.0", "dependencies": [shared]},
+                {"repo_name": "bar", "subfolder": "unpackaged/post/first"},
+            ],
+        }
+        project_config = create_project_config()
+        project_config.get_static_dependencies = mock.Mock(
+            side_effect=lambda dependencies, **kw: [
+                dep
+                for dependency in dependencies
+                for dep in static_dependencies[dependency["github"]]
+            ]
+        )
+        task = create_task(
+            UpdateDependencies,
+            {
+                "dependencies": [{"github": "foo"}, {"github": "bar"}],
+                "max_parallel_installs": 2,
+            },
+            project_config=project_config,
+        )
+        ApiRetrieveInstalledPackages.return_value = {}
+        task.org_config.reset_installed_packages = mock.Mock()
+        installed = []
+        task._install_dependency = installed.append
+
+        task()
+
+        assert len(installed) == 6
+        for group in static_dependencies.values():
+            order = [installed.index(dependency) for dependency in group]
+            assert order == sorted(order)
+            assert installed.index(shared) < order[-2]
+
+    def test_install_dependencies_in_parallel__error(self):
+        task = create_task(
+            UpdateDependencies,
+            {
+                "dependencies": [{"namespace": "foo"}, {"namespace": "bar"}],
+                "max_parallel_installs": 2,
+            },
+        )
+        task.install_queue = [
+            {"namespace": "foo", "version": "1.0"},
+            {"namespace": "bar", "version": "1.0"},
+        ]
+        task._get_static_dependency_groups = mock.Mock(
+            return_value=[[dependency] for dependency in task.install_queue]
+        )
+        task._install_dependency = mock.Mock(side_effect=TaskOptionsError)
+
+        with self.assertRaises(TaskOptionsError):
+            task._install_dependencies()
+
     def test_freeze(self):
         task = create_task(
             UpdateDependencies,
@@ -399,6 +557,7 @@ class TestUpdateDependencies(unittest.TestCase):
                         "options": {
                             "dependencies": [{"namespace": "ns", "version": "1.0"}],
                             "include_beta": False,
+                            "max_parallel_installs": 1,
                             "prefer_2gp_from_release_branch": False,
                             "purge_on_delete": True,
                             "allow_newer": True,
@@ -427,6 +586,7 @@ class TestUpdateDependencies(unittest.TestCase):
                                 }
                             ],
                             "include_beta": False,
+                            "max_parallel_installs": 1,
                             "prefer_2gp_from_release_branch": False,
                             "purge_on_delete": True,
                             "allow_newer": True,
@@ -1,5 +1,10 @@
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+import json
+import threading
 from distutils.version import LooseVersion
 
+from cumulusci.core.utils import hash_dependencies
 from cumulusci.core.utils import process_bool_arg
 from cumulusci.core.exceptions import TaskOptionsError
 from cumulusci.salesforce_api.metadata import ApiDeploy
@@ -13,6 +18,7 @@ from cumulusci.tasks.salesforce.BaseSalesforceMetadataApiTask import (
 )
 from cumulusci.utils import download_extract_zip
 from cumulusci.utils import download_extract_github
+from cumulusci.utils.git import COMMIT_SHA_RE
 
 
 class UpdateDependencies(BaseSalesforceMetadataApiTask):
@@ -55,10 +61,18 @@ class UpdateDependencies(BaseSalesforceMetadataApiTask):
             "or a child branch of a release branch, resolve GitHub managed package dependencies to 2GP builds present on "
             "a matching release branch on the dependency."
         },
+        "max_parallel_installs": {
+            "description": "Maximum number of dependencies to install at the same time. "
+            "If greater than 1, each top-level dependency (with its unpackaged/pre, "
+            "package, and unpackaged/post steps, in that order) is installed "
+            "concurrently with the others, so they must not depend on each other "
+            "except through their declared dependencies. Defaults to 1."
+        },
     }
 
     def _init_options(self, kwargs):
         super(UpdateDependencies, self)._init_options(kwargs)
+        self._static_dependencies = None
         self.options["purge_on_delete"] = process_bool_arg(
             self.options.get("purge_on_delete", True)
         )
@@ -83,6 +97,14 @@ class UpdateDependencies(BaseSalesforceMetadataApiTask):
         self.options["prefer_2gp_from_release_branch"] = process_bool_arg(
             self.options.get("prefer_2gp_from_release_branch", False)
         )
+        try:
+            self.options["max_parallel_installs"] = int(
+                self.options.get("max_parallel_installs", 1)
+            )
+        except ValueError:
+            raise TaskOptionsError("max_parallel_installs must be an integer")
+        if self.options["max_parallel_installs"] < 1:
+            raise TaskOptionsError("max_parallel_installs must be at least 1")
 
         if "ignore_dependencies" in self.options:
             if any(
@@ -109,13 +131,21 @@ class UpdateDependencies(BaseSalesforceMetadataApiTask):
             self.logger.info("Project has no dependencies, doing nothing")
             return
 
-        self.logger.info("Preparing static dependencies map")
-        dependencies = self.project_config.get_static_dependencies(
-            self.options["dependencies"],
-            include_beta=self.options["include_beta"],
-            ignore_deps=self.options.get("ignore_dependencies"),
-            match_release_branch=self.options["prefer_2gp_from_release_branch"],
-        )
+        dependencies = self._get_static_dependencies()
+
+        # Scratch orgs created from a dependency snapshot already have them
+        dependencies_hash = self.org_config.dependencies_hash
+        if dependencies_hash:
+            if dependencies_hash == hash_dependencies(dependencies):
+                self.logger.info(
+                    "Dependencies were installed from a scratch org snapshot, doing nothing"
+                )
+                return
+            self.logger.info(
+                "The scratch org snapshot has different dependencies. "
+                "Check that the scratch org config's snapshot_options match "
+                "this task's options."
+            )
 
         self.installed = None
         self.uninstall_queue = []
@@ -140,6 +170,22 @@ class UpdateDependencies(BaseSalesforceMetadataApiTask):
         self._install_dependencies()
         self.org_config.reset_installed_packages()
 
+    def _get_static_dependencies(self):
+        if self._static_dependencies is None:
+            self.logger.info("Preparing static dependencies map")
+            self._static_dependencies = self.project_config.get_static_dependencies(
+                self.options["dependencies"],
+                include_beta=self.options["include_beta"],
+                ignore_deps=self.options.get("ignore_dependencies"),
+                match_release_branch=self.options["prefer_2gp_from_release_branch"],
+            )
+        return self._static_dependencies
+
+    def get_fingerprint(self):
+        if not self.options["dependencies"]:
+            return None
+        return json.dumps(self._get_static_dependencies(), sort_keys=True, default=str)
+
     def _process_dependencies(self, dependencies):
         for dependency in dependencies:
             # Process child dependencies
@@ -247,13 +293,90 @@ class UpdateDependencies(BaseSalesforceMetadataApiTask):
             self._uninstall_dependency(dependency)
 
     def _install_dependencies(self):
-        for dependency in self.install_queue:
-            self._install_dependency(dependency)
+        if (
+            self.options["max_parallel_installs"] > 1
+            and len(self.options["dependencies"]) > 1
+        ):
+            self._install_dependencies_in_parallel()
+        else:
+            for dependency in self.install_queue:
+                self._install_dependency(dependency)
+
+    def _install_dependencies_in_parallel(self):
+        """Install each top-level dependency concurrently with the others.
+
+        The steps resolved from one top-level dependency are installed in
+        the same order as the install queue, with child dependencies before
+        their parent. A dependency shared by several of them is only
+        installed once; the others wait for it.
+        """
+        lock = threading.Lock()
+        installs = {}
+
+        def install(dependency):
+            index = self.install_queue.index(dependency)
+            with lock:
+                future = installs.get(index)
+                owner = future is None
+                if owner:
+                    future = installs[index] = Future()
+            if owner:
+                try:
+                    future.set_result(self._install_dependency(dependency))
+                except Exception as e:
+                    future.set_exception(e)
+            return future.result()
+
+        def install_group(dependencies):
+            for dependency in self._flatten_install_order(dependencies):
+                if dependency in self.install_queue:
+                    install(dependency)
+
+        with ThreadPoolExecutor(
+            max_workers=self.options["max_parallel_installs"]
+        ) as executor:
+            futures = [
+                executor.submit(install_group, group)
+                for group in self._get_static_dependency_groups()
+            ]
+            try:
+                for future in futures:
+                    future.result()
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    def _get_static_dependency_groups(self):
+        """Returns the static dependencies resolved from each top-level dependency"""
+        # Resolved GitHub dependencies are reused by the project config,
+        # so this doesn't look them up again.
+        return [
+            self.project_config.get_static_dependencies(
+                [dependency],
+                include_beta=self.options["include_beta"],
+                ignore_deps=self.options.get("ignore_dependencies"),
+                match_release_branch=self.options["prefer_2gp_from_release_branch"],
+            )
+            for dependency in self.options["dependencies"]
+        ]
+
+    def _flatten_install_order(self, dependencies):
+        for dependency in dependencies:
+            yield from self._flatten_install_order(dependency.get("dependencies") or [])
+            yield dependency
 
     # hooks for tests
-    _download_extract_github = staticmethod(download_extract_github)
     _download_extract_zip = staticmethod(download_extract_zip)
 
+    def _download_extract_github(self, *args, ref=None, **kwargs):
+        # Archives at a commit SHA are shared with other commands in this
+        # project; outside of a project there is nowhere to keep them.
+        cache_dir = None
+        if self.project_config.repo_root and ref and COMMIT_SHA_RE.match(ref):
+            cache_dir = self.project_config.cache_dir / "projects"
+        return download_extract_github(*args, ref=ref, cache_dir=cache_dir, **kwargs)
+
     def _install_dependency(self, dependency):
         package_zip = None
 
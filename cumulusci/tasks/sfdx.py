@@ -14,6 +14,8 @@ how the CLI formats args opts commands etc.
 import json
 
 from cumulusci.core.config import ScratchOrgConfig
+from cumulusci.core.exceptions import TaskOptionsError
+from cumulusci.core.tasks import BaseTask
 from cumulusci.tasks.command import Command
 
 SFDX_CLI = "sfdx"
@@ -82,3 +84,29 @@ class SFDXJsonTask(SFDXOrgTask):
 
     def _process_data(self, data):
         self.logger.info("JSON = {}".format(data))
+
+
+class CreateDependencySnapshot(BaseTask):
+    """Snapshot a scratch org which has the project's dependencies installed"""
+
+    task_docs = """
+    Creates an org snapshot of the scratch org, named using the `snapshot`
+    from its scratch org config and a hash of the project's dependencies.
+    Run this right after `update_dependencies`. Scratch orgs created later
+    from the same config will be created from the snapshot while the
+    project's dependencies stay the same, and `update_dependencies` will
+    skip installing them. The dependencies are resolved using the
+    `snapshot_options` from the scratch org config, which should match the
+    options of the `update_dependencies` step.
+    """
+    salesforce_task = True
+
+    def _run_task(self):
+        if not isinstance(self.org_config, ScratchOrgConfig):
+            raise TaskOptionsError(
+                "Org snapshots can only be created from scratch orgs"
+            )
+        snapshot = self.org_config.create_dependency_snapshot()
+        self.org_config.save()
+        self.logger.info(f"Created org snapshot {snapshot.name}")
+        self.return_values = {"snapshot": snapshot.name}
@@ -11,11 +11,14 @@ from cumulusci.core.config import BaseProjectConfig
 from cumulusci.core.config import TaskConfig
 from cumulusci.core.config import OrgConfig
 from cumulusci.core.config import ScratchOrgConfig
+from cumulusci.core.config.ScratchOrgConfig import DependencySnapshot
+from cumulusci.core.exceptions import TaskOptionsError
 from cumulusci.core.keychain import BaseProjectKeychain
 from cumulusci.core.tests.utils import MockLoggerMixin
 
 from cumulusci.tasks.command import CommandException
 from cumulusci.tasks.salesforce.tests.util import create_task
+from cumulusci.tasks.sfdx import CreateDependencySnapshot
 from cumulusci.tasks.sfdx import SFDXBaseTask
 from cumulusci.tasks.sfdx import SFDXOrgTask
 from cumulusci.tasks.sfdx import SFDXJsonTask
@@ -106,3 +109,29 @@ class TestSFDXJsonTask(unittest.TestCase):
         task.logger = mock.Mock()
         task._process_output("{")
         task.logger.error.assert_called_once()
+
+
+class TestCreateDependencySnapshot(unittest.TestCase):
+    def test_run_task(self):
+        org_config = ScratchOrgConfig(
+            {"created": True, "username": "test", "org_id": "00D"}, "test"
+        )
+        org_config.refresh_oauth_token = mock.Mock()
+        org_config.create_dependency_snapshot = mock.Mock(
+            return_value=DependencySnapshot("dev0123", "0123")
+        )
+        org_config.save = mock.Mock()
+        task = create_task(CreateDependencySnapshot, org_config=org_config)
+
+        task()
+
+        org_config.create_dependency_snapshot.assert_called_once()
+        org_config.save.assert_called_once()
+        assert task.return_values == {"snapshot": "dev0123"}
+
+    def test_run_task__not_scratch_org(self):
+        org_config = OrgConfig({}, "test")
+        org_config.refresh_oauth_token = mock.Mock()
+        task = create_task(CreateDependencySnapshot, org_config=org_config)
+        with self.assertRaises(TaskOptionsError):
+            task()
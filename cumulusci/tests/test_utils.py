@@ -360,6 +360,63 @@ Options\n------------------------------------------\n\n
         result = zf.read("test")
         assert b"test" in result
 
+    def test_download_extract_github__cached(self):
+        sha = "a" * 40
+        f = io.BytesIO()
+        with zipfile.ZipFile(f, "w") as zf:
+            zf.writestr("top/", "")
+            zf.writestr("top/src/test", "test")
+        zipbytes = f.getvalue()
+        mock_repo = mock.Mock(default_branch="main")
+        mock_repo.name = "TestRepo"
+        mock_repo.archive.side_effect = lambda archive_type, fp, ref=None: fp.write(
+            zipbytes
+        )
+        mock_github = mock.Mock()
+        mock_github.repository.return_value = mock_repo
+
+        with utils.temporary_dir() as d:
+            for i in range(2):
+                zf = utils.download_extract_github(
+                    mock_github, "TestOwner", "TestRepo", "src", ref=sha, cache_dir=d
+                )
+                assert zf.read("test") == b"test"
+            mock_repo.archive.assert_called_once()
+            assert os.path.exists(os.path.join(d, "TestRepo", f"{sha}.zip"))
+
+            # A branch name can't be cached
+            utils.download_extract_github(
+                mock_github, "TestOwner", "TestRepo", ref="main", cache_dir=d
+            )
+            assert mock_repo.archive.call_count == 2
+
+    def test_open_github_archive__download_error(self):
+        mock_repo = mock.Mock()
+        mock_repo.name = "TestRepo"
+        mock_repo.archive.side_effect = Exception("Download failed")
+        with utils.temporary_dir() as d:
+            with pytest.raises(Exception, match="Download failed"):
+                utils.open_github_archive(mock_repo, "a" * 40, cache_dir=d)
+            assert os.listdir(os.path.join(d, "TestRepo")) == []
+
+    def test_evict_github_archives(self):
+        with utils.temporary_dir() as d:
+            for i, name in enumerate(["old", "newer", "newest"]):
+                os.makedirs(os.path.join(d, "repo"), exist_ok=True)
+                path = os.path.join(d, "repo", f"{name}.zip")
+                with open(path, "wb") as f:
+                    f.write(b"x" * 10)
+                os.utime(path, (i, i))
+            utils._evict_github_archives(d, 25)
+            assert sorted(os.listdir(os.path.join(d, "repo"))) == [
+                "newer.zip",
+                "newest.zip",
+            ]
+
+            # The most recently used archive is kept even if it is too large
+            utils._evict_github_archives(d, 5)
+            assert os.listdir(os.path.join(d, "repo")) == ["newest.zip"]
+
     def test_process_text_in_directory__renamed_file(self):
         with utils.temporary_dir():
             with open("test1", "w") as f:
@@ -542,6 +599,18 @@ Options\n------------------------------------------\n\n
             pass
         assert 4 == logger.info.call_count
 
+    def test_hash_directory(self):
+        with utils.temporary_dir() as d:
+            os.mkdir("sub")
+            with open("sub/a.txt", "w") as f:
+                f.write("a")
+            first = utils.hash_directory(d)
+            assert first == utils.hash_directory(d)
+
+            with open("sub/a.txt", "w") as f:
+                f.write("b")
+            assert first != utils.hash_directory(d)
+
     def test_util__sets_homebrew_upgrade_cmd(self):
         utils.CUMULUSCI_PATH = "/usr/local/Cellar/cumulusci/2.1.2"
         upgrade_cmd = utils.get_cci_upgrade_command()
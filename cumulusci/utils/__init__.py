@@ -1,5 +1,6 @@
 import contextlib
 import fnmatch
+import hashlib
 import io
 import math
 import os
@@ -11,6 +12,8 @@ import tempfile
 import textwrap
 import zipfile
 from datetime import datetime
+from pathlib import Path
+from .git import COMMIT_SHA_RE
 from .ziputils import zip_subfolder
 from .ziputils import process_text_in_zipfile  # noqa
 
@@ -27,6 +30,9 @@ API_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
 DATETIME_LEN = len("2018-08-07T16:00:56.000")
 UTF8 = "UTF-8"
 
+# Total size of cached GitHub archives to keep in a cache directory
+GITHUB_ARCHIVE_CACHE_MAX_SIZE = 500 * 1024 * 1024
+
 BREW_UPDATE_CMD = "brew upgrade cumulusci"
 PIP_UPDATE_CMD = "pip install --upgrade cumulusci"
 PIPX_UPDATE_CMD = "pipx upgrade cumulusci"
@@ -174,24 +180,77 @@ def download_extract_zip(url, target=None, subfolder=None, headers=None):
 
 
 def download_extract_github(
-    github_api, repo_owner, repo_name, subfolder=None, ref=None
+    github_api, repo_owner, repo_name, subfolder=None, ref=None, cache_dir=None
 ):
     return download_extract_github_from_repo(
-        github_api.repository(repo_owner, repo_name), subfolder, ref
+        github_api.repository(repo_owner, repo_name), subfolder, ref, cache_dir
     )
 
 
-def download_extract_github_from_repo(github_repo, subfolder=None, ref=None):
+def download_extract_github_from_repo(
+    github_repo, subfolder=None, ref=None, cache_dir=None
+):
     if not ref:
         ref = github_repo.default_branch
-    zip_content = io.BytesIO()
-    github_repo.archive("zipball", zip_content, ref=ref)
-    zip_file = zipfile.ZipFile(zip_content)
-    path = sorted(zip_file.namelist())[0]
-    if subfolder:
-        path = path + subfolder
-    zip_file = zip_subfolder(zip_file, path)
-    return zip_file
+    with open_github_archive(github_repo, ref, cache_dir) as zip_file:
+        path = sorted(zip_file.namelist())[0]
+        if subfolder:
+            path = path + subfolder
+        return zip_subfolder(zip_file, path)
+
+
+def open_github_archive(github_repo, ref, cache_dir=None):
+    """Returns the zipball of a GitHub repository at ref as a ZipFile.
+
+    If cache_dir is set and ref is a commit SHA, the archive is stored as
+    cache_dir/<repo name>/<sha>.zip and reused instead of being downloaded
+    again. The least recently used archives are removed once the archives
+    in cache_dir exceed GITHUB_ARCHIVE_CACHE_MAX_SIZE.
+    """
+    if cache_dir is None or not COMMIT_SHA_RE.match(ref):
+        zip_content = io.BytesIO()
+        github_repo.archive("zipball", zip_content, ref=ref)
+        return zipfile.ZipFile(zip_content)
+
+    archive_path = Path(cache_dir, github_repo.name, f"{ref}.zip")
+    if archive_path.exists():
+        # Update the modification time, which is used to find unused archives
+        os.utime(archive_path)
+    else:
+        archive_path.parent.mkdir(parents=True, exist_ok=True)
+        # Download to a temporary file so other processes never see a partial archive
+        with tempfile.NamedTemporaryFile(
+            dir=archive_path.parent, suffix=".tmp", delete=False
+        ) as f:
+            try:
+                github_repo.archive("zipball", f, ref=ref)
+            except Exception:
+                f.close()
+                os.remove(f.name)
+                raise
+        os.replace(f.name, archive_path)
+        _evict_github_archives(cache_dir, GITHUB_ARCHIVE_CACHE_MAX_SIZE)
+    return zipfile.ZipFile(archive_path)
+
+
+def _evict_github_archives(cache_dir, max_size):
+    archives = []
+    for archive_path in Path(cache_dir).glob("*/*.zip"):
+        try:
+            stat = archive_path.stat()
+        except FileNotFoundError:  # removed by another process
+            continue
+        archives.append((stat.st_mtime, stat.st_size, archive_path))
+    archives.sort(reverse=True)
+
+    total_size = 0
+    for i, (mtime, size, archive_path) in enumerate(archives):
+        # Always keep the most recently used archive
+        if i and total_size + size > max_size:
+            with contextlib.suppress(FileNotFoundError):
+                archive_path.unlink()
+        else:
+            total_size += size
 
 
 def process_text_in_directory(path, process_file):
@@ -593,6 +652,20 @@ def in_directory(filepath, dirpath):
     return filepath == dirpath or filepath.startswith(os.path.join(dirpath, ""))
 
 
+def hash_directory(path):
+    """Returns a hash of the names and contents of all files in a directory."""
+    h = hashlib.blake2b()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for f in sorted(files):
+            file_path = os.path.join(root, f)
+            relpath = os.path.relpath(file_path, path).replace(os.sep, "/")
+            h.update(relpath.encode("utf-8"))
+            with open(file_path, "rb") as fp:
+                h.update(fp.read())
+    return h.hexdigest()
+
+
 def log_progress(
     iterable,
     logger,
@@ -1,4 +1,8 @@
 import pathlib
+import re
+import subprocess
+
+COMMIT_SHA_RE = re.compile(r"^[0-9a-f]{40}$")
 
 
 def git_path(repo_root, tail=None):
@@ -41,3 +45,26 @@ def get_release_identifier(branch_name, prefix):
 
 def construct_release_branch_name(prefix, release_identifier):
     return f"{prefix}{release_identifier}"
+
+
+def get_changed_files(repo_root, base_ref):
+    """Returns the paths (relative to repo_root) of files which differ between
+    the working tree and the merge base of base_ref and HEAD,
+    including untracked files which are not ignored.
+    Raises subprocess.CalledProcessError if git fails, e.g. for an unknown ref.
+    """
+
+    def git(*args):
+        return subprocess.run(
+            ("git",) + args,
+            cwd=repo_root,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=True,
+        ).stdout
+
+    merge_base = git("merge-base", base_ref, "HEAD").strip()
+    changed = git("diff", "--name-only", merge_base).splitlines()
+    untracked = git("ls-files", "--others", "--exclude-standard").splitlines()
+    return changed + untracked
@@ -1,4 +1,10 @@
+import subprocess
+
+import pytest
+
+from cumulusci.utils import temporary_dir
 from cumulusci.utils.git import (
+    get_changed_files,
     is_release_branch,
     is_release_branch_or_child,
     get_release_identifier,
@@ -26,4 +32,43 @@ def test_get_release_identifier():
 
 
 def test_construct_release_branch_name():
-    assert construct_release_branch_name("feature/", "230") == "feature/230"
\ No newline at end of file
+    assert construct_release_branch_name("feature/", "230") == "feature/230"
+
+
+def test_get_changed_files():
+    def git(*args):
+        subprocess.run(
+            ("git", "-c", "user.name=Test", "-c", "user.email=test@example.com") + args,
+            check=True,
+            stdout=subprocess.PIPE,
+        )
+
+    with temporary_dir() as d:
+        git("init", "-q")
+        with open("unchanged.txt", "w") as f:
+            f.write("unchanged")
+        with open("committed.txt", "w") as f:
+            f.write("1")
+        git("add", ".")
+        git("commit", "-q", "-m", "base")
+        git("tag", "base")
+        with open("committed.txt", "w") as f:
+            f.write("2")
+        git("commit", "-q", "-am", "change")
+        with open("unchanged.txt", "a") as f:
+            f.write(" until now")
+        with open("untracked.txt", "w") as f:
+            f.write("new")
+        with open(".gitignore", "w") as f:
+            f.write("ignored.txt")
+        with open("ignored.txt", "w") as f:
+            f.write("ignored")
+
+        assert [
+            ".gitignore",
+            "committed.txt",
+            "unchanged.txt",
+            "untracked.txt",
+        ] == sorted(get_changed_files(d, "base"))
+        with pytest.raises(subprocess.CalledProcessError):
+            get_changed_files(d, "missing")
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for nested attribute access on config objects.
+
+Usage: python utility/benchmark_config.py [number]
+"""
+
+import sys
+import timeit
+
+from cumulusci.core.config import BaseProjectConfig
+from cumulusci.core.config import OrgConfig
+from cumulusci.core.config import UniversalConfig
+
+NUMBER = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+REPEAT = 5
+
+project_config = BaseProjectConfig(
+    UniversalConfig(),
+    {
+        "project": {
+            "package": {"name": "Test", "namespace": "test", "api_version": "50.0"},
+            "git": {"prefix_feature": "feature/", "default_branch": "main"},
+        }
+    },
+)
+org_config = OrgConfig({"instance_url": "https://example.com", "org_id": "00D"}, "test")
+
+BENCHMARKS = [
+    "project_config.project__package__api_version",
+    "project_config.project__git__prefix_feature",
+    "project_config.tasks__deploy__class_path",
+    "project_config.project__package__missing",
+    "org_config.namespace",
+    "org_config.config_name",
+]
+
+
+def main():
+    for stmt in BENCHMARKS:
+        best = min(timeit.repeat(stmt, globals=globals(), number=NUMBER, repeat=REPEAT))
+        print(f"{stmt:50} {best / NUMBER * 1e9:8.0f} ns")
+
+
+if __name__ == "__main__":
+    main()